@@ -0,0 +1,103 @@
+"""
+Compares the compile profiles of every compiled language: build time against the run time of the binary.
+
+Each profile builds the same CPU-bound solution `repeat` times (no compile cache; use_pch prebuilt dirs are
+built before timing, once per profile), then runs its testcases `repeat` times. Reported per profile:
+compile and solution time (medians, the solution time is the sum of the testcases' realtime) and their sum,
+plus the number of runs after which the slower-building profile pays off against the fastest-building one.
+
+usage: python benchmarks/bench_compile_profiles.py [base_dir] [repeat] [languages] [pch]
+       (languages: comma separated, default cpp,java; pch: use_pch for cpp)
+"""
+import os, sys, time, tempfile, statistics
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+from code_executor.configs.compile_config import cpp_compile_config, java_compile_config
+
+SOLUTIONS = {
+    "cpp": """#include <vector>
+using namespace std;
+long long solution(int n) {
+    vector<int> sieve(n + 1, 1);
+    long long total = 0;
+    for (int i = 2; i <= n; i++) {
+        if (!sieve[i]) continue;
+        total += i;
+        for (long long j = (long long)i * i; j <= n; j += i) sieve[j] = 0;
+    }
+    return total;
+}
+""",
+    "java": """public class Solution {
+    public long solution(int n) {
+        boolean[] composite = new boolean[n + 1];
+        long total = 0;
+        for (int i = 2; i <= n; i++) {
+            if (composite[i]) continue;
+            total += i;
+            for (long j = (long) i * i; j <= n; j += i) composite[(int) j] = true;
+        }
+        return total;
+    }
+}
+""",
+}
+PROFILES = {"cpp": list(cpp_compile_config["profiles"]), "java": list(java_compile_config["profiles"])}
+TESTCASE = {str(index): {"input": {"n": 5000000 + index}} for index in range(3)}
+
+
+def bench(language, profile, base_dir, repeat, use_pch):
+    """Returns (compile times, solution times) in seconds."""
+    compile_times, solution_times = [], []
+    for index in range(repeat + 1): # the first build fills the page cache (and the prebuilt dir with use_pch)
+        executor = CodeExecutor(language, SOLUTIONS[language], TESTCASE, base_dir=base_dir, timeout=60,
+                                cleanup_policy=CleanupPolicy.SAFE_ALL, compile_profile=profile, use_pch=use_pch)
+        toolchain = executor.toolchain
+        with DirectoryManager(toolchain.execute_dir, cleanup_policy=CleanupPolicy.SAFE_ALL):
+            start = time.perf_counter()
+            returncode, _, stderr = toolchain.compile()
+            elapsed = time.perf_counter() - start
+            if returncode != 0 or stderr:
+                raise RuntimeError(stderr)
+            returncode, stdout, stderr = toolchain.execute()
+            if returncode != 0:
+                raise RuntimeError(stderr)
+            _, _, results, _ = toolchain.parse_execute_output(returncode, stdout, stderr)
+        if index:
+            compile_times.append(elapsed)
+            solution_times.append(sum(result["realtime"] for result in results.values()))
+    return compile_times, solution_times
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_compile_profiles_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    languages = sys.argv[3].split(',') if len(sys.argv) > 3 else list(SOLUTIONS)
+    use_pch = len(sys.argv) > 4 and sys.argv[4] == "pch"
+
+    print(f"base_dir: {base_dir}, repeat: {repeat}, use_pch: {use_pch}, {len(TESTCASE)} testcases")
+    for language in languages:
+        medians = {}
+        for profile in PROFILES[language]:
+            try:
+                compile_times, solution_times = bench(language, profile, base_dir, repeat, use_pch)
+            except (RuntimeError, OSError) as e:
+                print(f"{language:<6} {profile:<6} failed: {str(e).strip()[:200]}")
+                continue
+            medians[profile] = (statistics.median(compile_times), statistics.median(solution_times))
+            compile_time, solution_time = medians[profile]
+            print(f"{language:<6} {profile:<6} compile {compile_time * 1e3:9.1f}ms  solution {solution_time * 1e3:8.1f}ms"
+                  f"  compile + solution {(compile_time + solution_time) * 1e3:9.1f}ms")
+        if len(medians) < 2:
+            continue
+        fastest = min(medians, key=lambda profile: medians[profile][0])
+        for profile, (compile_time, solution_time) in medians.items():
+            saved = medians[fastest][1] - solution_time
+            if profile != fastest and saved > 0:
+                print(f"{language:<6} {profile} pays off against {fastest} after "
+                      f"{(compile_time - medians[fastest][0]) / saved:.1f} runs of these testcases")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares C++ compile time of the single translation unit build against the use_pch build.
+
+usage: python benchmarks/bench_cpp_pch.py [base_dir] [repeat]
+"""
+import os, sys, time, tempfile, statistics
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+
+SOLUTION = """#include <vector>
+using namespace std;
+int solution(vector<int> nums, int k) {
+    int total = 0;
+    for (int x : nums) total += x * k;
+    return total;
+}
+"""
+TESTCASE = {"1": {"input": {"nums": [1, 2, 3], "k": 2}, "output": 12}}
+
+
+def time_compile(base_dir, use_pch):
+    executor = CodeExecutor("cpp", SOLUTION, TESTCASE, base_dir=base_dir, use_pch=use_pch,
+                            cleanup_policy=CleanupPolicy.HASH_ONLY)
+    with DirectoryManager(executor.toolchain.execute_dir, cleanup_policy=CleanupPolicy.HASH_ONLY):
+        start = time.perf_counter()
+        returncode, _, stderr = executor.toolchain.compile()
+        elapsed = time.perf_counter() - start
+    if returncode != 0:
+        raise RuntimeError(stderr)
+    return elapsed
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_cpp_pch_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    prebuild = time_compile(base_dir, use_pch=True) # first use_pch compile also builds the prebuilt dir.
+    cold = [time_compile(base_dir, use_pch=False) for _ in range(repeat)]
+    pch = [time_compile(base_dir, use_pch=True) for _ in range(repeat)]
+
+    print(f"base_dir: {base_dir}, repeat: {repeat}")
+    print(f"{'single TU':<12} median {statistics.median(cold):8.3f}s  min {min(cold):8.3f}s")
+    print(f"{'use_pch':<12} median {statistics.median(pch):8.3f}s  min {min(pch):8.3f}s")
+    print(f"{'prebuild':<12} {prebuild:8.3f}s (once per toolchain install)")
+    print(f"speedup: x{statistics.median(cold) / statistics.median(pch):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the per-testcase overhead of the Java harness (argument conversion, solution call, stdout
+capture, result output) and the cost of the first, JIT-cold testcase.
+
+The solution is trivial, so (harness wall time / testcases) is almost all harness overhead.
+Pass another Main.java to compare against it, e.g. the harness before the MethodHandle fast path:
+
+    git show <commit>:CodeExecutor/code_executor/solution_wrapper/java/Main.java > /tmp/Main_old.java
+    python benchmarks/bench_java_harness.py /tmp/bench 5 /tmp/Main_old.java
+
+usage: python benchmarks/bench_java_harness.py [base_dir] [repeat] [baseline_Main.java]
+"""
+import os, sys, time, shutil, tempfile, statistics
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+
+SOLUTION = """import java.util.List;
+
+public class Solution {
+    public long solution(int[] values, List<Integer> more, String name) {
+        long total = name.length();
+        for (int value : values) total += value;
+        for (int value : more) total += value;
+        return total;
+    }
+}
+"""
+CASES = 2000
+WARMUP = 200
+
+
+def make_testcase():
+    return {
+        str(index): {"input": {"values": list(range(index % 50)), "more": [index, 1], "name": "case"}}
+        for index in range(CASES)
+    }
+
+
+def bench(testcase, base_dir, repeat, harness_path=None, warmup=0):
+    """Returns (per-case wall times of each run in µs, realtime of case 1 in µs, median realtime of the rest in µs)."""
+    executor = CodeExecutor("java", SOLUTION, testcase, base_dir=base_dir, timeout=120,
+                            cleanup_policy=CleanupPolicy.HASH_ONLY, warmup=warmup)
+    toolchain = executor.toolchain
+    with DirectoryManager(toolchain.execute_dir, cleanup_policy=CleanupPolicy.HASH_ONLY):
+        compile_commands, cache_key_parts = toolchain.prepare_compile()
+        if harness_path is not None:
+            os.remove(toolchain.tmp_solution_wrapper_path) # may be a link to the shipped harness
+            shutil.copy(harness_path, toolchain.tmp_solution_wrapper_path)
+        returncode, _, stderr = toolchain.run_compile_command(compile_commands, *cache_key_parts)
+        if returncode != 0:
+            raise RuntimeError(stderr)
+
+        per_case, first, rest = [], [], []
+        for _ in range(repeat):
+            toolchain.write_harness_options()
+            start = time.perf_counter()
+            returncode, stdout, stderr = toolchain.execute()
+            elapsed = time.perf_counter() - start
+            if returncode != 0:
+                raise RuntimeError(stderr)
+            _, _, results, _ = toolchain.parse_execute_output(returncode, stdout, stderr)
+            realtimes = [result["realtime"] for result in results.values()]
+            per_case.append(elapsed / len(results) * 1e6)
+            first.append(realtimes[0] * 1e6)
+            rest.append(statistics.median(realtimes[1:]) * 1e6)
+        return per_case, statistics.median(first), statistics.median(rest)
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_java_harness_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    baseline = sys.argv[3] if len(sys.argv) > 3 else None
+    testcase = make_testcase()
+
+    runs = [("current", None, 0), (f"current, warmup={WARMUP}", None, WARMUP)]
+    if baseline is not None:
+        runs.insert(0, ("baseline", baseline, 0))
+
+    print(f"base_dir: {base_dir}, repeat: {repeat}, {CASES} testcases")
+    for name, harness_path, warmup in runs:
+        per_case, first, rest = bench(testcase, base_dir, repeat, harness_path, warmup)
+        print(f"{name:<22} harness {statistics.median(per_case):8.1f}µs/case (median, min {min(per_case):8.1f})"
+              f"  case 1 {first:9.1f}µs  other cases {rest:7.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures what a Python submission pays before its first testcase: interpreter startup, the harness' imports,
+and compile + run with the in-process compile against the old `python3 -m py_compile` subprocess.
+
+- python3 -c pass: bare interpreter startup, the floor of every harness run.
+- harness startup: `python3 __pycache__/main.*.pyc` on an empty testcase container (startup + harness imports).
+- submission: CodeExecutor.run() of a trivial solution (one testcase), compile_in_process True vs False.
+The slowest harness imports are listed from `python3 -X importtime`.
+
+usage: python benchmarks/bench_python_startup.py [base_dir] [repeat]
+"""
+import os, sys, time, tempfile, statistics, subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+
+SOLUTION = """def solution(a, b):
+    return a + b
+"""
+TESTCASE = {"1": {"input": {"a": 1, "b": 2}, "output": 3}}
+TOP_IMPORTS = 8
+
+
+def time_runs(run, repeat):
+    run() # warm-up (page cache)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_checked(command, **kwargs):
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr)
+    return completed
+
+
+def slowest_imports(command, cwd):
+    """[(cumulative µs, module)] of the slowest imports reported by -X importtime."""
+    stderr = run_checked([command[0], "-X", "importtime"] + command[1:], cwd=cwd).stderr
+    imports = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, module = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:TOP_IMPORTS]
+
+
+def bench_submission(base_dir, repeat, compile_in_process):
+    def run():
+        executor = CodeExecutor("python", SOLUTION, TESTCASE, base_dir=base_dir,
+                                cleanup_policy=CleanupPolicy.SAFE_ALL)
+        toolchain = executor.toolchain
+        toolchain.compile_config = dict(toolchain.compile_config, compile_in_process=compile_in_process)
+        stage, _, _, stderr = executor.run()
+        if stage != "execute":
+            raise RuntimeError(stderr)
+    return time_runs(run, repeat)
+
+
+def report(name, timings):
+    print(f"{name:<28} median {statistics.median(timings) * 1e3:8.2f}ms  min {min(timings) * 1e3:8.2f}ms")
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_python_startup_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    print(f"base_dir: {base_dir}, repeat: {repeat}")
+
+    report("python3 -c pass", time_runs(lambda: run_checked(["python3", "-c", "pass"]), repeat))
+
+    executor = CodeExecutor("python", SOLUTION, {}, base_dir=base_dir, cleanup_policy=CleanupPolicy.HASH_ONLY)
+    toolchain = executor.toolchain
+    with DirectoryManager(toolchain.execute_dir, cleanup_policy=CleanupPolicy.HASH_ONLY):
+        returncode, _, stderr = toolchain.compile()
+        if returncode != 0:
+            raise RuntimeError(stderr)
+        toolchain.write_harness_options()
+        command = toolchain.prepare_execute()
+        report("harness startup", time_runs(lambda: run_checked(command, env=toolchain.execute_env), repeat))
+        imports = slowest_imports(command, toolchain.execute_dir)
+
+    subprocess_compile = bench_submission(base_dir, repeat, False)
+    in_process = bench_submission(base_dir, repeat, True)
+    report("submission, py_compile", subprocess_compile)
+    report("submission, in-process", in_process)
+    print(f"saved per submission: {(statistics.median(subprocess_compile) - statistics.median(in_process)) * 1e3:.2f}ms"
+          " (median)")
+
+    print(f"slowest harness imports (cumulative):")
+    for cumulative, module in imports:
+        print(f"  {cumulative / 1e3:8.2f}ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Measures the spawn latency of the shell-free argv path against the old shell=True path.
+
+Both run the same compiled C++ harness (one trivial testcase) so the difference is the
+extra /bin/sh fork+exec per run.
+
+usage: python benchmarks/bench_spawn.py [base_dir] [repeat]
+"""
+import os, sys, time, shlex, tempfile, statistics, subprocess
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+
+SOLUTION = """int solution(int a, int b) {
+    return a + b;
+}
+"""
+TESTCASE = {"1": {"input": {"a": 1, "b": 2}, "output": 3}}
+
+
+def time_runs(run, repeat):
+    run() # warm-up (page cache, dynamic loader)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_spawn_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    executor = CodeExecutor("cpp", SOLUTION, TESTCASE, base_dir=base_dir, cleanup_policy=CleanupPolicy.HASH_ONLY)
+    toolchain = executor.toolchain
+    with DirectoryManager(toolchain.execute_dir, cleanup_policy=CleanupPolicy.HASH_ONLY):
+        returncode, _, stderr = toolchain.compile()
+        if returncode != 0:
+            raise RuntimeError(stderr)
+        command = toolchain.prepare_execute()
+
+        def run_shell(): # the old path: formatted template string through /bin/sh
+            subprocess.Popen(
+                shlex.join(command), shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+            ).communicate()
+
+        def run_argv():
+            toolchain.run_command(command)
+
+        shell = time_runs(run_shell, repeat)
+        argv = time_runs(run_argv, repeat)
+
+    print(f"base_dir: {base_dir}, repeat: {repeat}")
+    print(f"{'shell=True':<12} median {statistics.median(shell) * 1e3:8.3f}ms  min {min(shell) * 1e3:8.3f}ms")
+    print(f"{'argv':<12} median {statistics.median(argv) * 1e3:8.3f}ms  min {min(argv) * 1e3:8.3f}ms")
+    print(f"saved per run: {(statistics.median(shell) - statistics.median(argv)) * 1e3:.3f}ms (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compares the JSON (NDJSON) and MessagePack testcase containers on large numeric inputs, per language.
+
+Every testcase holds a long int array and an int matrix; the solution only returns a length, so the
+harness time is mostly decoding. Each language/format pair is compiled once, then its harness is run
+repeatedly on the same staged container.
+
+usage: python benchmarks/bench_testcase_format.py [base_dir] [repeat] [languages]
+       (languages: comma separated, default cpp,python,javascript,java)
+"""
+import os, sys, time, random, tempfile, statistics
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from code_executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+from code_executor.testcase_file import TestcaseFormat
+
+SOLUTIONS = {
+    "cpp": """#include <vector>
+using namespace std;
+int solution(vector<int> values, vector<vector<int>> matrix) {
+    return values.size() + matrix.size();
+}
+""",
+    "python": """def solution(values, matrix):
+    return len(values) + len(matrix)
+""",
+    "javascript": """function solution(values, matrix) {
+    return values.length + matrix.length;
+}
+""",
+    "java": """public class Solution {
+    public int solution(int[] values, int[][] matrix) {
+        return values.length + matrix.length;
+    }
+}
+""",
+}
+CASES = 20
+ARRAY_SIZE = 200000
+MATRIX_SIZE = 300
+
+
+def make_testcase():
+    rng = random.Random(0)
+    return {
+        str(index): {
+            "input": {
+                "values": [rng.randint(-10 ** 9, 10 ** 9) for _ in range(ARRAY_SIZE)],
+                "matrix": [[rng.randint(0, 10 ** 6) for _ in range(MATRIX_SIZE)] for _ in range(MATRIX_SIZE)],
+            },
+            "output": ARRAY_SIZE + MATRIX_SIZE,
+        }
+        for index in range(CASES)
+    }
+
+
+def time_runs(run, repeat):
+    run() # warm-up (page cache)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench(language, testcase, testcase_format, base_dir, repeat):
+    executor = CodeExecutor(language, SOLUTIONS[language], testcase, base_dir=base_dir, timeout=60,
+                            cleanup_policy=CleanupPolicy.HASH_ONLY, testcase_format=testcase_format)
+    toolchain = executor.toolchain
+    with DirectoryManager(toolchain.execute_dir, cleanup_policy=CleanupPolicy.HASH_ONLY):
+        returncode, _, stderr = toolchain.compile()
+        if returncode != 0:
+            raise RuntimeError(stderr)
+        size = os.path.getsize(toolchain.tmp_testcase_path)
+
+        def run():
+            returncode, _, stderr = toolchain.execute()
+            if returncode != 0:
+                raise RuntimeError(stderr)
+        return size, time_runs(run, repeat)
+
+
+def main():
+    base_dir = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_testcase_format_')
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    languages = sys.argv[3].split(',') if len(sys.argv) > 3 else list(SOLUTIONS)
+    testcase = make_testcase()
+
+    print(f"base_dir: {base_dir}, repeat: {repeat}, {CASES} cases of {ARRAY_SIZE} ints + {MATRIX_SIZE}x{MATRIX_SIZE} matrix")
+    for language in languages:
+        medians = {}
+        for testcase_format in (TestcaseFormat.JSON, TestcaseFormat.MSGPACK):
+            try:
+                size, timings = bench(language, testcase, testcase_format, base_dir, repeat)
+            except RuntimeError as e:
+                print(f"{language:<12} {testcase_format:<8} failed: {str(e).strip()[:200]}")
+                continue
+            medians[testcase_format] = statistics.median(timings)
+            print(f"{language:<12} {testcase_format:<8} {size / 2 ** 20:7.1f}MB  "
+                  f"median {medians[testcase_format] * 1e3:9.1f}ms  min {min(timings) * 1e3:9.1f}ms")
+        if len(medians) == 2:
+            print(f"{language:<12} speedup  {medians[TestcaseFormat.JSON] / medians[TestcaseFormat.MSGPACK]:.2f}x (median)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from .executor import CodeExecutor
+from .async_executor import AsyncCodeExecutor
+from .batch_executor import BatchExecutor
 from code_executor.configs.execute_config import EXECUTION_START_MESSAGE
 
 
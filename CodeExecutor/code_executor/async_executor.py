@@ -0,0 +1,197 @@
+import os, time, signal, asyncio
+from code_executor.executor import CodeExecutor
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+from code_executor.limits import HeadTailBuffer
+from code_executor.configs.execute_config import STDERR_KEEP_BYTES
+
+
+class AsyncCodeExecutor(CodeExecutor):
+    """
+    asyncio version of CodeExecutor. Subprocesses are driven by the event loop
+    (asyncio.create_subprocess_exec), so one loop can judge many submissions without a thread each.
+
+    - compile_timeout / timeout: per-stage timeouts in seconds.
+    - semaphore: limits concurrent runs; executors share a default one sized to the number of cores.
+    - Cancelling run() kills the running compiler/harness before the CancelledError propagates.
+    Blocking toolchain work (prebuilt dirs, compiler version probes, cache I/O) runs on the loop's default
+    executor, see run_blocking.
+    run() returns the same (stage, returncode, results, stderr) tuple as BaseToolChain.run.
+    """
+    _default_semaphore = None
+
+    def __init__(self, language, solution_code, testcase, base_dir=None, timeout=10, cleanup_policy=CleanupPolicy.NONE,
+                 compile_timeout=None, semaphore=None, **kwargs):
+        super().__init__(language, solution_code, testcase, base_dir=base_dir, timeout=timeout,
+                         cleanup_policy=cleanup_policy, **kwargs)
+        if compile_timeout is not None:
+            self.toolchain.compile_timeout = compile_timeout
+        self.semaphore = semaphore
+
+    @classmethod
+    def default_semaphore(cls):
+        if cls._default_semaphore is None:
+            cls._default_semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        return cls._default_semaphore
+
+    async def run(self):
+        async with (self.semaphore or self.default_semaphore()):
+            start = time.perf_counter()
+            directory_manager = DirectoryManager(self.toolchain.execute_dir,
+                                                 cleanup_policy=self.cleanup_policy,
+                                                 background_cleanup=self.background_cleanup)
+            with directory_manager:
+                run = await self._run()
+            self.record_metrics(directory_manager, start)
+            return run
+
+    async def _run(self):
+        toolchain = self.toolchain
+        toolchain.reset_stages()
+        cached_run = await run_blocking(toolchain.cached_run)
+        if cached_run is not None:
+            return cached_run
+        if toolchain.compile_config['compilable']:
+            returncode, stdout, stderr = await self.compile()
+            if stderr:
+                return toolchain.finish_run(("compile", returncode, stdout, stderr))
+        toolchain.count_written_bytes()
+
+        with toolchain.stage("execute"):
+            returncode, stdout, stderr = await self.execute()
+        return toolchain.parse_execute_output(returncode, stdout, stderr)
+
+    async def compile(self, prepared=None):
+        # prepared: the (compile_commands, cache_key_parts) of an earlier prepare_compile() call.
+        toolchain = self.toolchain
+        if prepared is None:
+            with toolchain.stage("prepare"):
+                prepared = await run_blocking(toolchain.prepare_compile)
+
+        with toolchain.stage("compile"):
+            # The steps between the compilers (in-process compile, compile cache) run off the loop.
+            steps = toolchain.compile_steps(*prepared)
+            done, value = await run_blocking(_advance, steps, None)
+            while not done:
+                result = await self.run_command(value, toolchain.compile_timeout)
+                done, value = await run_blocking(_advance, steps, result)
+            return value
+
+    async def execute(self):
+        toolchain = self.toolchain
+        toolchain.usage = {}
+        await run_blocking(toolchain.write_harness_options)
+        if not toolchain.parallel_testcases:
+            return await self._execute_harness(toolchain.tmp_testcase_path)
+
+        shards = await run_blocking(toolchain.prepare_shards)
+        semaphore = asyncio.Semaphore(toolchain.parallel_testcases)
+
+        async def execute_shard(shard_path):
+            async with semaphore:
+                return await self._execute_harness(shard_path)
+
+        outputs = await asyncio.gather(*(execute_shard(shard_path) for _, shard_path in shards))
+        return await run_blocking(toolchain.merge_shard_outputs, shards, outputs)
+
+    async def _execute_harness(self, testcase_path):
+        toolchain = self.toolchain
+        execute_command = await run_blocking(toolchain.prepare_execute, testcase_path)
+        if toolchain.worker_pool is not None: # WorkerPool is blocking; keep it off the event loop.
+            return await run_blocking(
+                toolchain.run_execute_command, execute_command, *toolchain.harness_args(testcase_path)
+            )
+        # asyncio reaps the process itself, so usage only gets the cgroup accounting here.
+        with toolchain.limit_execution() as (limit_command, _):
+            return await self.run_command(limit_command(execute_command), toolchain.timeout, toolchain.execute_env,
+                                          harness=True)
+
+    async def run_command(self, command, timeout, env=None, harness=False):
+        # harness: add the process start to the toolchain's spawn stage
+        spawn_start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env,
+                cwd=self.toolchain.execute_dir if harness else None,
+                start_new_session=True, # killed as a process group, see _kill
+            )
+        except OSError as e:
+            return 127, '', str(e)
+        if harness:
+            self.toolchain.add_stage("spawn", time.perf_counter() - spawn_start)
+        # Like the sync toolchain, a killed harness keeps the complete stdout lines read so far
+        # (the results of the testcases it finished).
+        stdout = bytearray()
+        try:
+            if harness:
+                stderr = HeadTailBuffer(STDERR_KEEP_BYTES)
+                await asyncio.wait_for(self._read_harness_output(process, stdout, stderr), timeout)
+                stdout, stderr = bytes(stdout), stderr.getvalue()
+            else:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except asyncio.TimeoutError:
+            await _kill(process)
+            return process.returncode, _complete_lines(stdout), "timeout"
+        except _OutputLimitExceeded:
+            await _kill(process)
+            return process.returncode, _complete_lines(stdout), "output limit exceeded"
+        except asyncio.CancelledError:
+            await _kill(process)
+            raise
+        return process.returncode, stdout.decode('utf-8', errors='replace'), stderr.decode('utf-8', errors='replace')
+
+    async def _read_harness_output(self, process, stdout, stderr):
+        # Like communicate(), but reads at most toolchain.pipe_limit bytes into stdout (a bytearray) and
+        # stderr (a HeadTailBuffer, which keeps only the ends).
+        read_bytes = 0
+
+        async def pump(stream, write):
+            nonlocal read_bytes
+            while True:
+                chunk = await stream.read(65536)
+                if not chunk:
+                    return
+                read_bytes += len(chunk)
+                if read_bytes > self.toolchain.pipe_limit:
+                    raise _OutputLimitExceeded()
+                write(chunk)
+
+        readers = asyncio.gather(pump(process.stdout, stdout.extend), pump(process.stderr, stderr.write))
+        try:
+            await readers
+        except BaseException:
+            readers.cancel()
+            raise
+        await process.wait()
+
+
+def run_blocking(func, *args):
+    """Awaitable of func(*args) on the running loop's default executor."""
+    return asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def _advance(steps, value):
+    # (done, the next compile command or the compile result); StopIteration cannot be set on a Future
+    try:
+        return False, steps.send(value)
+    except StopIteration as stop:
+        return True, stop.value
+
+
+class _OutputLimitExceeded(Exception):
+    pass
+
+
+def _complete_lines(stdout):
+    end = stdout.rfind(b'\n')
+    return bytes(stdout[:end]).decode('utf-8', errors='replace') if end >= 0 else ''
+
+
+async def _kill(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    await process.wait()
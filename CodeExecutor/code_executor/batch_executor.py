@@ -0,0 +1,223 @@
+import os, time, queue, asyncio, threading
+from code_executor.async_executor import AsyncCodeExecutor, run_blocking
+from code_executor.compile_cache import CompileCache
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+from code_executor.configs.compile_config import COMPILE_CACHE_DIR
+
+_DONE = object()
+
+
+class BatchExecutor:
+    """
+    Judges many (language, solution_code, testcase) jobs with one scheduler.
+
+    Compile and execute stages have separate concurrency limits (defaults: number of cores).
+    Jobs whose sources build the same artifacts (same compile cache key) are compiled once;
+    the others wait for that compile and restore the artifacts from the compile cache.
+    Results are yielded in completion order, as (job_id, result) with result being the
+    (stage, returncode, results, stderr) tuple of CodeExecutor.run. A job that raises (e.g. an unsupported
+    language or a missing testcase file) gets ("error", None, {}, "<exception>") and the batch goes on.
+
+    jobs: iterable of dicts {"language", "solution_code", "testcase" or "testcase_path"[, "job_id"]}
+          or (language, solution_code, testcase) tuples. job_id defaults to the job's index.
+    """
+    def __init__(self, base_dir=None, timeout=10, cleanup_policy=CleanupPolicy.HASH_ONLY,
+                 compile_concurrency=None, run_concurrency=None, compile_cache=True, **executor_kwargs):
+        self.base_dir = base_dir
+        self.timeout = timeout
+        self.cleanup_policy = cleanup_policy
+        self.compile_concurrency = compile_concurrency or os.cpu_count() or 1
+        self.run_concurrency = run_concurrency or os.cpu_count() or 1
+        self.compile_cache = compile_cache
+        self.executor_kwargs = executor_kwargs
+        self.stats = {}
+
+    def run(self, jobs, callback=None):
+        """
+        Generator: the scheduler runs on its own event loop thread, results stream back through a bounded queue
+        (the scheduler waits while run_concurrency results are not consumed yet).
+        Closing the generator early cancels the jobs that are still running.
+        """
+        results = queue.Queue(maxsize=self.run_concurrency)
+        loop = asyncio.new_event_loop()
+        runner = loop.create_task(self._run_all(jobs, lambda item: run_blocking(results.put, item)))
+
+        def run_loop():
+            asyncio.set_event_loop(loop)
+            try:
+                loop.run_until_complete(runner)
+            except asyncio.CancelledError:
+                pass
+            except BaseException as e:
+                results.put(e)
+            finally:
+                loop.run_until_complete(loop.shutdown_default_executor())
+                results.put(_DONE)
+                loop.close()
+
+        thread = threading.Thread(target=run_loop, daemon=True)
+        thread.start()
+        finished = False
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    finished = True
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if callback is not None:
+                    callback(*item)
+                yield item
+        finally:
+            if not finished: # stopped early (GeneratorExit) or raised
+                loop.call_soon_threadsafe(runner.cancel)
+                while results.get() is not _DONE: # unblocks a put that waits for room
+                    pass
+            thread.join()
+
+    async def run_async(self, jobs):
+        """Async generator version of run(), for callers that already own an event loop."""
+        results = asyncio.Queue()
+        runner = asyncio.ensure_future(self._run_all(jobs, results.put))
+        runner.add_done_callback(lambda _: results.put_nowait(_DONE))
+        try:
+            while True:
+                item = await results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            runner.cancel()
+        await runner
+
+    async def _run_all(self, jobs, emit):
+        self._compile_semaphore = asyncio.Semaphore(self.compile_concurrency)
+        self._run_semaphore = asyncio.Semaphore(self.run_concurrency)
+        self._compiles = {} # compile cache key -> Future of the leader's compile result
+        self.stats = {
+            "jobs": 0,
+            "compiled": 0,
+            "compile_shared": 0,
+            "compile_wait": 0.0,
+            "run_wait": 0.0,
+            "max_compile_wait": 0.0,
+            "max_run_wait": 0.0,
+        }
+        start = time.perf_counter()
+
+        # Jobs are pulled lazily so that only a bounded number of testcases is held in memory.
+        max_in_flight = 2 * (self.compile_concurrency + self.run_concurrency)
+        pending = set()
+        try:
+            for job_id, job in _iter_jobs(jobs):
+                if len(pending) >= max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        await emit(task.result())
+                pending.add(asyncio.ensure_future(self._run_job(job_id, job)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    await emit(task.result())
+        finally: # cancelled: the jobs still running are cancelled too (their processes are killed)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        elapsed = time.perf_counter() - start
+        jobs_count = self.stats["jobs"]
+        self.stats["elapsed"] = elapsed
+        self.stats["jobs_per_sec"] = jobs_count / elapsed if elapsed > 0 else 0.0
+        self.stats["avg_compile_wait"] = self.stats["compile_wait"] / jobs_count if jobs_count else 0.0
+        self.stats["avg_run_wait"] = self.stats["run_wait"] / jobs_count if jobs_count else 0.0
+
+    def _create_executor(self, job):
+        executor = AsyncCodeExecutor(
+            job["language"], job["solution_code"], job.get("testcase"), testcase_path=job.get("testcase_path"),
+            base_dir=self.base_dir, timeout=self.timeout, cleanup_policy=self.cleanup_policy,
+            **self.executor_kwargs
+        )
+        toolchain = executor.toolchain
+        if self.compile_cache is True:
+            self.compile_cache = CompileCache(COMPILE_CACHE_DIR.format(base_dir=toolchain.base_dir))
+        toolchain.compile_cache = self.compile_cache or None
+        return executor
+
+    async def _run_job(self, job_id, job):
+        try:
+            return job_id, await self._judge_job(job)
+        except Exception as e:
+            return job_id, ("error", None, {}, f"{type(e).__name__}: {e}")
+
+    async def _judge_job(self, job):
+        enqueued = time.perf_counter()
+        executor = self._create_executor(job)
+        toolchain = executor.toolchain
+        toolchain.reset_stages()
+        self.stats["jobs"] += 1
+        directory_manager = DirectoryManager(toolchain.execute_dir, cleanup_policy=self.cleanup_policy,
+                                             background_cleanup=executor.background_cleanup)
+        with directory_manager:
+            run = await self._run_stages(executor, enqueued)
+        executor.record_metrics(directory_manager, enqueued) # total includes the waits for the semaphores
+        return run
+
+    async def _run_stages(self, executor, enqueued):
+        toolchain = executor.toolchain
+        cached_run = await run_blocking(toolchain.cached_run)
+        if cached_run is not None:
+            return cached_run
+        if toolchain.compile_config['compilable']:
+            returncode, stdout, stderr = await self._compile(executor, enqueued)
+            if stderr:
+                return toolchain.finish_run(("compile", returncode, stdout, stderr))
+        toolchain.count_written_bytes()
+
+        ready = time.perf_counter()
+        async with self._run_semaphore:
+            self._add_wait("run_wait", time.perf_counter() - ready)
+            with toolchain.stage("execute"):
+                returncode, stdout, stderr = await executor.execute()
+        return toolchain.parse_execute_output(returncode, stdout, stderr)
+
+    async def _compile(self, executor, enqueued):
+        toolchain = executor.toolchain
+        with toolchain.stage("prepare"):
+            prepared = await run_blocking(toolchain.prepare_compile)
+            key = await run_blocking(toolchain.compile_cache_key, prepared[1])
+        if key is not None and key in self._compiles:
+            result = await self._compiles[key]
+            if (result[0] == 0 and not result[2]
+                    and await run_blocking(toolchain.compile_cache.restore, key, toolchain.execute_dir)):
+                self.stats["compile_shared"] += 1
+                toolchain.counters["compile_cache_hits"] = 1
+                return 0, '', ''
+            if result[2]: # same source, same compile error
+                return result
+
+        leader = None
+        if key is not None and key not in self._compiles:
+            leader = self._compiles[key] = asyncio.get_running_loop().create_future()
+        result = (None, '', "compile was not run")
+        try:
+            async with self._compile_semaphore:
+                self._add_wait("compile_wait", time.perf_counter() - enqueued)
+                result = await executor.compile(prepared)
+                self.stats["compiled"] += 1
+        finally:
+            if leader is not None:
+                leader.set_result(result)
+        return result
+
+    def _add_wait(self, name, seconds):
+        self.stats[name] += seconds
+        self.stats["max_" + name] = max(self.stats["max_" + name], seconds)
+
+
+def _iter_jobs(jobs):
+    for index, job in enumerate(jobs):
+        if not isinstance(job, dict):
+            language, solution_code, testcase = job
+            job = {"language": language, "solution_code": solution_code, "testcase": testcase}
+        yield job.get("job_id", index), job
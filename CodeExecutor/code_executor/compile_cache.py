@@ -0,0 +1,84 @@
+import os, shutil, glob, hashlib, uuid, fcntl
+from contextlib import contextmanager
+from code_executor.configs.compile_config import COMPILE_CACHE_MAX_BYTES
+
+
+class CompileCache:
+    """
+    Content-addressed store for compile artifacts (C++ binary, Java .class files).
+
+    Each entry is a directory named after the cache key. Entries are published with an
+    atomic rename, restored (copied) under a shared flock and evicted (LRU by mtime) under an
+    exclusive flock, so several workers can share one cache directory.
+    """
+    def __init__(self, cache_dir, max_bytes=COMPILE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock_path = os.path.join(cache_dir, '.lock')
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(*parts):
+        digest = hashlib.sha256()
+        for part in parts:
+            if isinstance(part, (list, tuple)): # argv templates
+                part = '\0'.join(part)
+            if isinstance(part, str):
+                part = part.encode('utf-8')
+            digest.update(len(part).to_bytes(8, 'little'))
+            digest.update(part)
+        return digest.hexdigest()
+
+    @contextmanager
+    def _lock(self, exclusive=False):
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def restore(self, key, dest_dir):
+        entry_dir = os.path.join(self.cache_dir, key)
+        with self._lock():
+            if not os.path.isdir(entry_dir):
+                return False
+            for name in os.listdir(entry_dir):
+                # copies, not hardlinks: the solution runs in dest_dir and could rewrite a shared entry
+                shutil.copy2(os.path.join(entry_dir, name), os.path.join(dest_dir, name))
+            os.utime(entry_dir) # LRU: mtime is the last access time.
+        return True
+
+    def store(self, key, src_dir, patterns):
+        entry_dir = os.path.join(self.cache_dir, key)
+        if os.path.isdir(entry_dir):
+            return
+        tmp_dir = os.path.join(self.cache_dir, f'.tmp-{uuid.uuid4().hex}')
+        os.makedirs(tmp_dir)
+        for pattern in patterns:
+            for path in glob.glob(os.path.join(src_dir, pattern)):
+                shutil.copy2(path, tmp_dir)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError: # Another worker published the same key first.
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+        self.evict()
+
+    def evict(self):
+        with self._lock(exclusive=True):
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                entry_dir = os.path.join(self.cache_dir, name)
+                if name.startswith('.') or not os.path.isdir(entry_dir):
+                    continue
+                size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+                entries.append((os.path.getmtime(entry_dir), size, entry_dir))
+                total += size
+
+            for _, size, entry_dir in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                total -= size
@@ -1,9 +1,19 @@
 import sys
-DEFAULT_TESTCASE_NAME = 'testcase.json'
+DEFAULT_TESTCASE_NAME = 'testcase.ndjson' # testcase container, see testcase_file.py
+BINARY_TESTCASE_NAME = 'testcase.msgpack' # TestcaseFormat.MSGPACK
+TESTCASE_INDEX_SUFFIX = '.idx'
 
 # ver3.
 BASE_DIR = '/workspace'
 EXECUTE_DIR = '{base_dir}/executor/{hash_id}'
+COMPILE_CACHE_DIR = '{base_dir}/cache/compile'
+COMPILE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+BYTECODE_CACHE_ENTRIES = 256 # python code objects kept in memory by source hash (bytecode_cache.py)
+PREBUILT_DIR = '{base_dir}/prebuilt/{language}-{build_id}'
+WRAPPER_CACHE_PATH = '{base_dir}/cache/wrapper/{language}-{wrapper_id}-{fname}' # generated harness sources
+JS_CODE_CACHE_DIR = '{base_dir}/cache/v8' # V8 code cache of javascript solutions, by solution hash
+# WorkspacePolicy.TMPFS: execute dirs go here instead of base_dir (caches and prebuilt dirs stay on base_dir).
+TMPFS_BASE_DIR = '/dev/shm/code_executor'
 
 # ver1.
 # BASE_DIR = '/workspace/executor'
@@ -19,13 +29,17 @@ EXECUTE_DIR = '{base_dir}/executor/{hash_id}'
 # SUBMIT_DIR = '{base_dir}/submit' + SUB_DIR
 
 
+# Command templates are argv lists (see execute_config.py).
+
 c_compile_config = {
     "compilable": True,
     "compile_lang": "c",
     "solution_wrapper_fname": "main.c",
     "solution_fname": "solution.c",
     "exe_fname": "main",
-    "compile_command": "/usr/bin/gcc -O2 -w -fmax-errors=3 -std=c99 {src_path} -lm -o {exe_path}"
+    "compile_command": [
+        "/usr/bin/gcc", "-O2", "-w", "-fmax-errors=3", "-std=c99", "{src_path}", "-lm", "-o", "{exe_path}"
+    ]
 }
 
 cpp_compile_config = {
@@ -34,8 +48,60 @@ cpp_compile_config = {
     "solution_wrapper_fname": "main.cpp",
     "solution_fname": "solution.cpp",
     "exe_fname": "main",
+    "packed_args_fname": "packed_args.hpp", # solutionWrapper argument conversion, included by main.cpp and pch.hpp
     #"compile_command": "g++ -O2 -w -fmax-errors=3 -std=c++14 {solution_wrapper_path} -lm -o {exe_path}"
-    "compile_command": "g++ -O2 -w -fmax-errors=3 -std=c++17 {solution_wrapper_path} -lm -lpthread -o {exe_path}"
+    "compile_command": [
+        "g++", "-O2", "-w", "-fmax-errors=3", "-std=c++17", "{solution_wrapper_path}", "-lm", "-lpthread",
+        "-o", "{exe_path}"
+    ],
+    "cache_artifacts": ["main"],
+    "compiler_version_command": ["g++", "-dumpfullversion"], # part of the compile cache key and the prebuilt dir id
+
+    # use_pch build: json.hpp -> pch.hpp.gch and main.cpp -> main.o are built once per prebuilt dir,
+    # each submission only compiles solution_unit.cpp and links. Flags of pch/solution commands must match.
+    "pch_fname": "pch.hpp",
+    "harness_obj_fname": "main.o",
+    "solution_unit_fname": "solution_unit.cpp",
+    "solution_obj_fname": "solution_unit.o",
+    "pch_command": ["g++", "-O2", "-w", "-std=c++17", "-x", "c++-header", "{pch_src_path}", "-o", "{pch_path}"],
+    "harness_command": [
+        "g++", "-O2", "-w", "-std=c++17", "-DCODE_EXECUTOR_SEPARATE_SOLUTION", "-c", "{solution_wrapper_path}",
+        "-o", "{harness_obj_path}"
+    ],
+    "solution_compile_command": [
+        "g++", "-O2", "-w", "-fmax-errors=3", "-std=c++17", "-I{prebuilt_dir}", "-c", "{solution_unit_path}",
+        "-o", "{solution_obj_path}"
+    ],
+    "link_command": ["g++", "{harness_obj_path}", "{solution_obj_path}", "-lm", "-lpthread", "-o", "{exe_path}"],
+    # profile=True: appended to compile_command / link_command, so the harness' sampler can name the functions.
+    "profile_link_flags": ["-rdynamic"],
+    "default_profile": "judge",
+}
+
+
+def _cpp_profile(flags, link_flags=()):
+    # cpp commands with "-O2" replaced by flags in every compile and link_flags added to every link
+    def compile_with(command):
+        index = command.index("-O2")
+        return command[:index] + flags + command[index + 1:]
+    return {
+        "compile_command": compile_with(cpp_compile_config["compile_command"]) + list(link_flags),
+        "pch_command": compile_with(cpp_compile_config["pch_command"]),
+        "harness_command": compile_with(cpp_compile_config["harness_command"]),
+        "solution_compile_command": compile_with(cpp_compile_config["solution_compile_command"]),
+        "link_command": cpp_compile_config["link_command"] + list(link_flags),
+    }
+
+
+# Compile profiles (CodeExecutor(compile_profile=...)): overrides of the compile config, so every build of a
+# profile has its own compile cache key and (use_pch) prebuilt dir.
+# - fast: interactive runs on a few sample testcases; the build is most of the time there.
+# - judge (default): the commands above.
+# - bench: benchmarks; the binary is tuned for this CPU (do not share its compile cache between machines).
+cpp_compile_config["profiles"] = {
+    "fast": _cpp_profile(["-O0", "-pipe"]),
+    "judge": {},
+    "bench": _cpp_profile(["-O2", "-march=native", "-pipe"], link_flags=["-static"]),
 }
 
 java_compile_config = {
@@ -45,10 +111,23 @@ java_compile_config = {
     "solution_fname": "Solution.java",
     "exe_fname": "Main",
     "lib_dir_name": "lib",
-    "compile_command": (
-        "javac -cp {lib_dir}/{jackson_databind}:{lib_dir}/{jackson_core}:{lib_dir}/{jackson_annotations} "
-        "{solution_wrapper_path} {solution_path}"
-    )
+    "compile_command": [
+        "javac", "-cp", "{lib_dir}/{jackson_databind}:{lib_dir}/{jackson_core}:{lib_dir}/{jackson_annotations}",
+        "{solution_wrapper_path}", "{solution_path}"
+    ],
+    "cache_artifacts": ["*.class"],
+    "compiler_version_command": ["javac", "-version"], # part of the compile cache key
+    "default_profile": "judge",
+}
+
+# fast: javac's own JVM on C1 and the serial GC, no annotation processor lookup on the classpath, no debug info.
+java_compile_config["profiles"] = {
+    "fast": {
+        "compile_command": java_compile_config["compile_command"][:1] + [
+            "-J-XX:TieredStopAtLevel=1", "-J-XX:+UseSerialGC", "-proc:none", "-g:none"
+        ] + java_compile_config["compile_command"][1:]
+    },
+    "judge": {},
 }
 
 python_compile_config = {
@@ -57,9 +136,10 @@ python_compile_config = {
     "solution_wrapper_fname": "main.py",
     "solution_fname": "solution.py",
     "exe_fname": f"__pycache__/main.{sys.implementation.cache_tag}.pyc",
-    "compile_command": (
-        "python3 -m py_compile {solution_wrapper_path} {solution_path}"
-    )
+    # True: compile() in the executor's process and write the .pyc files (bytecode_cache.py), no subprocess.
+    # False: run compile_command.
+    "compile_in_process": True,
+    "compile_command": ["python3", "-m", "py_compile", "{solution_wrapper_path}", "{solution_path}"]
 }
 
 javascript_compile_config = {
@@ -68,6 +148,11 @@ javascript_compile_config = {
     "solution_wrapper_fname": "main.js",
     "solution_fname": "solution.js",
     "exe_fname": "main.js",
+    # True: no compile_command, main.js compiles the solution (vm.compileFunction) in the node launch that runs it and
+    # exits with the execute config's compile_error_exit_code on a syntax error. False: run compile_command first.
+    "check_in_harness": True,
+    # True: main.js keeps the V8 code cache of every solution in JS_CODE_CACHE_DIR.
+    "code_cache": True,
     #"compile_command": None
-    "compile_command": "node --check {solution_path}"
+    "compile_command": ["node", "--check", "{solution_path}"]
 }
\ No newline at end of file
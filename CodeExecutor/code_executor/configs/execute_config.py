@@ -5,18 +5,67 @@ EXECUTION_START_MESSAGE=r"""  ____          _      _____                     _
 | |__| (_) | (_| |  __/ |___ >  <  __/ (__| |_| | || (_) | |   
  \____\___/ \__,_|\___|_____/_/\_\___|\___|\__,_|\__\___/|_|   """
 
+# Command templates are argv lists, executed without a shell. Every item is formatted on its own,
+# so paths never need quoting; items that format to '' (e.g. {options_path}) are dropped.
+# "env" is added to the parent's environment for the harness and its worker pool.
+
 default_env = ["LANG=en_US.UTF-8", "LANGUAGE=en_US:en", "LC_ALL=en_US.UTF-8"]
 
+# Worker pool: extra seconds the parent waits for a worker's response before it kills the worker.
+# (the worker enforces the job timeout itself)
+WORKER_GRACE_SECONDS = 5
+# The parent stops reading a worker response longer than 6 * pipe_limit (JSON escapes one byte into at most 6)
+# + WORKER_RESPONSE_SLACK bytes, kills the worker and reports "output limit exceeded".
+WORKER_RESPONSE_SLACK = 64 * 1024
+
+# CodeExecutor(pipe_limit=None): bytes (MB) the parent reads from one harness (stdout + stderr) before it kills it
+# and reports "output limit exceeded". Of the harness' stderr only the first and last STDERR_KEEP_BYTES / 2 are kept.
+# (the harnesses keep the first and last capture_limit / 2 KB of each testcase's stdout, 64 KB by default)
+PIPE_LIMIT_MB = 256
+STDERR_KEEP_BYTES = 64 * 1024
+
+# ResourceLimits(cgroup=True): parent of the per-run cgroups. It must be a cgroup v2 directory
+# delegated to this user (e.g. by systemd Delegate=yes or a container runtime).
+CGROUP_ROOT = '/sys/fs/cgroup/code_executor'
+
+# ResourceLimits are applied by exec'ing the harness through these commands, not by a preexec_fn (which is not
+# safe in threads, and the shards of parallel_testcases spawn from threads): prlimit(1) (util-linux) sets the
+# rlimits, sh moves the process into its cgroup ("$0": the cgroup.procs path), so every descendant is in it.
+PRLIMIT_COMMAND = ["prlimit"]
+CGROUP_JOIN_COMMAND = ["/bin/sh", "-c", 'echo 0 > "$0" && exec "$@"']
+
+# CodeExecutor(profile=True): sampling interval of the harness profilers, in µs of CPU (JFR rounds it to ms).
+PROFILE_INTERVAL_US = 1000
+
+# CodeExecutor(result_cache=...): per-testcase results expire RESULT_CACHE_TTL seconds after they are stored,
+# and each cache keeps at most RESULT_CACHE_MAX_ENTRIES (least recently used evicted first). See result_cache.py.
+RESULT_CACHE_TTL = 24 * 60 * 60
+RESULT_CACHE_MAX_ENTRIES = 10000
+
+# "error_type" the harnesses report for a testcase whose solution ran out of memory (RLIMIT_AS or the JVM heap).
+# A javascript worker thread over its heap limit is reported by the worker as "memory limit exceeded".
+MEMORY_ERROR_TYPES = [
+    "MemoryError",                  # python
+    "std::bad_alloc",               # c++
+    "java.lang.OutOfMemoryError",   # java
+]
+
+# "error_type" of writes refused by RLIMIT_FSIZE, for runtimes that ignore SIGXFSZ and report EFBIG instead.
+OUTPUT_ERROR_TYPES = [
+    "OSError:EFBIG",                # python
+    "Error:EFBIG",                  # javascript
+]
+
 # C 언어 실행 설정
 c_execute_config = {
-    "command": "{exe_path}",
+    "command": ["{exe_path}"],
     "seccomp_rule": "c_cpp",
     "env": default_env
 }
 
 # C++ 언어 실행 설정
 cpp_execute_config = {
-    "execute_command": "{exe_path} {solution_path} {testcase_path}",
+    "execute_command": ["{exe_path}", "{solution_path}", "{testcase_path}", "{options_path}"],
     "seccomp_rule": "c_cpp",
     "env": default_env
 }
@@ -24,27 +73,56 @@ cpp_execute_config = {
 # Java 언어 실행 설정
 java_execute_config = {
     #"command": "/usr/bin/java -cp {exe_dir} -XX:MaxRAM={max_memory}k -Dfile.encoding=UTF-8 -Djava.security.policy==/etc/java_policy -Djava.awt.headless=true Main",
-    "execute_command": (
-        "java -cp {execute_dir}:{lib_dir}/{jackson_databind}:{lib_dir}/{jackson_core}:{lib_dir}/{jackson_annotations} "
-        "{exe_name} {solution_path} {testcase_path}" # {solution_path} is for debugging.
-    ),
+    # The jars come first: the AppCDS archive is only used when its classpath (the jars) is a prefix of this one.
+    "execute_command": [
+        "java", "-cp", "{lib_dir}/{jackson_databind}:{lib_dir}/{jackson_core}:{lib_dir}/{jackson_annotations}:{execute_dir}",
+        "{exe_name}", "{solution_path}", "{testcase_path}", "{options_path}" # {solution_path} is for debugging.
+    ],
     "seccomp_rule": None,
     "env": default_env,
-    "memory_limit_check_only": 1
+    "memory_limit_check_only": 1,
+    # Worker.java runs in source-file mode; it is compiled in memory once when the worker starts.
+    "worker_fname": "Worker.java",
+    "worker_command": [
+        "java", "-cp", "{lib_dir}/{jackson_databind}:{lib_dir}/{jackson_core}:{lib_dir}/{jackson_annotations}",
+        "{worker_path}"
+    ],
+    # JVM flags of the harness and the worker, inserted after "java". Startup-tuned options, e.g.
+    # "-XX:TieredStopAtLevel=1" (C1 only: faster startup and warmup, slower long-running solutions),
+    # "-XX:+UseSerialGC" (less GC setup and threads), "-Xshare:off" (no class data sharing at all).
+    "jvm_flags": ["-Xshare:auto"],
+    "jvm_version_command": ["java", "-version"],
+    # AppCDS: a dynamic archive of the JDK and Jackson classes the harness loads, built once per
+    # (JDK, jars, Main.java, Worker.java, flags) under PREBUILT_DIR and mapped by every harness and worker JVM.
+    # The training run is the worker (classpath: the jars only) running Main on cds/Solution.java and its testcases.
+    # It is built in a background thread of the first process that compiles or runs Java; JVMs started before it
+    # exists run without it. A JDK that cannot dump one (before 13) gets an empty prebuilt dir, and no archive.
+    "cds_archive": True,
+    "cds_archive_fname": "app.jsa",
+    "cds_training_dir_name": "cds",
+    "cds_training_timeout": 60,
+    "cds_dump_flags": ["-XX:ArchiveClassesAtExit={archive_path}"],
+    # -Xshare:auto falls back to no archive when it does not match (e.g. another JDK); cds logs would go to stdout.
+    "cds_use_flags": ["-XX:SharedArchiveFile={archive_path}", "-Xlog:cds*=off"],
 }
 
 # JavaScript 실행 설정 (컴파일 단계 없음)
 javascript_execute_config = {
-    "execute_command": "node {exe_path} {solution_path} {testcase_path}",
+    "execute_command": ["node", "{exe_path}", "{solution_path}", "{testcase_path}", "{options_path}"],
     "seccomp_rule": None,
     "env": ["NO_COLOR=true"] + default_env,
-    "memory_limit_check_only": 1
+    "memory_limit_check_only": 1,
+    "compile_error_exit_code": 65, # main.js: the solution does not compile (check_in_harness)
+    "worker_fname": "worker.js",
+    "worker_command": ["node", "{worker_path}"]
 }
 
 # Python 언어 실행 설정
 python_execute_config = {
     #"command": "/usr/bin/python3 {exe_path}",
-    "execute_command": "python3 {exe_path} {solution_path} {testcase_path}",
+    "execute_command": ["python3", "{exe_path}", "{solution_path}", "{testcase_path}", "{options_path}"],
     "seccomp_rule": None,
-    "env": ["PYTHONIOENCODING=UTF-8"] + default_env
+    "env": ["PYTHONIOENCODING=UTF-8"] + default_env,
+    "worker_fname": "worker.py",
+    "worker_command": ["python3", "{worker_path}"]
 }
@@ -1,4 +1,5 @@
-import os, shutil
+import os, time, shutil, queue, atexit, threading
+from code_executor.configs.compile_config import TMPFS_BASE_DIR
 
 
 class CleanupPolicy:
@@ -7,10 +8,51 @@ class CleanupPolicy:
     SAFE_ALL = "all"
 
 
+class WorkspacePolicy:
+    DISK = "disk" # execute dirs under base_dir, wrapper assets copied.
+    LINKED = "linked" # execute dirs under base_dir, wrapper assets hardlinked (symlinked across filesystems).
+    TMPFS = "tmpfs" # execute dirs under TMPFS_BASE_DIR (RAM), wrapper assets linked.
+
+    @staticmethod
+    def execute_root(workspace_policy):
+        """Directory that replaces base_dir in EXECUTE_DIR, None to keep base_dir."""
+        return TMPFS_BASE_DIR if workspace_policy == WorkspacePolicy.TMPFS else None
+
+    @staticmethod
+    def links_assets(workspace_policy):
+        return workspace_policy in (WorkspacePolicy.LINKED, WorkspacePolicy.TMPFS)
+
+
+def stage_asset(src, dest, link=False):
+    """
+    Puts a shared read-only asset (file or directory) at dest.
+    link=False copies it. link=True hardlinks a file, or symlinks it when a hardlink is not
+    possible (other filesystem); directories are symlinked. A linked asset is the original:
+    the solution can write through it, so only use links where submissions are sandboxed.
+    """
+    if not link:
+        if os.path.isdir(src):
+            shutil.copytree(src, dest)
+        else:
+            shutil.copy(src, dest)
+        return
+    if os.path.isdir(dest):
+        dest = os.path.join(dest, os.path.basename(src))
+    if not os.path.isdir(src):
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass
+    os.symlink(src, dest)
+
+
 class DirectoryManager:
-    def __init__(self, execute_dir, cleanup_policy=CleanupPolicy.NONE):
+    def __init__(self, execute_dir, cleanup_policy=CleanupPolicy.NONE, background_cleanup=False):
         self.execute_dir = execute_dir
         self.cleanup_policy = cleanup_policy
+        self.background_cleanup = background_cleanup # remove the directory on the cleanup thread
+        self.cleanup_seconds = 0.0 # time spent in __exit__
 
     def __enter__(self):
         os.makedirs(self.execute_dir, exist_ok=True)
@@ -19,20 +61,56 @@ class DirectoryManager:
 
     def __exit__(self, exc_type, exc_value, traceback):
         if self.cleanup_policy == CleanupPolicy.NONE:
+            return
+        start = time.perf_counter()
+        if self.background_cleanup:
+            _cleanup_queue().put((self.execute_dir, self.cleanup_policy))
+        else:
+            cleanup(self.execute_dir, self.cleanup_policy)
+        self.cleanup_seconds = time.perf_counter() - start
+
+
+def cleanup(execute_dir, cleanup_policy):
+    if cleanup_policy == CleanupPolicy.HASH_ONLY:
+        shutil.rmtree(execute_dir, ignore_errors=True)
+
+    elif cleanup_policy == CleanupPolicy.SAFE_ALL:
+        shutil.rmtree(execute_dir, ignore_errors=True)
+        #print(f"Directories removed: {execute_dir}")
+
+        execute_parent = os.path.dirname(execute_dir)
+        try: # 상위 디렉토리가 빈 경우에만 제거 시도 (예: run, submit 디렉토리)
+            os.rmdir(execute_parent)
+            #print(f"Removed parent directory: {execute_parent}")
+        except Exception:
             pass
 
-        elif self.cleanup_policy == CleanupPolicy.HASH_ONLY:
-            shutil.rmtree(self.execute_dir, ignore_errors=True)
-
-        elif self.cleanup_policy == CleanupPolicy.SAFE_ALL:
-            shutil.rmtree(self.execute_dir, ignore_errors=True)
-            #print(f"Directories removed: {self.execute_dir}")
-            
-            execute_parent = os.path.dirname(self.execute_dir)
-            try: # 상위 디렉토리가 빈 경우에만 제거 시도 (예: run, submit 디렉토리)
-                os.rmdir(execute_parent)
-                #print(f"Removed parent directory: {execute_parent}")
-            except Exception:
-                pass
-
-            
\ No newline at end of file
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def _cleanup_queue():
+    """Queue of (execute_dir, cleanup_policy) drained by one daemon thread, started lazily."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = queue.Queue()
+            threading.Thread(target=_cleanup_worker, args=(_queue,), daemon=True).start()
+        return _queue
+
+
+def _cleanup_worker(pending):
+    while True:
+        execute_dir, cleanup_policy = pending.get()
+        try:
+            cleanup(execute_dir, cleanup_policy)
+        finally:
+            pending.task_done()
+
+
+@atexit.register
+def wait_cleanup():
+    """Blocks until every background cleanup queued so far is done (also run at exit)."""
+    if _queue is not None:
+        _queue.join()
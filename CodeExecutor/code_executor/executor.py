@@ -1,26 +1,218 @@
-import json
+import os, json, time
 from code_executor.toolchain import BaseToolChain
-from code_executor.directory_manager import DirectoryManager, CleanupPolicy
+from code_executor.directory_manager import DirectoryManager, CleanupPolicy, WorkspacePolicy
+from code_executor.compile_cache import CompileCache
+from code_executor.limits import ResourceLimits
+from code_executor.testcase_file import TestcaseFormat
+from code_executor.worker_pool import get_worker_pool
+from code_executor.metrics import get_metrics_sink
+from code_executor.result_cache import get_result_cache
+from code_executor.configs.compile_config import COMPILE_CACHE_DIR
+from code_executor.configs.execute_config import PROFILE_INTERVAL_US
 
 # CleanupPolicy options:
 # - NONE: no cleanup performed.
 # - HASH_ONLY: only perform hash-based cleanup.
 # - SAFE_ALL: perform all safe cleanups.
 
+# WorkspacePolicy options (where execute dirs live and how wrapper assets get there):
+# - DISK: under base_dir, wrapper assets (harness source, nlohmann/) copied into every execute dir.
+# - LINKED: under base_dir, assets hardlinked (symlinked across filesystems, nlohmann/ as one directory symlink).
+# - TMPFS: under TMPFS_BASE_DIR (/dev/shm), assets linked. Compile cache and prebuilt dirs stay under base_dir.
+# Linked assets are the originals; use LINKED/TMPFS only where submissions cannot write outside their sandbox.
+
+# background_cleanup:
+# - False: the cleanup policy runs before run() returns.
+# - True: execute dirs are removed on a background thread (directory_manager.wait_cleanup() waits for it).
+
+# compile_cache options:
+# - False: always compile.
+# - True: use a CompileCache under {base_dir}/cache/compile (shared by every executor on the same base_dir).
+# - CompileCache instance: use the given cache (e.g. with a custom max_bytes).
+
+# compile_profile (cpp and java; other languages ignore it, see the "profiles" of compile_config.py):
+# - None: the default profile, "judge".
+# - "fast": quick builds for interactive runs (cpp -O0 -pipe; javac on a C1-only JVM without annotation processing).
+# - "judge": the optimized build submissions are judged with (cpp -O2).
+# - "bench" (cpp only): -O2 -march=native, statically linked.
+# The profile is part of the compile cache key.
+
+# use_pch (C++ only):
+# - False: compile main.cpp, json.hpp and the solution as one translation unit.
+# - True: build pch.hpp.gch and main.o once under {base_dir}/prebuilt, then compile only the solution and link.
+
+# worker_pool options (python, javascript, java):
+# - False: start a new interpreter/JVM per execution.
+# - True: use the process-wide pool of the language (one warm worker per core, started lazily).
+# - WorkerPool instance: use the given pool (e.g. with a custom size).
+
+# parallel_testcases options:
+# - 0: one harness process runs every testcase; timeout covers all of them.
+# - N (or True for the number of cores): one harness process per testcase, N at a time.
+#   timeout applies to each testcase, so a TLE only loses that testcase's result.
+
+# Metrics of every testcase (same schema in all four languages):
+# - utime / stime: CPU time of the solution call in µs (getrusage(RUSAGE_THREAD), ThreadMXBean, process.cpuUsage).
+# - realtime: wall time in seconds.
+# - max_memory: peak RSS in kB during that testcase (the harness resets VmHWM through /proc/self/clear_refs).
+# toolchain.usage holds the whole harness process: wait4 rusage (or the cgroup's accounting) with the same keys.
+
+# Resource limits of the harness process (None: unlimited), see limits.ResourceLimits:
+# - memory_limit (MB), cpu_time_limit (seconds), max_processes, output_limit (MB of files written).
+# - cpus: cores the run may use (cgroup only).
+# - cgroup: False, True ({CGROUP_ROOT}/run-*) or a delegated cgroup v2 directory. Adds memory.peak/cpu.stat
+#   accounting in toolchain.usage and makes memory_limit work for java and javascript.
+# After run(), toolchain.verdict is OK, WA, TLE, MLE, OLE, RE or CE (limits.Verdict).
+# A testcase whose solution raised also gets "error_type", the type of the exception ("MemoryError", "OSError:EFBIG",
+# "std::bad_alloc", "java.lang.OutOfMemoryError", ...); MLE and OLE are judged on it, not on the stderr text.
+# A harness killed by a limit reports stderr "memory limit exceeded", "cpu time limit exceeded" or
+# "output limit exceeded", like "timeout".
+
+# run_iter():
+# - yields (test_case_key, result) as soon as the harness prints it (NDJSON, one testcase per line).
+#   If the harness times out or crashes, the testcases that finished before keep their real results.
+#   After the loop, toolchain.last_run holds the same tuple run() returns.
+
+# Submit mode (compared inside the harness against each testcase's "output"):
+# - check_output: add "passed" to every result that has an expected output.
+# - stop_on_failure: stop at the first wrong answer or runtime error; the rest get stderr "(skipped)". Implies check_output.
+#   (with parallel_testcases every shard holds one testcase, so nothing is skipped)
+# - float_tolerance: numbers match when |actual - expected| <= float_tolerance * max(1, |expected|).
+# - unordered_output: compare a top-level list result ignoring order.
+
+# testcase / testcase_path:
+# - testcase: dict or JSON string of {test_case_key: {"input": {...}, "output": ...}}.
+# - testcase_path (testcase=None): a file instead, for suites too large to hold in memory.
+#   A .ndjson (one {test_case_key: case} object per line) or .msgpack container is copied/linked as it is
+#   and never decoded as a whole; any other file is read as one JSON object. See testcase_file.py.
+# The harnesses read the testcase container one case at a time: their peak memory is the largest case.
+
+# testcase_format options (the container the harness reads, see testcase_file.TestcaseFormat):
+# - None: MSGPACK when testcase_path ends with .msgpack, JSON otherwise.
+# - JSON: NDJSON text.
+# - MSGPACK: length-prefixed MessagePack records. Arrays of numbers under "input" are packed
+#   (int32/int64/float64 blocks) and copied straight into vector<int>, int[]/long[]/double[] or lists,
+#   instead of parsing every number. Results are still printed as NDJSON.
+
+# warmup (java only):
+# - N > 0: the harness calls solution N times on the first testcase before measuring it, so JIT compilation
+#   is not charged to testcase 1. Results and output of those calls are dropped; each call gets fresh arguments.
+
+# Benchmark mode (every language), after the measured run of each testcase that did not raise:
+# - benchmark_repeat: N > 0 runs solution N more times and adds "benchmark" to the result:
+#   {"runs", "min", "median", "p95", "stddev"} of the wall times in seconds (p95 nearest-rank, sample stddev),
+#   plus allocations where the runtime exposes them:
+#   python: "allocated_bytes", tracemalloc peak of one extra, untimed run.
+#   javascript: "allocated_bytes", heapUsed growth over one extra run (a lower bound if GC runs meanwhile).
+#   java: "allocated_bytes" per timed run (thread allocation counter), "gc_count" / "gc_time" (ms) over the timed runs.
+#   cpp: times only.
+# - benchmark_warmup: K untimed runs before the N timed ones.
+# - benchmark_fresh_instance: reload the solution module (python, javascript) or create a new Solution (java)
+#   before every run, so memoization cannot carry over between repetitions. Ignored by cpp.
+# Every run gets a fresh copy of the input; copies and reloads are outside the timed region.
+# Results and output of the repetitions are dropped; a repetition that raises ends the benchmark of that testcase.
+# The timeout covers the repetitions too.
+
+# profile options (every language, see profiling.py):
+# - False: no profiling.
+# - True: sample the solution call every PROFILE_INTERVAL_US µs; N: every N µs.
+#   Each result gets "profile", the samples of its measured run in collapsed-stack format
+#   (profiling.merge_profiles / write_profile merge them for a flamegraph). cpp links with -rdynamic,
+#   which is part of the compile cache key. A testcase killed by the timeout has no result, so no profile:
+#   rerun it alone with a larger timeout to see where its time goes.
+
+# metrics options (see metrics.py for the stages and counters):
+# - None: nothing is reported. toolchain.stages / toolchain.counters still hold the breakdown of the last run.
+# - True: report every run to the process-wide InMemorySink (metrics.get_metrics_sink()).
+# - MetricsSink instance: report to it (InMemorySink, PrometheusTextfileSink, OpenTelemetrySink or your own).
+
+# Output bounds (memory stays bounded however much the solution prints):
+# - capture_limit: KB of each testcase's captured stdout kept by the harness (None: 64). Only the first and last
+#   halves are kept, joined by "... (N bytes truncated) ..." (characters in python and javascript).
+# - pipe_limit: MB the executor reads from the harness (stdout + stderr, None: PIPE_LIMIT_MB). A harness that
+#   writes more, e.g. straight to fd 1, is killed with stderr "output limit exceeded" (verdict OLE).
+#   Of the harness' stderr only the first and last STDERR_KEEP_BYTES / 2 are kept.
+
+# result_cache options (see result_cache.py):
+# - False: every testcase runs.
+# - True: use the process-wide MemoryResultCache (result_cache.get_result_cache()).
+# - ResultCache instance: use it (MemoryResultCache, SqliteResultCache or FileResultCache, e.g. to share results
+#   between processes or with another ttl / max_entries).
+# Testcases whose results are cached (same code, harness, options and case) are not run again: only the others
+# are staged, and when every testcase is cached nothing is compiled or run. Cached results carry "cached": True;
+# their timings and memory are from the run that stored them, so rankings must not use them.
+# Ignored with stop_on_failure. Solutions must be deterministic.
+
 #test one more time
 class CodeExecutor:
-    def __init__(self, language, solution_code, testcase, base_dir=None, timeout=10, cleanup_policy=CleanupPolicy.NONE):
-        self.toolchain = BaseToolChain.create(language, base_dir, timeout)
+    def __init__(self, language, solution_code, testcase, base_dir=None, timeout=10, cleanup_policy=CleanupPolicy.NONE,
+                 compile_cache=False, use_pch=False, worker_pool=False, parallel_testcases=0,
+                 check_output=False, stop_on_failure=False, float_tolerance=0.0, unordered_output=False,
+                 memory_limit=None, cpu_time_limit=None, max_processes=None, output_limit=None, cpus=None,
+                 cgroup=False, workspace_policy=WorkspacePolicy.DISK, background_cleanup=False, testcase_path=None,
+                 testcase_format=None, warmup=0, benchmark_repeat=0, benchmark_warmup=0,
+                 benchmark_fresh_instance=False, profile=False, metrics=None, capture_limit=None, pipe_limit=None,
+                 result_cache=False, compile_profile=None):
+        self.toolchain = BaseToolChain.create(language, base_dir, timeout,
+                                              WorkspacePolicy.execute_root(workspace_policy))
+        self.toolchain.link_assets = WorkspacePolicy.links_assets(workspace_policy)
         self.cleanup_policy = cleanup_policy
+        self.background_cleanup = background_cleanup
         self.toolchain.timeout = timeout
+        if compile_cache is True:
+            compile_cache = CompileCache(COMPILE_CACHE_DIR.format(base_dir=self.toolchain.base_dir))
+        self.toolchain.compile_cache = compile_cache or None
+        if compile_profile is not None:
+            self.toolchain.set_compile_profile(compile_profile)
+        self.toolchain.use_pch = use_pch # C++ only: precompiled json.hpp and harness object.
+        if worker_pool is True:
+            worker_pool = get_worker_pool(self.toolchain.language, self.toolchain.worker_command(),
+                                          env=self.toolchain.execute_env)
+        self.toolchain.worker_pool = worker_pool or None
+        if parallel_testcases is True:
+            parallel_testcases = os.cpu_count() or 1
+        self.toolchain.parallel_testcases = parallel_testcases
+        if metrics is True:
+            metrics = get_metrics_sink()
+        self.metrics = metrics or None
+        if result_cache is True:
+            result_cache = get_result_cache()
+        self.toolchain.result_cache = result_cache or None
+        if check_output or stop_on_failure:
+            self.toolchain.harness_options.update({
+                "check_output": check_output or stop_on_failure,
+                "stop_on_failure": stop_on_failure,
+                "float_tolerance": float_tolerance,
+                "unordered_output": unordered_output,
+            })
+        if warmup:
+            self.toolchain.harness_options["warmup"] = warmup
+        if benchmark_repeat:
+            self.toolchain.harness_options["benchmark"] = {
+                "repeat": benchmark_repeat,
+                "warmup": benchmark_warmup,
+                "fresh_instance": benchmark_fresh_instance,
+            }
+        if profile:
+            self.toolchain.harness_options["profile"] = {
+                "interval": PROFILE_INTERVAL_US if profile is True else profile,
+            }
+        if capture_limit is not None:
+            self.toolchain.harness_options["capture_limit"] = capture_limit * 1024
+        if pipe_limit is not None:
+            self.toolchain.pipe_limit = pipe_limit * 1024 * 1024
+        if memory_limit or cpu_time_limit or max_processes or output_limit or cpus or cgroup:
+            self.toolchain.limits = ResourceLimits(memory_limit, cpu_time_limit, max_processes, output_limit,
+                                                   cpus, cgroup)
         self.toolchain.solution_code = solution_code
         # print("1:", test_case)
         # print("2:", json.dumps(test_case))
         # print("======")
-        if isinstance(testcase, str):
-            self.toolchain.testcase = testcase
-        else:
-            self.toolchain.testcase = json.dumps(testcase)
+        if testcase is None and testcase_path is None:
+            raise ValueError("testcase or testcase_path is required.")
+        self.toolchain.testcase = testcase
+        self.toolchain.testcase_source = testcase_path
+        self.toolchain.set_testcase_format(testcase_format or TestcaseFormat.of(testcase_path))
 
     def compile(self):
         self.toolchain.compile()
@@ -29,6 +221,28 @@ class CodeExecutor:
         self.toolchain.execute()
 
     def run(self):
-        with DirectoryManager(self.toolchain.execute_dir,
-                              cleanup_policy=self.cleanup_policy):
-            return self.toolchain.run()
+        start = time.perf_counter()
+        directory_manager = DirectoryManager(self.toolchain.execute_dir,
+                                             cleanup_policy=self.cleanup_policy,
+                                             background_cleanup=self.background_cleanup)
+        with directory_manager:
+            run = self.toolchain.run()
+        self.record_metrics(directory_manager, start)
+        return run
+
+    def run_iter(self):
+        start = time.perf_counter()
+        directory_manager = DirectoryManager(self.toolchain.execute_dir,
+                                             cleanup_policy=self.cleanup_policy,
+                                             background_cleanup=self.background_cleanup)
+        with directory_manager:
+            yield from self.toolchain.run_iter()
+        self.record_metrics(directory_manager, start)
+
+    def record_metrics(self, directory_manager, start):
+        """Adds cleanup and total to toolchain.stages and reports the run to the metrics sink."""
+        toolchain = self.toolchain
+        toolchain.add_stage("cleanup", directory_manager.cleanup_seconds)
+        toolchain.add_stage("total", time.perf_counter() - start)
+        if self.metrics is not None:
+            self.metrics.record_run(toolchain.language, toolchain.verdict, toolchain.stages, toolchain.counters)
@@ -0,0 +1,266 @@
+import os, time, uuid, signal
+from contextlib import contextmanager
+from code_executor.configs.execute_config import CGROUP_ROOT, MEMORY_ERROR_TYPES, OUTPUT_ERROR_TYPES
+from code_executor.configs.execute_config import PRLIMIT_COMMAND, CGROUP_JOIN_COMMAND
+
+
+class Verdict:
+    OK = "OK"
+    WRONG_ANSWER = "WA"
+    TIME_LIMIT_EXCEEDED = "TLE"
+    MEMORY_LIMIT_EXCEEDED = "MLE"
+    OUTPUT_LIMIT_EXCEEDED = "OLE"
+    RUNTIME_ERROR = "RE"
+    COMPILE_ERROR = "CE"
+
+
+class ResourceLimits:
+    """
+    Per-execution limits of the harness process (compilers are not limited).
+
+    - memory_limit (MB): RLIMIT_AS, and memory.max of the cgroup.
+      Languages with "memory_limit_check_only" (java, javascript) skip RLIMIT_AS: the JVM and V8
+      reserve far more address space than they use. Their memory is limited by the cgroup only.
+    - cpu_time_limit (seconds): RLIMIT_CPU. The kernel sends SIGXCPU when it is used up.
+    - max_processes: RLIMIT_NPROC (per user, not enforced for root) and pids.max of the cgroup.
+    - output_limit (MB): RLIMIT_FSIZE, the largest file the solution can write.
+    - cpus: cpu.max of the cgroup (e.g. 1 = one core). cgroup only.
+    - cgroup: False, True (a child of CGROUP_ROOT) or the path of a delegated cgroup v2 directory.
+      Every run gets its own child cgroup; its memory.peak and cpu.stat are reported as usage.
+    """
+    def __init__(self, memory_limit=None, cpu_time_limit=None, max_processes=None, output_limit=None,
+                 cpus=None, cgroup=False):
+        self.memory_limit = memory_limit
+        self.cpu_time_limit = cpu_time_limit
+        self.max_processes = max_processes
+        self.output_limit = output_limit
+        self.cpus = cpus
+        if cgroup is True:
+            cgroup = CGROUP_ROOT
+        self.cgroup_root = cgroup or None
+
+    def rlimits(self, rlimit_as=True):
+        """{RLIMIT name: value} to apply in the child process."""
+        rlimits = {}
+        if self.memory_limit and rlimit_as:
+            rlimits["RLIMIT_AS"] = int(self.memory_limit * 1024 * 1024)
+        if self.cpu_time_limit:
+            # soft limit sends SIGXCPU, the hard limit one second later SIGKILL
+            rlimits["RLIMIT_CPU"] = int(-(-self.cpu_time_limit // 1))
+        if self.max_processes:
+            rlimits["RLIMIT_NPROC"] = int(self.max_processes)
+        if self.output_limit:
+            rlimits["RLIMIT_FSIZE"] = int(self.output_limit * 1024 * 1024)
+        return rlimits
+
+    def wrap_command(self, command, rlimit_as=True, cgroup=None):
+        """command exec'd through PRLIMIT_COMMAND with the rlimits and CGROUP_JOIN_COMMAND into cgroup."""
+        rlimits = self.rlimits(rlimit_as)
+        if rlimits:
+            options = []
+            for name, value in rlimits.items():
+                hard = value + 1 if name == "RLIMIT_CPU" else value
+                options.append(f"--{name[len('RLIMIT_'):].lower()}={value}:{hard}")
+            command = PRLIMIT_COMMAND + options + ["--"] + command
+        if cgroup is not None:
+            command = CGROUP_JOIN_COMMAND + [os.path.join(cgroup.path, "cgroup.procs")] + command
+        return command
+
+    @contextmanager
+    def cgroup(self):
+        """Yields a Cgroup for one run, or None without the cgroup backend."""
+        if self.cgroup_root is None:
+            yield None
+            return
+        cgroup = Cgroup(self.cgroup_root)
+        cgroup.create(self)
+        try:
+            yield cgroup
+        finally:
+            cgroup.destroy()
+
+
+class Cgroup:
+    """A cgroup v2 child directory for one run: cgroup_root/run-{uuid}."""
+    _enabled_roots = set()
+
+    def __init__(self, cgroup_root):
+        self.cgroup_root = cgroup_root
+        self.path = os.path.join(cgroup_root, f"run-{uuid.uuid4().hex}")
+
+    def create(self, limits):
+        self._enable_controllers()
+        os.mkdir(self.path)
+        if limits.memory_limit:
+            self._write("memory.max", int(limits.memory_limit * 1024 * 1024))
+            self._write("memory.swap.max", 0, optional=True)
+        if limits.cpus:
+            period = 100000
+            self._write("cpu.max", f"{int(limits.cpus * period)} {period}")
+        if limits.max_processes:
+            self._write("pids.max", int(limits.max_processes))
+
+    def _enable_controllers(self):
+        if self.cgroup_root in Cgroup._enabled_roots:
+            return
+        os.makedirs(self.cgroup_root, exist_ok=True)
+        with open(os.path.join(self.cgroup_root, "cgroup.controllers")) as f:
+            available = f.read().split()
+        wanted = [f"+{name}" for name in ("memory", "cpu", "pids") if name in available]
+        if wanted:
+            with open(os.path.join(self.cgroup_root, "cgroup.subtree_control"), "w") as f:
+                f.write(" ".join(wanted))
+        Cgroup._enabled_roots.add(self.cgroup_root)
+
+    def usage(self):
+        """
+        max_memory (kB), utime/stime (µs) and oom_kill of every process that ran in the cgroup.
+        Missing files (older kernels, disabled controllers) leave their keys out.
+        """
+        usage = {}
+        peak = self._read("memory.peak")
+        if peak is not None:
+            usage["max_memory"] = int(peak) // 1024
+        cpu_stat = self._read_keyed("cpu.stat")
+        if "user_usec" in cpu_stat:
+            usage["utime"] = cpu_stat["user_usec"]
+            usage["stime"] = cpu_stat["system_usec"]
+        memory_events = self._read_keyed("memory.events")
+        if "oom_kill" in memory_events:
+            usage["oom_kill"] = memory_events["oom_kill"]
+        return usage
+
+    def destroy(self):
+        if not os.path.isdir(self.path):
+            return
+        if os.path.exists(os.path.join(self.path, "cgroup.kill")):
+            self._write("cgroup.kill", 1)
+        else:
+            for pid in (self._read("cgroup.procs") or "").split():
+                try:
+                    os.kill(int(pid), signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+        for _ in range(100): # rmdir fails with EBUSY until the killed processes are gone
+            try:
+                os.rmdir(self.path)
+                return
+            except OSError:
+                time.sleep(0.01)
+
+    def _write(self, name, value, optional=False):
+        try:
+            with open(os.path.join(self.path, name), "w") as f:
+                f.write(str(value))
+        except OSError:
+            if not optional:
+                raise
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.path, name)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def _read_keyed(self, name):
+        values = {}
+        for line in (self._read(name) or "").splitlines():
+            key, _, value = line.partition(" ")
+            values[key] = int(value)
+        return values
+
+
+class HeadTailBuffer:
+    """
+    Keeps the first and the last limit // 2 bytes written to it; the bytes in between are only counted.
+    Its memory stays at limit however much is written.
+    """
+    def __init__(self, limit):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.dropped = 0
+
+    def write(self, data):
+        if len(self.head) < self.head_limit:
+            take = self.head_limit - len(self.head)
+            self.head += data[:take]
+            data = data[take:]
+        if data:
+            self.tail += data
+            excess = len(self.tail) - self.tail_limit
+            if excess > 0:
+                del self.tail[:excess]
+                self.dropped += excess
+
+    def getvalue(self):
+        if not self.dropped:
+            return bytes(self.head + self.tail)
+        return bytes(self.head) + f"\n... ({self.dropped} bytes truncated) ...\n".encode() + bytes(self.tail)
+
+
+def rusage_usage(rusage):
+    """usage dict of a wait4 rusage: the process and the children it waited for."""
+    return {
+        "max_memory": rusage.ru_maxrss, # kB
+        "utime": round(rusage.ru_utime * 1e6), # µs
+        "stime": round(rusage.ru_stime * 1e6),
+    }
+
+
+def merge_usage(total, usage):
+    """Usage of several runs (e.g. shards): peak memory is the max, cpu times and oom kills add up."""
+    for key, value in usage.items():
+        if key == "max_memory":
+            total[key] = max(total.get(key, 0), value)
+        else:
+            total[key] = total.get(key, 0) + value
+    return total
+
+
+def limit_message(returncode, usage=None):
+    """stderr for a harness killed by a limit, in the style of "timeout". None if no limit was hit."""
+    if usage and usage.get("oom_kill"):
+        return "memory limit exceeded"
+    if returncode == -signal.SIGXCPU or returncode == 128 + signal.SIGXCPU:
+        return "cpu time limit exceeded"
+    if returncode == -signal.SIGXFSZ or returncode == 128 + signal.SIGXFSZ:
+        return "output limit exceeded"
+    return None
+
+
+def judge(run, limits=None, usage=None):
+    """
+    Verdict of a (stage, returncode, results, stderr) run tuple.
+    MLE and OLE come from the limit statuses ("memory limit exceeded", ...), the error_type the harness reported
+    for a testcase, or, for a harness that failed without one (e.g. a fatal V8 heap error), from a peak memory
+    that reached memory_limit.
+    """
+    stage, returncode, results, stderr = run
+    if stage == "compile":
+        return Verdict.COMPILE_ERROR
+
+    case_errors = [result.get("stderr") or "" for result in results.values()]
+    errors = [stderr or ""] + case_errors
+    if "timeout" in errors or "cpu time limit exceeded" in errors:
+        return Verdict.TIME_LIMIT_EXCEEDED
+    if limits is not None and limits.cpu_time_limit and usage and "utime" in usage:
+        if (usage["utime"] + usage["stime"]) / 1e6 >= limits.cpu_time_limit:
+            return Verdict.TIME_LIMIT_EXCEEDED
+    error_types = {result.get("error_type") for result in results.values()}
+    failed = returncode or any(error and error != "(skipped)" for error in case_errors)
+    if "memory limit exceeded" in errors or error_types.intersection(MEMORY_ERROR_TYPES):
+        return Verdict.MEMORY_LIMIT_EXCEEDED
+    if failed and limits is not None and limits.memory_limit:
+        peak = max([(usage or {}).get("max_memory", 0)] + [result.get("max_memory") or 0 for result in results.values()])
+        if peak >= limits.memory_limit * 1024:
+            return Verdict.MEMORY_LIMIT_EXCEEDED
+    if "output limit exceeded" in errors or error_types.intersection(OUTPUT_ERROR_TYPES):
+        return Verdict.OUTPUT_LIMIT_EXCEEDED
+    if failed:
+        return Verdict.RUNTIME_ERROR
+    if any(result.get("passed") is False for result in results.values()):
+        return Verdict.WRONG_ANSWER
+    return Verdict.OK
@@ -0,0 +1,184 @@
+import os, threading
+from code_executor.limits import Verdict
+
+# Metrics of the executor itself (not of the solution), reported once per run by CodeExecutor(metrics=...).
+# Stages, in seconds (toolchain.stages holds the breakdown of the last run):
+# - prepare: staging the solution, harness sources and testcase container into execute_dir (and result cache lookups).
+# - compile: the compiler, or restoring the compile cache.
+# - spawn: starting the harness process (Popen / create_subprocess_exec), summed over shards.
+# - execute: the harness, from spawn to the end of its output, less parse.
+# - solution: the sum of the testcases' realtime, the part of execute spent in the solution.
+# - parse: decoding the harness' result lines, filling in missing results and judging.
+# - cleanup: DirectoryManager.__exit__ (only queueing with background_cleanup).
+# - total: the whole run() call.
+# Counters, per run: runs{verdict}, compile_cache_hits, compile_cache_misses, compile_failures, timeouts,
+# bytes_written (bytes of files created in execute_dir before the harness starts; links are not counted) and
+# result_cache_hits / result_cache_misses (testcases, with a result cache).
+# Every metric is labelled with the language.
+
+
+class MetricsSink:
+    """
+    Receives the metrics of every run. Subclasses implement observe/add (and flush if they buffer).
+    Sinks are shared by executors on many threads, so they must be thread-safe.
+    """
+
+    def observe(self, name, value, labels):
+        """One sample of a distribution (stage durations in seconds)."""
+        pass
+
+    def add(self, name, value, labels):
+        """Increments a counter."""
+        pass
+
+    def flush(self):
+        pass
+
+    def record_run(self, language, verdict, stages, counters):
+        labels = {"language": language}
+        for stage, seconds in stages.items():
+            self.observe("stage_seconds", seconds, {**labels, "stage": stage})
+        self.add("runs", 1, {**labels, "verdict": verdict})
+        counters = dict(counters)
+        counters["compile_failures"] = int(verdict == Verdict.COMPILE_ERROR)
+        counters["timeouts"] = int(verdict == Verdict.TIME_LIMIT_EXCEEDED)
+        for name, value in counters.items():
+            if value:
+                self.add(name, value, labels)
+        self.flush()
+
+
+class InMemorySink(MetricsSink):
+    """Keeps counters and {count, sum, min, max} of every observed metric. snapshot() returns a copy."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {} # (name, sorted label items) -> value
+        self.summaries = {} # (name, sorted label items) -> {"count", "sum", "min", "max"}
+
+    def observe(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            summary = self.summaries.get(key)
+            if summary is None:
+                self.summaries[key] = {"count": 1, "sum": value, "min": value, "max": value}
+            else:
+                summary["count"] += 1
+                summary["sum"] += value
+                summary["min"] = min(summary["min"], value)
+                summary["max"] = max(summary["max"], value)
+
+    def add(self, name, value, labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters), {key: dict(summary) for key, summary in self.summaries.items()}
+
+
+class PrometheusTextfileSink(InMemorySink):
+    """
+    Rewrites path in the Prometheus text format after every run, for node_exporter's textfile collector.
+    Counters become {prefix}_{name}_total, observed metrics {prefix}_{name}_sum/_count summaries.
+    The file is replaced atomically, so the collector never reads half of it.
+    """
+
+    def __init__(self, path, prefix="code_executor"):
+        super().__init__()
+        self.path = path
+        self.prefix = prefix
+        self._write_lock = threading.Lock()
+
+    def render(self):
+        counters, summaries = self.snapshot()
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{self.prefix}_{name}_total{_labels(labels)} {value}")
+        for name in sorted({name for name, _ in summaries}):
+            lines.append(f"# TYPE {self.prefix}_{name} summary")
+            for (metric, labels), summary in sorted(summaries.items()):
+                if metric == name:
+                    lines.append(f"{self.prefix}_{name}_sum{_labels(labels)} {summary['sum']}")
+                    lines.append(f"{self.prefix}_{name}_count{_labels(labels)} {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+    def flush(self):
+        with self._write_lock:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+
+
+class OpenTelemetrySink(MetricsSink):
+    """
+    Reports to an OpenTelemetry meter: observed metrics as histograms, counters as counters,
+    named {prefix}.{name} with the labels as attributes.
+    meter: any object with create_histogram/create_counter; None uses opentelemetry.metrics.get_meter,
+    which needs the opentelemetry-api package (the exporter is configured by the application).
+    """
+
+    def __init__(self, meter=None, prefix="code_executor"):
+        if meter is None:
+            from opentelemetry import metrics
+            meter = metrics.get_meter("code_executor")
+        self.meter = meter
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._instruments = {}
+
+    def _instrument(self, kind, name):
+        with self._lock:
+            if (kind, name) not in self._instruments:
+                if kind == "histogram":
+                    unit = "s" if name.endswith("seconds") else "1"
+                    instrument = self.meter.create_histogram(f"{self.prefix}.{name}", unit=unit)
+                else:
+                    instrument = self.meter.create_counter(f"{self.prefix}.{name}")
+                self._instruments[(kind, name)] = instrument
+            return self._instruments[(kind, name)]
+
+    def observe(self, name, value, labels):
+        self._instrument("histogram", name).record(value, attributes=labels)
+
+    def add(self, name, value, labels):
+        self._instrument("counter", name).add(value, attributes=labels)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(items):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+_default_sink = None
+_default_sink_lock = threading.Lock()
+
+
+def get_metrics_sink():
+    """Process-wide InMemorySink, used by CodeExecutor(metrics=True)."""
+    global _default_sink
+    with _default_sink_lock:
+        if _default_sink is None:
+            _default_sink = InMemorySink()
+        return _default_sink
+
+
+def written_bytes(path):
+    """Bytes of the regular files under path with a single link: files written there, not links to other files."""
+    total = 0
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            total += written_bytes(entry.path)
+        elif entry.is_file(follow_symlinks=False):
+            stat = entry.stat(follow_symlinks=False)
+            if stat.st_nlink == 1:
+                total += stat.st_size
+    return total
@@ -0,0 +1,213 @@
+import sys, struct
+from array import array
+
+# The MessagePack subset of binary testcase containers (see testcase_file.py), no third-party package.
+# Packed arrays are ext values: a flat list of numbers as one little-endian block, which the harnesses
+# copy straight into vector<int>/int[]/list instead of parsing every number.
+# The encoder always writes ext 8/16/32 (never fixext), so decoders only handle 0xc7-0xc9.
+PACKED_INT32 = 1
+PACKED_INT64 = 2
+PACKED_FLOAT64 = 3
+
+_PACKED_TYPECODES = {PACKED_INT32: 'i', PACKED_INT64: 'q', PACKED_FLOAT64: 'd'}
+_INT32_RANGE = (-2 ** 31, 2 ** 31 - 1)
+_INT64_RANGE = (-2 ** 63, 2 ** 63 - 1)
+
+
+def packb(obj, pack_arrays=False):
+    """MessagePack bytes of obj. pack_arrays: write lists of numbers as packed arrays."""
+    out = bytearray()
+    _pack(obj, out, pack_arrays)
+    return bytes(out)
+
+
+def pack_testcase(test_case_key, test_case):
+    """One {test_case_key: test_case} record. Only the "input" arrays are packed; "output" stays plain."""
+    out = bytearray()
+    _pack_map_header(1, out)
+    _pack(test_case_key, out, False)
+    _pack_map_header(len(test_case), out)
+    for key, value in test_case.items():
+        _pack(key, out, False)
+        _pack(value, out, key == "input")
+    return bytes(out)
+
+
+def unpackb(data):
+    value, end = _unpack(data, 0)
+    if end != len(data):
+        raise ValueError("extra data after the MessagePack value")
+    return value
+
+
+def _pack(obj, out, pack_arrays):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True or obj is False:
+        out.append(0xc3 if obj else 0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(0xcb)
+        out += struct.pack('>d', obj)
+    elif isinstance(obj, str):
+        data = obj.encode('utf-8')
+        if len(data) < 32:
+            out.append(0xa0 | len(data))
+        else:
+            _pack_length(len(data), out, 0xd9, 0xda, 0xdb)
+        out += data
+    elif isinstance(obj, (bytes, bytearray)):
+        _pack_length(len(obj), out, 0xc4, 0xc5, 0xc6)
+        out += obj
+    elif isinstance(obj, (list, tuple)):
+        if pack_arrays and _pack_array(obj, out):
+            return
+        if len(obj) < 16:
+            out.append(0x90 | len(obj))
+        else:
+            _pack_length(len(obj), out, None, 0xdc, 0xdd)
+        for item in obj:
+            _pack(item, out, pack_arrays)
+    elif isinstance(obj, dict):
+        _pack_map_header(len(obj), out)
+        for key, value in obj.items():
+            _pack(key, out, False)
+            _pack(value, out, pack_arrays)
+    else:
+        raise TypeError(f"cannot pack {type(obj).__name__}")
+
+
+def _pack_array(items, out):
+    """Writes items as one packed ext value if they are all ints (or all floats). Returns False otherwise."""
+    if not items:
+        return False
+    if all(type(item) is int for item in items):
+        low, high = min(items), max(items)
+        if _INT32_RANGE[0] <= low and high <= _INT32_RANGE[1]:
+            ext_type = PACKED_INT32
+        elif _INT64_RANGE[0] <= low and high <= _INT64_RANGE[1]:
+            ext_type = PACKED_INT64
+        else:
+            return False
+    elif all(type(item) is float for item in items):
+        ext_type = PACKED_FLOAT64
+    else:
+        return False
+    block = array(_PACKED_TYPECODES[ext_type], items)
+    if sys.byteorder != 'little':
+        block.byteswap()
+    data = block.tobytes()
+    _pack_length(len(data), out, 0xc7, 0xc8, 0xc9)
+    out.append(ext_type)
+    out += data
+    return True
+
+
+def _pack_int(value, out):
+    if 0 <= value < 0x80 or -32 <= value < 0:
+        out += struct.pack('>b' if value < 0 else '>B', value)
+    elif 0 <= value < 2 ** 64:
+        for code, fmt, limit in ((0xcc, '>B', 2 ** 8), (0xcd, '>H', 2 ** 16), (0xce, '>I', 2 ** 32), (0xcf, '>Q', 2 ** 64)):
+            if value < limit:
+                out.append(code)
+                out += struct.pack(fmt, value)
+                return
+    elif -2 ** 63 <= value < 0:
+        for code, fmt, limit in ((0xd0, '>b', 2 ** 7), (0xd1, '>h', 2 ** 15), (0xd2, '>i', 2 ** 31), (0xd3, '>q', 2 ** 63)):
+            if value >= -limit:
+                out.append(code)
+                out += struct.pack(fmt, value)
+                return
+    else:
+        raise OverflowError(f"{value} does not fit in 64 bits")
+
+
+def _pack_map_header(size, out):
+    if size < 16:
+        out.append(0x80 | size)
+    else:
+        _pack_length(size, out, None, 0xde, 0xdf)
+
+
+def _pack_length(length, out, code8, code16, code32):
+    if code8 is not None and length < 2 ** 8:
+        out.append(code8)
+        out += struct.pack('>B', length)
+    elif length < 2 ** 16:
+        out.append(code16)
+        out += struct.pack('>H', length)
+    else:
+        out.append(code32)
+        out += struct.pack('>I', length)
+
+
+_FIXED = {
+    0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+    0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q',
+    0xca: '>f', 0xcb: '>d',
+}
+_LENGTHS = {0xc4: '>B', 0xc5: '>H', 0xc6: '>I', 0xd9: '>B', 0xda: '>H', 0xdb: '>I', 0xc7: '>B', 0xc8: '>H',
+            0xc9: '>I', 0xdc: '>H', 0xdd: '>I', 0xde: '>H', 0xdf: '>I'}
+
+
+def _unpack(data, pos):
+    code = data[pos]
+    pos += 1
+    if code <= 0x7f:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if 0x80 <= code <= 0x8f:
+        return _unpack_map(data, pos, code & 0x0f)
+    if 0x90 <= code <= 0x9f:
+        return _unpack_array(data, pos, code & 0x0f)
+    if 0xa0 <= code <= 0xbf:
+        end = pos + (code & 0x1f)
+        return data[pos:end].decode('utf-8'), end
+    if code == 0xc0:
+        return None, pos
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, pos
+    if code in _FIXED:
+        fmt = _FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + struct.calcsize(fmt)
+    if code not in _LENGTHS:
+        raise ValueError(f"unsupported MessagePack type 0x{code:02x}")
+    fmt = _LENGTHS[code]
+    length = struct.unpack_from(fmt, data, pos)[0]
+    pos += struct.calcsize(fmt)
+    if code in (0xdc, 0xdd):
+        return _unpack_array(data, pos, length)
+    if code in (0xde, 0xdf):
+        return _unpack_map(data, pos, length)
+    if code in (0xc7, 0xc8, 0xc9):
+        ext_type = data[pos]
+        pos += 1
+        if ext_type not in _PACKED_TYPECODES:
+            raise ValueError(f"unsupported ext type {ext_type}")
+        block = array(_PACKED_TYPECODES[ext_type])
+        block.frombytes(data[pos:pos + length])
+        if sys.byteorder != 'little':
+            block.byteswap()
+        return block.tolist(), pos + length
+    end = pos + length
+    if code in (0xd9, 0xda, 0xdb):
+        return data[pos:end].decode('utf-8'), end
+    return bytes(data[pos:end]), end
+
+
+def _unpack_array(data, pos, size):
+    items = []
+    for _ in range(size):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(data, pos, size):
+    items = {}
+    for _ in range(size):
+        key, pos = _unpack(data, pos)
+        items[key], pos = _unpack(data, pos)
+    return items, pos
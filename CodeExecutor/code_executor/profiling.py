@@ -0,0 +1,43 @@
+from collections import Counter
+
+# Profiles of CodeExecutor(profile=...): every harness adds "profile" to each testcase result, the samples of
+# its solution call in collapsed-stack format, one "outer;...;inner count" line per distinct stack
+# (the input of flamegraph.pl, speedscope, inferno). Frames are named by the runtime's own profiler:
+# - cpp: demangled function (SIGPROF sampler with backtrace(), executable linked with -rdynamic).
+# - python: "qualname (file:first line)" (SIGPROF sampler over the interpreter's frames).
+# - javascript: "name (file:line)" (V8 CPU profiler through the inspector, like --cpu-prof).
+# - java: "Class.method" (JFR jdk.ExecutionSample).
+# Counts are in sampling intervals. cpp and python sample CPU time through SIGPROF, whose timer only fires on
+# kernel ticks (and python handles signals between bytecodes), so each sample weighs the thread CPU time since
+# the previous one. javascript and java count their profiler's samples.
+
+
+def parse_collapsed(text):
+    """Counter {stack: samples} of a collapsed-stack text."""
+    stacks = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rpartition(" ")
+        if stack and count.isdigit():
+            stacks[stack] += int(count)
+    return stacks
+
+
+def format_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def merge_profiles(results, prefix_keys=False):
+    """
+    One collapsed-stack text of the "profile" of every result ({test_case_key: result}, as run() returns).
+    prefix_keys: put the test_case_key as the root frame, so each testcase is its own tower in a flamegraph.
+    """
+    stacks = Counter()
+    for test_case_key, result in results.items():
+        for stack, count in parse_collapsed(result.get("profile") or "").items():
+            stacks[f"{test_case_key};{stack}" if prefix_keys else stack] += count
+    return format_collapsed(stacks)
+
+
+def write_profile(results, path, prefix_keys=False):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(merge_profiles(results, prefix_keys))
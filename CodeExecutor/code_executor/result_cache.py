@@ -0,0 +1,214 @@
+import os, json, time, uuid, fcntl, sqlite3, hashlib, threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from code_executor.configs.execute_config import RESULT_CACHE_TTL, RESULT_CACHE_MAX_ENTRIES
+
+# Per-testcase results of earlier runs (CodeExecutor(result_cache=...)), for re-running the same code on the
+# same testcases. The key of a case covers everything its result depends on: language, solution source,
+# harness sources (wrapper_version), compile/execute configs, harness options, resource limits, timeout,
+# pipe_limit and the case itself (input and expected output, not its key). The toolchain only stages the cases missing from the cache;
+# cached results come back with "cached": True, their timings and memory are those of the run that stored them.
+# Only results the harness reported are stored: no default results of a killed harness, no "(skipped)" cases,
+# nothing in stop_on_failure runs (whether a case is skipped depends on the others).
+# Solutions must be deterministic for the cache to be correct.
+
+
+class ResultCache:
+    """
+    Maps case keys to result dicts. Subclasses implement get_many/put_many; they must be thread-safe.
+    Entries expire ttl seconds after they are stored; beyond max_entries the least recently used are evicted.
+    """
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get_many(self, keys):
+        """{key: result} of the keys that are stored and not expired."""
+        return {}
+
+    def put_many(self, results):
+        """Stores {key: result}."""
+        pass
+
+
+class MemoryResultCache(ResultCache):
+    """In this process only (an OrderedDict in LRU order)."""
+    def __init__(self, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        super().__init__(ttl, max_entries)
+        self._entries = OrderedDict() # key -> (expires, result)
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[key]
+                    continue
+                self._entries.move_to_end(key)
+                found[key] = entry[1]
+        return found
+
+    def put_many(self, results):
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, result in results.items():
+                self._entries[key] = (expires, result)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteResultCache(ResultCache):
+    """One SQLite database, which several processes can share (sqlite3 locks the file)."""
+    def __init__(self, path, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        super().__init__(ttl, max_entries)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, result TEXT, expires REAL, used REAL)"
+            )
+            self._connection.execute("CREATE INDEX IF NOT EXISTS results_used ON results (used)")
+
+    def get_many(self, keys):
+        keys = list(keys)
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), 500): # SQLite's bound parameter limit
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, result FROM results WHERE expires > ? AND key IN ({placeholders})", [now, *chunk]
+                )
+                found.update((key, json.loads(result)) for key, result in rows)
+                self._connection.execute(
+                    f"UPDATE results SET used = ? WHERE key IN ({placeholders})", [now, *chunk]
+                )
+        return found
+
+    def put_many(self, results):
+        now = time.time()
+        rows = [(key, json.dumps(result, ensure_ascii=False), now + self.ttl, now) for key, result in results.items()]
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+                self._connection.execute("DELETE FROM results WHERE expires <= ?", (now,))
+                self._connection.execute(
+                    "DELETE FROM results WHERE key IN "
+                    "(SELECT key FROM results ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_entries,)
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class FileResultCache(ResultCache):
+    """
+    One JSON file per entry under cache_dir, published with an atomic rename. The mtime is the last access time;
+    eviction runs under an exclusive flock like CompileCache, so several workers can share one directory.
+    """
+    def __init__(self, cache_dir, ttl=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES):
+        super().__init__(ttl, max_entries)
+        self.cache_dir = cache_dir
+        self.lock_path = os.path.join(cache_dir, '.lock')
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    @contextmanager
+    def _lock(self, exclusive=False):
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_many(self, keys):
+        now = time.time()
+        found = {}
+        with self._lock():
+            for key in keys:
+                try:
+                    with open(self._path(key), "r", encoding="utf-8") as f:
+                        entry = json.load(f)
+                except (OSError, ValueError): # missing, or evicted while reading
+                    continue
+                if entry["expires"] <= now:
+                    _remove(self._path(key))
+                    continue
+                found[key] = entry["result"]
+                os.utime(self._path(key))
+        return found
+
+    def put_many(self, results):
+        expires = time.time() + self.ttl
+        for key, result in results.items():
+            tmp_path = os.path.join(self.cache_dir, f'.tmp-{uuid.uuid4().hex}')
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"expires": expires, "result": result}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        self.evict()
+
+    def evict(self):
+        # Expired entries are removed when they are read; entries nobody reads again age out by LRU.
+        with self._lock(exclusive=True):
+            entries = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(self.cache_dir)
+                       if not entry.name.startswith('.')]
+            if len(entries) <= self.max_entries:
+                return
+            for _, path in sorted(entries)[:len(entries) - self.max_entries]:
+                _remove(path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+_wrapper_versions = {}
+_wrapper_versions_lock = threading.Lock()
+
+
+def wrapper_version(directory):
+    """sha256 of the harness sources in directory (its regular files), computed once per process."""
+    with _wrapper_versions_lock:
+        if directory not in _wrapper_versions:
+            digest = hashlib.sha256()
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if os.path.isfile(path):
+                    with open(path, "rb") as f:
+                        digest.update(name.encode() + b"\0" + hashlib.sha256(f.read()).digest())
+            _wrapper_versions[directory] = digest.hexdigest()
+        return _wrapper_versions[directory]
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide MemoryResultCache, used by CodeExecutor(result_cache=True)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = MemoryResultCache()
+        return _default_cache
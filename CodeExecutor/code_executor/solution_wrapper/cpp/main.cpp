@@ -6,15 +6,25 @@
 #include <stdexcept>
 #include <string>
 #include <map>
+#include <algorithm>
+#include <cmath>
 #include <chrono>
 #include <thread>
 #include <csignal>
 #include <sys/types.h>
 #include <sys/wait.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <execinfo.h>
+#include <cxxabi.h>
+#include <cerrno>
 #include <unistd.h>
 #include <fcntl.h>
 #include "nlohmann/json.hpp"
+#include "packed_args.hpp"
+#ifndef CODE_EXECUTOR_SEPARATE_SOLUTION
 #include "solution.cpp"  // 실제로는 컴파일 시점에 포함된다고 가정
+#endif
 
 using json = nlohmann::ordered_json;
 using namespace std;
@@ -22,9 +32,9 @@ using namespace std;
 
 
 
-
-
-
+#ifdef CODE_EXECUTOR_SEPARATE_SOLUTION
+json solutionWrapper(json args); // defined in the solution unit (see pch.hpp)
+#endif
 
 void handleSIGFPE(int signum) {
     std::cerr << "Caught SIGFPE ";
@@ -32,31 +42,27 @@ void handleSIGFPE(int signum) {
     //std::exit(EXIT_FAILURE);
 }
 
+// 현재 스레드의 (utime, stime)을 µs 단위로 반환 (getrusage(RUSAGE_THREAD), clock tick보다 정밀하다)
 std::tuple<long, long> get_cpu_times() {
-    ifstream statFile("/proc/self/stat");
-    if(!statFile.is_open()) {
+    struct rusage usage;
+    if (getrusage(RUSAGE_THREAD, &usage) != 0) {
         return {0, 0};
     }
-    string content;
-    getline(statFile, content);
+    long utime = usage.ru_utime.tv_sec * 1000000L + usage.ru_utime.tv_usec;
+    long stime = usage.ru_stime.tv_sec * 1000000L + usage.ru_stime.tv_usec;
+    return {utime, stime};
+}
 
-    vector<string> tokens;
-    {
-        istringstream iss(content);
-        string token;
-        while (iss >> token) {
-            tokens.push_back(token);
-        }
-    }
-    // 최소 15개 이상의 필드가 있어야 utime, stime을 파싱할 수 있음
-    if (tokens.size() < 15) {
-        return {0, 0};
+// /proc/self/clear_refs에 5를 써서 VmHWM(peak RSS)을 현재 RSS로 되돌린다 (Linux 4.0+)
+// 테스트케이스마다 리셋해야 max_memory가 그 테스트케이스의 최대치가 된다
+void reset_peak_memory() {
+    int fd = open("/proc/self/clear_refs", O_WRONLY);
+    if (fd < 0) {
+        return;
     }
-
-    // tokens[13] -> utime, tokens[14] -> stime
-    long utime = stol(tokens[13]);
-    long stime = stol(tokens[14]);
-    return {utime, stime};
+    ssize_t written = write(fd, "5", 1);
+    (void) written;
+    close(fd);
 }
 
 long get_vmhwm() {
@@ -80,98 +86,536 @@ long get_vmhwm() {
     return 0;
 }
 
+// profile 모드: CPU 시간 interval µs마다 SIGPROF(setitimer ITIMER_PROF)를 받아 backtrace를 기록하는 샘플러.
+// 시그널 핸들러는 미리 잡아둔 버퍼에 주소만 쓰고, 이름 변환(backtrace_symbols, demangle)은 solution이 끝난 뒤에 한다.
+// 타이머는 커널 tick 단위로만 울리므로, 샘플마다 직전 샘플 이후의 스레드 CPU 시간(interval 단위)을 가중치로 기록한다.
+// 함수 이름은 -rdynamic으로 링크해야 나온다 (toolchain이 profile일 때 붙인다). 인라인된 함수는 호출한 함수에 합쳐진다.
+namespace profiler {
+const int MAX_DEPTH = 64;
+const int MAX_SAMPLES = 20000; // 넘치면 더 기록하지 않는다
+const int SKIPPED_FRAMES = 2;  // onSample, 시그널 trampoline
+void** frames = nullptr;       // 건드린 페이지만 메모리를 쓰도록 초기화하지 않는다
+int* depths = nullptr;
+long* weights = nullptr;
+volatile sig_atomic_t sampleCount = 0;
+long intervalUs = 0;
+long lastSampleUs = 0;
+map<void*, string> symbols;
+
+long threadCpuUs() {
+    struct timespec now;
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &now); // 시그널 핸들러에서 불러도 안전하다
+    return now.tv_sec * 1000000L + now.tv_nsec / 1000;
+}
+
+void onSample(int) {
+    int savedErrno = errno;
+    int index = sampleCount;
+    if (index < MAX_SAMPLES) {
+        long now = threadCpuUs();
+        weights[index] = std::max(1L, (now - lastSampleUs + intervalUs / 2) / intervalUs);
+        lastSampleUs = now;
+        depths[index] = backtrace(frames + (size_t) index * MAX_DEPTH, MAX_DEPTH);
+        sampleCount = index + 1;
+    }
+    errno = savedErrno;
+}
+
+void init(long interval) {
+    intervalUs = interval;
+    frames = new void*[(size_t) MAX_SAMPLES * MAX_DEPTH];
+    depths = new int[MAX_SAMPLES];
+    weights = new long[MAX_SAMPLES];
+    backtrace(frames, 1); // 첫 호출이 libgcc를 로드하므로 시그널 핸들러 밖에서 미리 부른다
+    struct sigaction action = {};
+    action.sa_handler = onSample;
+    action.sa_flags = SA_RESTART;
+    sigemptyset(&action.sa_mask);
+    sigaction(SIGPROF, &action, nullptr);
+}
+
+void setTimer(long interval) {
+    struct itimerval timer = {};
+    timer.it_interval.tv_sec = interval / 1000000;
+    timer.it_interval.tv_usec = interval % 1000000;
+    timer.it_value = timer.it_interval;
+    setitimer(ITIMER_PROF, &timer, nullptr);
+}
+
+void start() {
+    sampleCount = 0;
+    lastSampleUs = threadCpuUs();
+    setTimer(intervalUs);
+}
+
+void stop() {
+    setTimer(0);
+}
+
+// "module(mangled+0x1f) [0x...]" -> demangle된 함수 이름, 심볼이 없으면 "[module]"
+const string& frameName(void* address) {
+    auto found = symbols.find(address);
+    if (found != symbols.end()) {
+        return found->second;
+    }
+    char** entries = backtrace_symbols(&address, 1);
+    string entry = entries ? entries[0] : "";
+    free(entries);
+    string name;
+    size_t open = entry.find('(');
+    size_t plus = open == string::npos ? string::npos : entry.find('+', open);
+    if (plus != string::npos && plus > open + 1) {
+        name = entry.substr(open + 1, plus - open - 1);
+        int status = 0;
+        char* demangled = abi::__cxa_demangle(name.c_str(), nullptr, nullptr, &status);
+        if (status == 0 && demangled) {
+            name = demangled;
+        }
+        free(demangled);
+    } else {
+        string module = entry.substr(0, open);
+        name = "[" + module.substr(module.rfind('/') + 1) + "]";
+    }
+    std::replace(name.begin(), name.end(), ';', ':'); // collapsed 형식에서 ';'는 프레임 구분자
+    return symbols.emplace(address, name).first->second;
+}
+
+// 모은 샘플을 collapsed stack 형식("바깥;...;안쪽 가중치 합" 한 줄씩)으로. main과 그 바깥 프레임은 잘라낸다.
+string collapse() {
+    map<string, long> stacks;
+    int count = sampleCount;
+    for (int i = 0; i < count; i++) {
+        vector<string> names;
+        for (int d = SKIPPED_FRAMES; d < depths[i]; d++) {
+            const string& name = frameName(frames[(size_t) i * MAX_DEPTH + d]);
+            if (name == "main") {
+                break;
+            }
+            names.push_back(name);
+        }
+        if (names.empty()) {
+            continue;
+        }
+        string stack;
+        for (auto it = names.rbegin(); it != names.rend(); ++it) {
+            if (!stack.empty()) {
+                stack += ';';
+            }
+            stack += *it;
+        }
+        stacks[stack] += weights[i];
+    }
+    string collapsed;
+    for (auto& [stack, samples] : stacks) {
+        collapsed += stack + " " + to_string(samples) + "\n";
+    }
+    return collapsed;
+}
+} // namespace profiler
+
+bool jsonLess(const json& a, const json& b) {
+    if (a.is_number() && b.is_number()) {
+        return a.get<double>() < b.get<double>();
+    }
+    return a.dump() < b.dump();
+}
+
+// solution 결과와 testcase의 "output"을 비교
+// floatTolerance > 0: |a - e| <= tol * max(1, |e|) 이면 같다고 본다. unordered: 최상위 배열은 순서 무시.
+bool outputsEqual(const json& actual, const json& expected, double floatTolerance, bool unordered) {
+    if (actual.is_number() && expected.is_number()) {
+        if (floatTolerance > 0) {
+            double a = actual.get<double>();
+            double e = expected.get<double>();
+            return std::fabs(a - e) <= floatTolerance * std::max(1.0, std::fabs(e));
+        }
+        return actual == expected;
+    }
+    if (actual.is_array() && expected.is_array()) {
+        if (actual.size() != expected.size()) {
+            return false;
+        }
+        vector<json> a(actual.begin(), actual.end());
+        vector<json> e(expected.begin(), expected.end());
+        if (unordered) {
+            std::sort(a.begin(), a.end(), jsonLess);
+            std::sort(e.begin(), e.end(), jsonLess);
+        }
+        for (size_t i = 0; i < a.size(); i++) {
+            if (!outputsEqual(a[i], e[i], floatTolerance, false)) {
+                return false;
+            }
+        }
+        return true;
+    }
+    if (actual.is_object() && expected.is_object()) {
+        if (actual.size() != expected.size()) {
+            return false;
+        }
+        for (auto& item : expected.items()) {
+            if (!actual.contains(item.key()) || !outputsEqual(actual.at(item.key()), item.value(), floatTolerance, false)) {
+                return false;
+            }
+        }
+        return true;
+    }
+    return actual == expected;
+}
+
+// stop_on_failure로 실행하지 않은 테스트케이스
+json skippedResult() {
+    json skipped;
+    skipped["result"]     = nullptr;
+    skipped["utime"]      = -1;
+    skipped["stime"]      = -1;
+    skipped["realtime"]   = -1.0;
+    skipped["max_memory"] = -1;
+    skipped["stdout"]     = "";
+    skipped["stderr"]     = "(skipped)";
+    skipped["passed"]     = nullptr;
+    return skipped;
+}
+
+// 테스트케이스 하나의 결과를 한 줄짜리 JSON(NDJSON)으로 바로 출력 (프로세스가 죽어도 이미 출력된 결과는 남는다)
+void emitResult(const string& testCaseKey, const json& caseResult) {
+    json line = json::object();
+    line[testCaseKey] = caseResult;
+    std::cout << line.dump() << std::endl;
+}
+
+// 테스트케이스 파일에서 레코드({key: testcase}) 하나를 읽는다. 파일 끝이면 false.
+// 전체를 한 번에 파싱하지 않으므로 메모리는 가장 큰 테스트케이스 하나만큼만 쓴다.
+// - binary (.msgpack): [4바이트 little-endian 길이][MessagePack] 레코드
+// - 그 외: NDJSON, 한 줄에 하나
+bool readTestcaseRecord(ifstream& testFile, bool binary, json& record) {
+    if (binary) {
+        unsigned char header[4];
+        if (!testFile.read(reinterpret_cast<char*>(header), 4)) {
+            return false;
+        }
+        uint32_t length = header[0] | header[1] << 8 | header[2] << 16 | (uint32_t) header[3] << 24;
+        vector<uint8_t> bytes(length);
+        testFile.read(reinterpret_cast<char*>(bytes.data()), length);
+        record = json::from_msgpack(bytes);
+        return true;
+    }
+    string line;
+    while (getline(testFile, line)) {
+        if (line.find_first_not_of(" \t\r") != string::npos) {
+            record = json::parse(line);
+            return true;
+        }
+    }
+    return false;
+}
+
+// 반복 실행 시간(초) 목록의 통계. p95는 nearest-rank, stddev는 표본 표준편차.
+json summarizeTimings(vector<double> timings) {
+    json stats;
+    size_t count = timings.size();
+    stats["runs"] = count;
+    if (count == 0) {
+        return stats;
+    }
+    std::sort(timings.begin(), timings.end());
+    double mean = 0;
+    for (double t : timings) {
+        mean += t / count;
+    }
+    double variance = 0;
+    for (double t : timings) {
+        variance += (t - mean) * (t - mean);
+    }
+    stats["min"]    = timings[0];
+    stats["median"] = count % 2 ? timings[count / 2] : (timings[count / 2 - 1] + timings[count / 2]) / 2;
+    stats["p95"]    = timings[(size_t) std::ceil(0.95 * count) - 1];
+    stats["stddev"] = count > 1 ? std::sqrt(variance / (count - 1)) : 0.0;
+    return stats;
+}
+
+// 테스트케이스마다 남기는 stdout의 크기 (바이트, 옵션 capture_limit)
+const size_t DEFAULT_CAPTURE_LIMIT = 64 * 1024;
+
+// solution의 cout 캡처. 앞 limit/2바이트와 뒤 limit/2바이트(링 버퍼)만 남기고, 그 사이는 버린 바이트 수만 센다.
+// 출력을 아무리 많이 해도 메모리는 limit 정도로 일정하다. (stringstream은 출력만큼 커진다)
+class BoundedCapture : public std::streambuf {
+public:
+    explicit BoundedCapture(size_t limit) : headLimit_(limit / 2), ring_(limit - limit / 2, '\0') {
+        setp(area_, area_ + sizeof(area_));
+    }
+
+    void clear() {
+        setp(area_, area_ + sizeof(area_));
+        head_.clear();
+        ringPos_ = ringSize_ = dropped_ = 0;
+    }
+
+    // 잘린 자리가 UTF-8 문자 가운데면 그 문자는 뺀다 (json dump는 잘못된 UTF-8에서 예외를 던진다)
+    string str() {
+        drain();
+        string tail;
+        tail.reserve(ringSize_);
+        for (size_t i = 0; i < ringSize_; i++) {
+            tail.push_back(ring_[(ringPos_ + ring_.size() - ringSize_ + i) % ring_.size()]);
+        }
+        if (dropped_ == 0) {
+            return head_ + tail;
+        }
+        size_t start = 0;
+        while (start < tail.size() && (static_cast<unsigned char>(tail[start]) & 0xC0) == 0x80) {
+            start++;
+        }
+        return trimIncomplete(head_) + "\n... (" + to_string(dropped_) + " bytes truncated) ...\n" + tail.substr(start);
+    }
+
+protected:
+    int_type overflow(int_type ch) override {
+        drain();
+        if (!traits_type::eq_int_type(ch, traits_type::eof())) {
+            *pptr() = traits_type::to_char_type(ch);
+            pbump(1);
+        }
+        return traits_type::not_eof(ch);
+    }
+
+    std::streamsize xsputn(const char* s, std::streamsize n) override {
+        drain();
+        put(s, static_cast<size_t>(n));
+        return n;
+    }
+
+    int sync() override {
+        drain();
+        return 0;
+    }
+
+private:
+    void drain() {
+        put(pbase(), pptr() - pbase());
+        setp(area_, area_ + sizeof(area_));
+    }
+
+    void put(const char* s, size_t n) {
+        if (head_.size() < headLimit_) {
+            size_t taken = min(n, headLimit_ - head_.size());
+            head_.append(s, taken);
+            s += taken;
+            n -= taken;
+        }
+        if (n == 0) {
+            return;
+        }
+        size_t capacity = ring_.size();
+        if (n >= capacity) { // 링 버퍼를 통째로 바꾼다
+            dropped_ += ringSize_ + n - capacity;
+            s += n - capacity;
+            n = capacity;
+            ringPos_ = ringSize_ = 0;
+        }
+        for (size_t i = 0; i < n; i++) {
+            ring_[ringPos_] = s[i];
+            ringPos_ = (ringPos_ + 1) % capacity;
+        }
+        size_t overwritten = ringSize_ + n > capacity ? ringSize_ + n - capacity : 0;
+        dropped_ += overwritten;
+        ringSize_ += n - overwritten;
+    }
+
+    static string trimIncomplete(const string& text) {
+        // 끝에서부터 UTF-8 시작 바이트를 찾아, 그 문자가 다 들어 있지 않으면 잘라낸다
+        size_t i = text.size();
+        size_t continuation = 0;
+        while (i > 0 && continuation < 3 && (static_cast<unsigned char>(text[i - 1]) & 0xC0) == 0x80) {
+            i--;
+            continuation++;
+        }
+        if (i == 0) {
+            return text;
+        }
+        unsigned char lead = static_cast<unsigned char>(text[i - 1]);
+        size_t length = lead >= 0xF0 ? 4 : lead >= 0xE0 ? 3 : lead >= 0xC0 ? 2 : 1;
+        return (length > 1 && continuation + 1 < length) ? text.substr(0, i - 1) : text;
+    }
+
+    char area_[4096];
+    size_t headLimit_;
+    string head_;
+    string ring_;
+    size_t ringPos_ = 0;
+    size_t ringSize_ = 0;
+    size_t dropped_ = 0;
+};
+
+// benchmark 모드: warmup번 실행한 뒤 repeat번 실행해서 시간 통계를 낸다 (결과와 출력은 버린다)
+// solutionWrapper는 인자를 값으로 받으므로 매번 같은 입력으로 실행된다 (복사는 시간 측정 밖에서 한다).
+// C++에는 다시 만들 인스턴스가 없으므로 fresh_instance는 무시한다 (static 변수는 반복 사이에 남는다).
+// 할당량은 런타임이 알려주지 않으므로 allocated_bytes는 없다. 반복 중 예외가 나면 거기서 멈춘다.
+json benchmarkCase(const json& inputValues, const json& benchmark) {
+    int repeat = benchmark.value("repeat", 0);
+    int warmup = benchmark.value("warmup", 0);
+    vector<double> timings;
+    BoundedCapture sink(0);
+    auto old_buf = std::cout.rdbuf(&sink);
+    try {
+        for (int run = 0; run < warmup + repeat; run++) {
+            json args = inputValues;
+            auto start = chrono::steady_clock::now();
+            solutionWrapper(std::move(args));
+            auto end = chrono::steady_clock::now();
+            if (run >= warmup) {
+                timings.push_back(chrono::duration<double>(end - start).count());
+            }
+        }
+    } catch (...) {
+    }
+    std::cout.rdbuf(old_buf);
+    return summarizeTimings(timings);
+}
+
 int main(int argc, char* argv[]) {
     if(argc < 3) {
-        cout << "Usage: " << argv[0] << " <solution_path> <testcase_path>" << endl;
+        cout << "Usage: " << argv[0] << " <solution_path> <testcase_path> [options_path]" << endl;
         return 1;
     }
     //std::signal(SIGFPE, handleSIGFPE);
     string solutionPath = argv[1];
     string testcasePath = argv[2];
     
-    ifstream testFile(testcasePath);
+    bool binaryTestcase = testcasePath.size() >= 8
+        && testcasePath.compare(testcasePath.size() - 8, 8, ".msgpack") == 0;
+    ifstream testFile(testcasePath, ios::binary);
     if(!testFile) {
         cerr << "Failed to open testcase file: " << testcasePath << endl;
         return 1;
     }
     
-    json testCases;
-    testFile >> testCases;
-    
-    // 최종 결과 저장 변수 선언
-    json allResults = json::object();
 
-    // 각 테스트 케이스별로 실행
-    for(auto& [testCaseKey, testCase] : testCases.items()) {
-        if(!testCase.contains("input")) {
-            cerr << "Test case " << testCaseKey << " does not contain 'input' field." << endl;
-            continue;
-        }
-        // 입력 구성
-        json inputData = testCase["input"];
-        json inputValues = json::array();
-        for (auto& item : inputData.items()) {
-            inputValues.push_back(item.value());
+    // 선택: harness 옵션 JSON 파일
+    json options = json::object();
+    if (argc > 3 && string(argv[3]).size() > 0) {
+        ifstream optionsFile(argv[3]);
+        if (optionsFile) {
+            optionsFile >> options;
         }
+    }
+    bool checkOutput = options.value("check_output", false);
+    bool stopOnFailure = options.value("stop_on_failure", false);
+    double floatTolerance = options.value("float_tolerance", 0.0);
+    bool unorderedOutput = options.value("unordered_output", false);
+    json benchmark = options.value("benchmark", json(nullptr));
+    bool profile = options.contains("profile");
+    BoundedCapture capture(options.value("capture_limit", DEFAULT_CAPTURE_LIMIT));
+    if (profile) {
+        profiler::init(options["profile"].value("interval", 1000L));
+    }
+    
+    bool failed = false;
+
+    // 테스트케이스를 하나씩 읽어서 실행한다.
+    json testCases;
+    while (readTestcaseRecord(testFile, binaryTestcase, testCases)) {
+        for(auto& [testCaseKey, testCase] : testCases.items()) {
+            if (failed) {
+                emitResult(testCaseKey, skippedResult());
+                continue;
+            }
+            if(!testCase.contains("input")) {
+                cerr << "Test case " << testCaseKey << " does not contain 'input' field." << endl;
+                continue;
+            }
+            // 입력 구성
+            json inputData = testCase["input"];
+            json inputValues = json::array();
+            for (auto& item : inputData.items()) {
+                inputValues.push_back(item.value());
+            }
 
-        // 실행 전 리소스 측정
-        auto [utime_before, stime_before] = get_cpu_times();
-        auto start = chrono::high_resolution_clock::now();
+            // 실행 전 리소스 측정
+            reset_peak_memory();
+            auto [utime_before, stime_before] = get_cpu_times();
+            auto start = chrono::high_resolution_clock::now();
 
-        bool success = true;
-        string errorMessage;
-        json result;
-        string capturedOutput;
-        
-        try {
-            // stdout 캡처를 위한 버퍼 교체
-            std::stringstream buffer;
-            auto old_buf = std::cout.rdbuf(buffer.rdbuf());
-            
-            // solutionWrapper 실행
-            result = solutionWrapper(inputValues);
+            bool success = true;
+            string errorMessage;
+            string errorType; // 결과의 "error_type"
+            json result;
+            string capturedOutput;
             
+            // stdout 캡처를 위한 버퍼 교체 (예외가 나도 원복해야 다음 결과가 출력된다)
+            capture.clear();
+            auto old_buf = std::cout.rdbuf(&capture);
+            if (profile) {
+                profiler::start();
+            }
+            try {
+                // solutionWrapper 실행
+                result = solutionWrapper(inputValues);
+            } catch (const bad_alloc& e) {
+                // 메모리 부족 (RLIMIT_AS)
+                success = false;
+                errorMessage = e.what();
+                errorType = "std::bad_alloc";
+            } catch (const exception& e) {
+                // 예외 발생 시 (참조로 받아야 what()이 유지된다)
+                success = false;
+                errorMessage = e.what();
+                errorType = "std::exception";
+            } catch (...) {
+                // 알 수 없는 예외
+                success = false;
+                errorMessage = "Unknown error occurred";
+                errorType = "unknown";
+            }
+            if (profile) {
+                profiler::stop();
+            }
             // stdout 원복
             std::cout.rdbuf(old_buf);
-            capturedOutput = buffer.str();
-        } catch (const exception e) {
-            // 예외 발생 시
-            success = false;
-            errorMessage = e.what();
-        } catch (...) {
-            // 알 수 없는 예외
-            success = false;
-            errorMessage = "Unknown error occurred";
-        }
-
-        // 실행 후 리소스 측정
-        auto end = chrono::high_resolution_clock::now();
-        double elapsed_sec = chrono::duration<double>(end - start).count();
-        
-        auto [utime_after, stime_after] = get_cpu_times();
-        long vmhwm_after = get_vmhwm();
+            capturedOutput = capture.str();
 
-        // CPU 시간 사용량(utime, stime)은 tick 단위
-        long used_utime = utime_after - utime_before;
-        long used_stime = stime_after - stime_before;
+            // 실행 후 리소스 측정
+            auto end = chrono::high_resolution_clock::now();
+            double elapsed_sec = chrono::duration<double>(end - start).count();
+            
+            auto [utime_after, stime_after] = get_cpu_times();
+            long vmhwm_after = get_vmhwm();
 
-        // VmHWM(HWM은 누적 최대치)
-        long used_vmhwm = vmhwm_after; 
-    
-        json singleTC;
-        singleTC["result"]     = result;
-        singleTC["utime"]      = used_utime;
-        singleTC["stime"]      = used_stime;
-        singleTC["realtime"]   = elapsed_sec;
-        singleTC["max_memory"] = used_vmhwm;
-        singleTC["stdout"]     = !capturedOutput.empty() ? capturedOutput : "";
-        singleTC["stderr"]     = !success ? json(errorMessage) : json(nullptr);
+            // CPU 시간 사용량(utime, stime)은 µs 단위
+            long used_utime = utime_after - utime_before;
+            long used_stime = stime_after - stime_before;
 
-        // testCaseKey별로 결과를 allResults에 저장
-        allResults[testCaseKey] = singleTC;
-    }
+            // 실행 전에 VmHWM을 리셋했으므로 after 값이 이 테스트케이스의 최대 RSS (kB)
+            long used_vmhwm = vmhwm_after;
+        
+            json singleTC;
+            singleTC["result"]     = result;
+            singleTC["utime"]      = used_utime;
+            singleTC["stime"]      = used_stime;
+            singleTC["realtime"]   = elapsed_sec;
+            singleTC["max_memory"] = used_vmhwm;
+            singleTC["stdout"]     = !capturedOutput.empty() ? capturedOutput : "";
+            singleTC["stderr"]     = !success ? json(errorMessage) : json(nullptr);
+            if (!success) {
+                singleTC["error_type"] = errorType;
+            }
+            if (profile) {
+                singleTC["profile"] = profiler::collapse();
+            }
 
-    std::cout << allResults.dump(2) << std::endl;
+            // submit 모드: 기대 출력과 비교하고, 첫 실패(오답/런타임 에러)에서 멈춘다
+            if (checkOutput && testCase.contains("output")) {
+                singleTC["passed"] = success && outputsEqual(result, testCase["output"], floatTolerance, unorderedOutput);
+            }
+            if (benchmark.is_object() && success) {
+                singleTC["benchmark"] = benchmarkCase(inputValues, benchmark);
+            }
+            if (stopOnFailure && (!success || (singleTC.contains("passed") && !singleTC["passed"].get<bool>()))) {
+                failed = true;
+            }
+
+            emitResult(testCaseKey, singleTC);
+        }
+    }
 
     return 0;
 }
\ No newline at end of file
@@ -0,0 +1,105 @@
+// solutionWrapper의 인자 변환 (main.cpp와 pch.hpp가 include한다)
+// testcase_format=msgpack에서 packed array(MessagePack ext 1: int32, 2: int64, 3: float64, little-endian)는
+// json binary 값으로 들어온다. PackedArg는 이것을 json 배열을 거치지 않고 std::vector<T>에 바로 복사한다.
+// 그 외의 값은 이전과 같이 json::get<T>()로 변환한다.
+#pragma once
+#include <cstdint>
+#include <cstring>
+#include <stdexcept>
+#include <type_traits>
+#include <vector>
+#include "nlohmann/json.hpp"
+
+namespace code_executor {
+
+using json = nlohmann::ordered_json;
+
+template <typename Source, typename T, typename A>
+void unpackBlock(const std::vector<std::uint8_t>& bytes, std::vector<T, A>& out) {
+    size_t count = bytes.size() / sizeof(Source);
+    out.resize(count);
+    if constexpr (std::is_same_v<Source, T>) {
+        std::memcpy(out.data(), bytes.data(), count * sizeof(T));
+    } else {
+        for (size_t i = 0; i < count; i++) {
+            Source value;
+            std::memcpy(&value, bytes.data() + i * sizeof(Source), sizeof(Source));
+            out[i] = static_cast<T>(value);
+        }
+    }
+}
+
+// packed array -> std::vector<T> (T는 산술 타입)
+template <typename T, typename A>
+void unpackPacked(const json& value, std::vector<T, A>& out) {
+    const auto& binary = value.get_binary();
+    switch (binary.has_subtype() ? binary.subtype() : 0) {
+        case 1: unpackBlock<std::int32_t>(binary, out); break;
+        case 2: unpackBlock<std::int64_t>(binary, out); break;
+        case 3: unpackBlock<double>(binary, out); break;
+        default: throw std::runtime_error("unsupported packed array type");
+    }
+}
+
+// packed array -> json 배열 (std::vector가 아닌 타입으로 받을 때)
+inline json expandPacked(const json& value) {
+    const auto& binary = value.get_binary();
+    if (binary.has_subtype() && binary.subtype() == 3) {
+        std::vector<double> values;
+        unpackPacked(value, values);
+        return json(values);
+    }
+    std::vector<std::int64_t> values;
+    unpackPacked(value, values);
+    return json(values);
+}
+
+template <typename T>
+struct ArgDecoder {
+    static T decode(const json& value) {
+        if (value.is_binary()) {
+            return expandPacked(value).template get<T>();
+        }
+        return value.template get<T>();
+    }
+};
+
+template <typename U, typename A>
+struct ArgDecoder<std::vector<U, A>> {
+    static std::vector<U, A> decode(const json& value) {
+        std::vector<U, A> out;
+        if (value.is_binary()) {
+            if constexpr (std::is_arithmetic_v<U>) {
+                unpackPacked(value, out);
+                return out;
+            } else {
+                return expandPacked(value).template get<std::vector<U, A>>();
+            }
+        }
+        if (!value.is_array()) {
+            return value.template get<std::vector<U, A>>();
+        }
+        // 행렬 등: 원소마다 다시 ArgDecoder (packed된 행을 그대로 복사)
+        out.reserve(value.size());
+        for (const auto& item : value) {
+            out.push_back(ArgDecoder<U>::decode(item));
+        }
+        return out;
+    }
+};
+
+// solution(...)의 매개변수 타입 T로 변환된다
+class PackedArg {
+public:
+    explicit PackedArg(const json& value) : value_(value) {}
+
+    template <typename T>
+    operator T() const {
+        return ArgDecoder<T>::decode(value_);
+    }
+
+private:
+    const json& value_;
+};
+
+} // namespace code_executor
@@ -0,0 +1,26 @@
+// Precompiled header for the separate-solution build (CppToolChain.use_pch).
+// Mirrors the includes of main.cpp so that solution.cpp sees the same headers in both build modes.
+#include <iostream>
+#include <fstream>
+#include <sstream>
+#include <vector>
+#include <tuple>
+#include <stdexcept>
+#include <string>
+#include <map>
+#include <algorithm>
+#include <cmath>
+#include <chrono>
+#include <thread>
+#include <csignal>
+#include <sys/types.h>
+#include <sys/wait.h>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <execinfo.h>
+#include <cxxabi.h>
+#include <cerrno>
+#include <unistd.h>
+#include <fcntl.h>
+#include "nlohmann/json.hpp"
+#include "packed_args.hpp"
@@ -1,42 +1,84 @@
 import com.fasterxml.jackson.core.JsonGenerator;
 import com.fasterxml.jackson.databind.JsonNode;
 import com.fasterxml.jackson.databind.ObjectMapper;
-import com.fasterxml.jackson.databind.ObjectWriter;
+import com.fasterxml.jackson.databind.ObjectReader;
+import com.fasterxml.jackson.databind.node.ArrayNode;
+import com.fasterxml.jackson.databind.node.JsonNodeFactory;
+import com.fasterxml.jackson.databind.node.ObjectNode;
+import com.fasterxml.jackson.databind.node.POJONode;
+import jdk.jfr.Recording;
+import jdk.jfr.consumer.RecordedEvent;
+import jdk.jfr.consumer.RecordedFrame;
+import jdk.jfr.consumer.RecordedStackTrace;
+import jdk.jfr.consumer.RecordingFile;
 
-import java.io.ByteArrayOutputStream;
+import java.io.BufferedInputStream;
+import java.io.BufferedReader;
+import java.io.DataInputStream;
+import java.io.EOFException;
 import java.io.File;
+import java.io.FileInputStream;
+import java.io.IOException;
+import java.io.OutputStream;
 import java.io.PrintStream;
 import java.io.PrintWriter;
 import java.io.StringWriter;
-import java.lang.reflect.InvocationTargetException;
+import java.io.UncheckedIOException;
+import java.lang.management.GarbageCollectorMXBean;
+import java.lang.management.ManagementFactory;
+import java.lang.management.ThreadMXBean;
+import java.lang.invoke.MethodHandle;
+import java.lang.invoke.MethodHandles;
+import java.lang.invoke.MethodType;
+import java.lang.reflect.Array;
 import java.lang.reflect.Method;
+import java.lang.reflect.Modifier;
+import java.math.BigInteger;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.nio.charset.Charset;
+import java.util.ArrayList;
+import java.util.Collections;
 import java.util.Iterator;
 import java.util.LinkedHashMap;
+import java.util.List;
 import java.util.Map;
+import java.util.NoSuchElementException;
+import java.util.TreeMap;
+import java.nio.charset.StandardCharsets;
 import java.nio.file.Files;
+import java.nio.file.Path;
 import java.nio.file.Paths;
+import java.time.Duration;
 
 public class Main {
+    private static final ThreadMXBean THREAD_MX_BEAN = ManagementFactory.getThreadMXBean();
+    private static final int DEFAULT_CAPTURE_LIMIT = 64 * 1024;
+
     /**
-     * CPU 시간을 읽어오기 위해 /proc/self/stat의 14번(utime), 15번(stime) 필드를 파싱합니다.
+     * 현재 스레드의 CPU 시간을 µs 단위로 반환합니다. (ThreadMXBean, clock tick보다 정밀하다)
+     * JIT/GC 스레드의 시간은 포함되지 않습니다.
      *
-     * @return long[]{utime, stime} (파싱 실패 시 {0,0})
+     * @return long[]{utime, stime} (지원하지 않는 JVM이면 {0,0})
      */
     private static long[] getCpuTimes() {
+        if (!THREAD_MX_BEAN.isCurrentThreadCpuTimeSupported()) {
+            return new long[]{0, 0};
+        }
+        long cpuNanos = THREAD_MX_BEAN.getCurrentThreadCpuTime();
+        long userNanos = THREAD_MX_BEAN.getCurrentThreadUserTime();
+        return new long[]{userNanos / 1000, (cpuNanos - userNanos) / 1000};
+    }
+
+    /**
+     * /proc/self/clear_refs에 5를 써서 VmHWM(peak RSS)을 현재 RSS로 되돌립니다. (Linux 4.0+)
+     * 테스트케이스마다 리셋해야 max_memory가 그 테스트케이스의 최대치가 됩니다.
+     */
+    private static void resetPeakMemory() {
         try {
-            // stat 파일 형식: man proc 참고
-            // 예) pid (exe) R ... [13] utime, [14] stime, ...
-            String statContent = new String(Files.readAllBytes(Paths.get("/proc/self/stat"))).trim();
-            String[] tokens = statContent.split("\\s+");
-            if (tokens.length < 15) {
-                return new long[]{0, 0};
-            }
-            long utime = Long.parseLong(tokens[13]);
-            long stime = Long.parseLong(tokens[14]);
-            return new long[]{utime, stime};
+            Files.write(Paths.get("/proc/self/clear_refs"), "5".getBytes());
         } catch (Exception e) {
-            // Windows/Mac 등에서 /proc/self/stat을 접근 불가능할 때
-            return new long[]{0, 0};
+            // clear_refs를 쓸 수 없는 환경에서는 누적 최대치가 그대로 남는다
         }
     }
 
@@ -60,44 +102,693 @@ public class Main {
         return 0;
     }
 
+    /**
+     * 앞 limit / 2 바이트와 마지막 limit / 2 바이트(링 버퍼)만 남기는 OutputStream.
+     * 그 사이의 출력은 버린 바이트 수만 셉니다. 출력량과 상관없이 메모리는 limit 정도로 일정합니다.
+     */
+    private static class BoundedOutputStream extends OutputStream {
+        private final byte[] head;
+        private final byte[] ring;
+        private int headSize;
+        private int ringPos;
+        private int ringSize;
+        private long dropped;
+
+        BoundedOutputStream(int limit) {
+            this.head = new byte[limit / 2];
+            this.ring = new byte[limit - limit / 2];
+        }
+
+        void reset() {
+            headSize = ringPos = ringSize = 0;
+            dropped = 0;
+        }
+
+        @Override
+        public void write(int b) {
+            write(new byte[]{(byte) b}, 0, 1);
+        }
+
+        @Override
+        public void write(byte[] b, int off, int len) {
+            int taken = Math.min(len, head.length - headSize);
+            System.arraycopy(b, off, head, headSize, taken);
+            headSize += taken;
+            off += taken;
+            len -= taken;
+            if (len >= ring.length) {
+                // 링 버퍼 전체가 새 출력의 끝부분으로 바뀐다
+                dropped += ringSize + len - ring.length;
+                off += len - ring.length;
+                len = ring.length;
+                ringPos = ringSize = 0;
+            }
+            if (len == 0) {
+                return;
+            }
+            int first = Math.min(len, ring.length - ringPos);
+            System.arraycopy(b, off, ring, ringPos, first);
+            System.arraycopy(b, off + first, ring, 0, len - first);
+            ringPos = (ringPos + len) % ring.length;
+            int overwritten = Math.max(0, ringSize + len - ring.length);
+            dropped += overwritten;
+            ringSize += len - overwritten;
+        }
+
+        String toString(Charset charset) {
+            byte[] bytes = new byte[headSize + ringSize];
+            System.arraycopy(head, 0, bytes, 0, headSize);
+            int start = ringSize == 0 ? 0 : (ringPos - ringSize + ring.length) % ring.length;
+            int first = Math.min(ringSize, ring.length - start);
+            System.arraycopy(ring, start, bytes, headSize, first);
+            System.arraycopy(ring, 0, bytes, headSize + first, ringSize - first);
+            if (dropped == 0) {
+                return new String(bytes, charset);
+            }
+            // 잘린 경계의 깨진 문자는 U+FFFD로 바뀐다
+            return new String(bytes, 0, headSize, charset)
+                + "\n... (" + dropped + " bytes truncated) ...\n"
+                + new String(bytes, headSize, ringSize, charset);
+        }
+    }
+
     /**
      * System.out의 출력 결과를 캡처하기 위한 유틸 클래스.
      * start()로 캡처 시작, stopAndGetOutput()으로 캡처 중지 및 결과 획득.
+     * 한 번 만들어서 모든 테스트케이스에 재사용합니다. (start()가 버퍼를 비운다)
+     * 테스트케이스마다 앞뒤 limit / 2 바이트씩만 남깁니다. (BoundedOutputStream)
      */
     private static class StdoutCapture {
         private final PrintStream originalOut;
-        private final ByteArrayOutputStream buffer;
+        private final BoundedOutputStream buffer;
         private final PrintStream captureStream;
 
-        public StdoutCapture() {
+        public StdoutCapture(int limit) {
             this.originalOut = System.out;
-            this.buffer = new ByteArrayOutputStream();
+            this.buffer = new BoundedOutputStream(limit);
             this.captureStream = new PrintStream(buffer);
         }
 
         public void start() {
+            buffer.reset();
             System.setOut(captureStream);
         }
 
         public String stopAndGetOutput() {
             System.setOut(originalOut);
             captureStream.flush();
-            return buffer.toString();
+            return buffer.toString(Charset.defaultCharset());
+        }
+    }
+
+    private static int compareNodes(JsonNode a, JsonNode b) {
+        if (a.isNumber() && b.isNumber()) {
+            return Double.compare(a.asDouble(), b.asDouble());
+        }
+        return a.toString().compareTo(b.toString());
+    }
+
+    /**
+     * solution 결과와 testcase의 "output"을 비교합니다.
+     * floatTolerance > 0: |a - e| <= tol * max(1, |e|) 이면 같다고 봅니다. unordered: 최상위 배열은 순서를 무시합니다.
+     */
+    private static boolean outputsEqual(JsonNode actual, JsonNode expected, double floatTolerance, boolean unordered) {
+        if (actual.isNumber() && expected.isNumber()) {
+            if (floatTolerance > 0) {
+                double a = actual.asDouble();
+                double e = expected.asDouble();
+                return Math.abs(a - e) <= floatTolerance * Math.max(1.0, Math.abs(e));
+            }
+            if (actual.isIntegralNumber() && expected.isIntegralNumber()) {
+                return actual.bigIntegerValue().equals(expected.bigIntegerValue());
+            }
+            return actual.asDouble() == expected.asDouble();
+        }
+        if (actual.isArray() && expected.isArray()) {
+            if (actual.size() != expected.size()) {
+                return false;
+            }
+            List<JsonNode> a = new ArrayList<>();
+            List<JsonNode> e = new ArrayList<>();
+            actual.forEach(a::add);
+            expected.forEach(e::add);
+            if (unordered) {
+                a.sort(Main::compareNodes);
+                e.sort(Main::compareNodes);
+            }
+            for (int i = 0; i < a.size(); i++) {
+                if (!outputsEqual(a.get(i), e.get(i), floatTolerance, false)) {
+                    return false;
+                }
+            }
+            return true;
+        }
+        if (actual.isObject() && expected.isObject()) {
+            if (actual.size() != expected.size()) {
+                return false;
+            }
+            Iterator<Map.Entry<String, JsonNode>> fields = expected.fields();
+            while (fields.hasNext()) {
+                Map.Entry<String, JsonNode> field = fields.next();
+                JsonNode value = actual.get(field.getKey());
+                if (value == null || !outputsEqual(value, field.getValue(), floatTolerance, false)) {
+                    return false;
+                }
+            }
+            return true;
+        }
+        return actual.equals(expected);
+    }
+
+    /**
+     * 테스트케이스 하나의 결과를 한 줄짜리 JSON(NDJSON)으로 바로 출력합니다.
+     * 프로세스가 도중에 죽어도 이미 출력된 결과는 남습니다.
+     */
+    private static void emitResult(ObjectMapper mapper, String testCaseKey, Map<String, Object> caseResult) throws Exception {
+        System.out.println(mapper.writeValueAsString(Collections.singletonMap(testCaseKey, caseResult)));
+        System.out.flush();
+    }
+
+    /**
+     * stop_on_failure로 실행하지 않은 테스트케이스의 결과.
+     */
+    private static Map<String, Object> skippedResult() {
+        Map<String, Object> skipped = new LinkedHashMap<>();
+        skipped.put("result", null);
+        skipped.put("utime", -1);
+        skipped.put("stime", -1);
+        skipped.put("realtime", -1.0);
+        skipped.put("max_memory", -1);
+        skipped.put("stdout", "");
+        skipped.put("stderr", "(skipped)");
+        skipped.put("passed", null);
+        return skipped;
+    }
+
+    /**
+     * MessagePack 디코더 (testcase_format=msgpack). 레코드 하나를 JsonNode로 디코딩합니다.
+     * packed array(ext 1: int32, 2: int64, 3: float64, little-endian)는 숫자 하나씩 읽지 않고
+     * int[]/long[]/double[]로 한 번에 복사해서 POJONode로 감쌉니다. (toArgument 참고)
+     */
+    private static class MsgpackDecoder {
+        private final JsonNodeFactory nodes = JsonNodeFactory.instance;
+        private final ByteBuffer buf;
+
+        MsgpackDecoder(byte[] data) {
+            this.buf = ByteBuffer.wrap(data); // MessagePack은 big-endian
+        }
+
+        JsonNode decode() {
+            int code = buf.get() & 0xff;
+            if (code <= 0x7f) return nodes.numberNode(code);
+            if (code >= 0xe0) return nodes.numberNode(code - 0x100);
+            if (code <= 0x8f) return decodeMap(code & 0x0f);
+            if (code <= 0x9f) return decodeArray(code & 0x0f);
+            if (code <= 0xbf) return decodeString(code & 0x1f);
+            switch (code) {
+                case 0xc0: return nodes.nullNode();
+                case 0xc2: return nodes.booleanNode(false);
+                case 0xc3: return nodes.booleanNode(true);
+                case 0xcc: return nodes.numberNode(buf.get() & 0xff);
+                case 0xcd: return nodes.numberNode(buf.getShort() & 0xffff);
+                case 0xce: return nodes.numberNode(buf.getInt() & 0xffffffffL);
+                case 0xcf: {
+                    long value = buf.getLong();
+                    return value >= 0 ? nodes.numberNode(value) : nodes.numberNode(new BigInteger(Long.toUnsignedString(value)));
+                }
+                case 0xd0: return nodes.numberNode((int) buf.get());
+                case 0xd1: return nodes.numberNode((int) buf.getShort());
+                case 0xd2: return nodes.numberNode(buf.getInt());
+                case 0xd3: return nodes.numberNode(buf.getLong());
+                case 0xca: return nodes.numberNode((double) buf.getFloat());
+                case 0xcb: return nodes.numberNode(buf.getDouble());
+                case 0xd9: return decodeString(buf.get() & 0xff);
+                case 0xda: return decodeString(buf.getShort() & 0xffff);
+                case 0xdb: return decodeString(buf.getInt());
+                case 0xc4: return decodeBinary(buf.get() & 0xff);
+                case 0xc5: return decodeBinary(buf.getShort() & 0xffff);
+                case 0xc6: return decodeBinary(buf.getInt());
+                case 0xc7: return decodePacked(buf.get() & 0xff);
+                case 0xc8: return decodePacked(buf.getShort() & 0xffff);
+                case 0xc9: return decodePacked(buf.getInt());
+                case 0xdc: return decodeArray(buf.getShort() & 0xffff);
+                case 0xdd: return decodeArray(buf.getInt());
+                case 0xde: return decodeMap(buf.getShort() & 0xffff);
+                case 0xdf: return decodeMap(buf.getInt());
+                default: throw new IllegalArgumentException("unsupported MessagePack type 0x" + Integer.toHexString(code));
+            }
+        }
+
+        private JsonNode decodeString(int length) {
+            String value = new String(buf.array(), buf.position(), length, StandardCharsets.UTF_8);
+            buf.position(buf.position() + length);
+            return nodes.textNode(value);
+        }
+
+        private JsonNode decodeBinary(int length) {
+            byte[] value = new byte[length];
+            buf.get(value);
+            return nodes.binaryNode(value);
+        }
+
+        private JsonNode decodeArray(int size) {
+            ArrayNode array = nodes.arrayNode(size);
+            for (int i = 0; i < size; i++) {
+                array.add(decode());
+            }
+            return array;
+        }
+
+        private JsonNode decodeMap(int size) {
+            ObjectNode object = nodes.objectNode();
+            for (int i = 0; i < size; i++) {
+                String key = decode().asText();
+                object.set(key, decode());
+            }
+            return object;
+        }
+
+        private JsonNode decodePacked(int length) {
+            int extType = buf.get();
+            ByteBuffer block = buf.slice().order(ByteOrder.LITTLE_ENDIAN);
+            block.limit(length);
+            buf.position(buf.position() + length);
+            switch (extType) {
+                case 1: {
+                    int[] values = new int[length / 4];
+                    block.asIntBuffer().get(values);
+                    return nodes.pojoNode(values);
+                }
+                case 2: {
+                    long[] values = new long[length / 8];
+                    block.asLongBuffer().get(values);
+                    return nodes.pojoNode(values);
+                }
+                case 3: {
+                    double[] values = new double[length / 8];
+                    block.asDoubleBuffer().get(values);
+                    return nodes.pojoNode(values);
+                }
+                default: throw new IllegalArgumentException("unsupported ext type " + extType);
+            }
+        }
+    }
+
+    private static boolean hasPacked(JsonNode node) {
+        if (node.isPojo()) {
+            return true;
+        }
+        if (node.isContainerNode()) {
+            for (JsonNode child : node) {
+                if (hasPacked(child)) {
+                    return true;
+                }
+            }
+        }
+        return false;
+    }
+
+    /**
+     * packed array(POJONode)를 일반 JSON 배열로 되돌립니다. packed array가 없으면 node를 그대로 반환합니다.
+     */
+    private static JsonNode expandPacked(ObjectMapper mapper, JsonNode node) {
+        if (!hasPacked(node)) {
+            return node;
+        }
+        if (node.isPojo()) {
+            return mapper.valueToTree(((POJONode) node).getPojo());
+        }
+        if (node.isArray()) {
+            ArrayNode array = mapper.createArrayNode();
+            for (JsonNode child : node) {
+                array.add(expandPacked(mapper, child));
+            }
+            return array;
+        }
+        ObjectNode object = mapper.createObjectNode();
+        Iterator<Map.Entry<String, JsonNode>> fields = node.fields();
+        while (fields.hasNext()) {
+            Map.Entry<String, JsonNode> field = fields.next();
+            object.set(field.getKey(), expandPacked(mapper, field.getValue()));
+        }
+        return object;
+    }
+
+    /**
+     * 입력 값 하나를 solution 매개변수 타입으로 변환합니다.
+     * packed array는 타입이 맞으면(int[], long[], double[], 그 배열의 배열) 배열 복사 한 번으로 넘기고,
+     * 아니면 JSON 배열로 되돌려서 변환합니다.
+     * reader: 매개변수의 (제네릭 포함) 타입으로 미리 만들어 둔 ObjectReader, null이면 type으로 convertValue.
+     */
+    private static Object toArgument(ObjectMapper mapper, JsonNode valueNode, Class<?> type, ObjectReader reader)
+            throws IOException {
+        if (type.isInstance(valueNode)) {
+            return valueNode; // JsonNode/Object 매개변수
+        }
+        if (valueNode.isPojo() && type.isInstance(((POJONode) valueNode).getPojo())) {
+            return clonePacked(((POJONode) valueNode).getPojo());
+        }
+        if (type.isArray() && valueNode.isArray() && hasPacked(valueNode)) {
+            Object array = Array.newInstance(type.getComponentType(), valueNode.size());
+            for (int i = 0; i < valueNode.size(); i++) {
+                Array.set(array, i, toArgument(mapper, valueNode.get(i), type.getComponentType(), null));
+            }
+            return array;
+        }
+        JsonNode expanded = expandPacked(mapper, valueNode);
+        if (reader != null) {
+            return reader.readValue(expanded);
+        }
+        return mapper.convertValue(expanded, type);
+    }
+
+    /**
+     * packed array(int[], long[], double[])의 복사본. solution이 인자를 수정해도 testcase 노드는 그대로 남는다.
+     */
+    private static Object clonePacked(Object packed) {
+        if (packed instanceof int[]) {
+            return ((int[]) packed).clone();
+        }
+        if (packed instanceof long[]) {
+            return ((long[]) packed).clone();
+        }
+        if (packed instanceof double[]) {
+            return ((double[]) packed).clone();
+        }
+        return packed;
+    }
+
+    /**
+     * testcase의 "input"(배열 또는 객체)을 solution의 인자 배열로 변환합니다.
+     * 호출할 때마다 새 인자를 만든다 (solution이 인자를 수정해도 다음 호출에 영향이 없다)
+     */
+    private static Object[] buildArguments(ObjectMapper mapper, JsonNode inputNode, Class<?>[] parameterTypes,
+                                           ObjectReader[] readers) throws IOException {
+        Object[] arguments = new Object[parameterTypes.length];
+        if (inputNode != null && inputNode.isArray()) {
+            // input이 JSON 배열인 경우
+            for (int i = 0; i < parameterTypes.length && i < inputNode.size(); i++) {
+                arguments[i] = toArgument(mapper, inputNode.get(i), parameterTypes[i], readers[i]);
+            }
+        } else {
+            // input이 JSON 객체인 경우 -> values() 순회 등
+            int i = 0;
+            Iterator<JsonNode> elements = inputNode.elements();
+            while (elements.hasNext() && i < parameterTypes.length) {
+                arguments[i] = toArgument(mapper, elements.next(), parameterTypes[i], readers[i]);
+                i++;
+            }
+        }
+        return arguments;
+    }
+
+    /**
+     * solution 메서드를 (Object[]) -> Object MethodHandle로 묶습니다. 호출마다 리플렉션 검사가 없다.
+     * static 메서드가 아니면 instance에 bind한다.
+     */
+    private static MethodHandle bindSolution(Method solutionMethod, Object instance) throws IllegalAccessException {
+        MethodHandle handle = MethodHandles.lookup().unreflect(solutionMethod);
+        if (!Modifier.isStatic(solutionMethod.getModifiers())) {
+            handle = handle.bindTo(instance);
+        }
+        return handle
+            .asSpreader(Object[].class, solutionMethod.getParameterCount())
+            .asType(MethodType.methodType(Object.class, Object[].class));
+    }
+
+    /**
+     * 현재 스레드가 지금까지 할당한 바이트 (HotSpot의 com.sun.management.ThreadMXBean), 지원하지 않으면 -1
+     */
+    private static long getAllocatedBytes() {
+        if (THREAD_MX_BEAN instanceof com.sun.management.ThreadMXBean) {
+            com.sun.management.ThreadMXBean bean = (com.sun.management.ThreadMXBean) THREAD_MX_BEAN;
+            if (bean.isThreadAllocatedMemorySupported() && bean.isThreadAllocatedMemoryEnabled()) {
+                return bean.getThreadAllocatedBytes(Thread.currentThread().getId());
+            }
+        }
+        return -1;
+    }
+
+    /**
+     * 모든 GC의 {누적 횟수, 누적 시간(ms)}
+     */
+    private static long[] getGcCounters() {
+        long[] counters = new long[]{0, 0};
+        for (GarbageCollectorMXBean bean : ManagementFactory.getGarbageCollectorMXBeans()) {
+            counters[0] += Math.max(0, bean.getCollectionCount());
+            counters[1] += Math.max(0, bean.getCollectionTime());
+        }
+        return counters;
+    }
+
+    /**
+     * 반복 실행 시간(초) 목록의 통계. p95는 nearest-rank, stddev는 표본 표준편차.
+     */
+    private static Map<String, Object> summarizeTimings(List<Double> timings) {
+        List<Double> ordered = new ArrayList<>(timings);
+        Collections.sort(ordered);
+        int count = ordered.size();
+        Map<String, Object> stats = new LinkedHashMap<>();
+        stats.put("runs", count);
+        if (count == 0) {
+            return stats;
+        }
+        double mean = 0;
+        for (double t : ordered) {
+            mean += t / count;
+        }
+        double variance = 0;
+        for (double t : ordered) {
+            variance += (t - mean) * (t - mean);
+        }
+        stats.put("min", ordered.get(0));
+        stats.put("median", count % 2 == 1
+            ? ordered.get(count / 2)
+            : (ordered.get(count / 2 - 1) + ordered.get(count / 2)) / 2);
+        stats.put("p95", ordered.get((int) Math.ceil(0.95 * count) - 1));
+        stats.put("stddev", count > 1 ? Math.sqrt(variance / (count - 1)) : 0.0);
+        return stats;
+    }
+
+    /**
+     * benchmark 모드: warmup번 실행한 뒤 repeat번 실행해서 시간 통계를 냅니다. (결과와 출력은 버린다)
+     * - 매번 buildArguments로 새 인자를 만든다 (시간 측정 밖).
+     * - fresh_instance: 매번 Solution 인스턴스를 새로 만든다 (static 필드는 반복 사이에 남는다).
+     * - allocated_bytes: 측정 실행 한 번에 이 스레드가 할당한 바이트의 평균 (지원하지 않는 JVM이면 없음)
+     * - gc_count, gc_time: 측정 실행 동안의 GC 횟수와 시간(ms)의 합
+     * 반복 중 예외가 나면 거기서 멈춘다.
+     */
+    private static Map<String, Object> benchmarkCase(JsonNode benchmark, Method solutionMethod, MethodHandle solutionHandle,
+                                                     ObjectMapper mapper, JsonNode inputNode, Class<?>[] parameterTypes,
+                                                     ObjectReader[] readers, StdoutCapture capture) {
+        int repeat = benchmark.path("repeat").asInt(0);
+        int warmup = benchmark.path("warmup").asInt(0);
+        boolean freshInstance = benchmark.path("fresh_instance").asBoolean(false);
+        List<Double> timings = new ArrayList<>();
+        long allocatedBytes = 0;
+        long gcCount = 0;
+        long gcTime = 0;
+        try {
+            for (int run = 0; run < warmup + repeat; run++) {
+                MethodHandle handle = freshInstance
+                    ? bindSolution(solutionMethod, Solution.class.getDeclaredConstructor().newInstance())
+                    : solutionHandle;
+                Object[] arguments = buildArguments(mapper, inputNode, parameterTypes, readers);
+                long[] gcBefore = getGcCounters();
+                long allocatedBefore = getAllocatedBytes();
+                capture.start();
+                long startTime = System.nanoTime();
+                try {
+                    Object ignored = (Object) handle.invokeExact(arguments);
+                } finally {
+                    long endTime = System.nanoTime();
+                    capture.stopAndGetOutput();
+                    if (run >= warmup) {
+                        timings.add((endTime - startTime) / 1e9);
+                        allocatedBytes += getAllocatedBytes() - allocatedBefore;
+                        long[] gcAfter = getGcCounters();
+                        gcCount += gcAfter[0] - gcBefore[0];
+                        gcTime += gcAfter[1] - gcBefore[1];
+                    }
+                }
+            }
+        } catch (Throwable t) {
+            // 반복 중 예외: 여기까지의 통계만 남긴다
+        }
+        Map<String, Object> stats = summarizeTimings(timings);
+        if (!timings.isEmpty()) {
+            if (getAllocatedBytes() >= 0) {
+                stats.put("allocated_bytes", allocatedBytes / timings.size());
+            }
+            stats.put("gc_count", gcCount);
+            stats.put("gc_time", gcTime);
+        }
+        return stats;
+    }
+
+    /**
+     * profile 모드: 테스트케이스마다 JFR 녹화(jdk.ExecutionSample)를 켜고 끄고, 샘플의 스택을 collapsed stack 형식
+     * ("바깥;...;안쪽 샘플수" 한 줄씩)으로 모읍니다. JFR의 샘플 주기는 ms 단위입니다 (interval µs를 내림, 최소 1ms).
+     * Main의 프레임과 그 바깥은 잘라낸다. 녹화는 임시 .jfr 파일로 dump해서 읽고 지운다.
+     */
+    private static class Profiler {
+        private final Duration period;
+        private Recording recording;
+
+        Profiler(long intervalUs) {
+            this.period = Duration.ofMillis(Math.max(1, intervalUs / 1000));
+        }
+
+        void start() {
+            recording = new Recording();
+            recording.enable("jdk.ExecutionSample").withPeriod(period);
+            recording.start();
+        }
+
+        String stop() throws IOException {
+            recording.stop();
+            Path dump = Files.createTempFile("profile", ".jfr");
+            try {
+                recording.dump(dump);
+                Map<String, Long> stacks = new TreeMap<>();
+                for (RecordedEvent event : RecordingFile.readAllEvents(dump)) {
+                    RecordedStackTrace trace = event.getStackTrace();
+                    if (trace == null) {
+                        continue;
+                    }
+                    List<String> names = new ArrayList<>();
+                    for (RecordedFrame frame : trace.getFrames()) { // 안쪽(호출된 쪽)부터
+                        String type = frame.getMethod().getType().getName();
+                        if (type.equals("Main")) {
+                            break;
+                        }
+                        names.add((type + "." + frame.getMethod().getName()).replace(';', ':'));
+                    }
+                    if (names.isEmpty()) {
+                        continue;
+                    }
+                    Collections.reverse(names);
+                    stacks.merge(String.join(";", names), 1L, Long::sum);
+                }
+                StringBuilder collapsed = new StringBuilder();
+                for (Map.Entry<String, Long> stack : stacks.entrySet()) {
+                    collapsed.append(stack.getKey()).append(' ').append(stack.getValue()).append('\n');
+                }
+                return collapsed.toString();
+            } finally {
+                recording.close();
+                Files.deleteIfExists(dump);
+            }
+        }
+    }
+
+    private static String stackTrace(Throwable error) {
+        StringWriter sw = new StringWriter();
+        error.printStackTrace(new PrintWriter(sw));
+        return sw.toString();
+    }
+
+    /**
+     * testcase 파일을 테스트케이스 하나씩 읽는 Iterator.
+     * 전체를 한 번에 파싱하지 않으므로 메모리는 가장 큰 테스트케이스 하나만큼만 씁니다.
+     * - .msgpack: [4바이트 little-endian 길이][MessagePack {key: testcase}] 레코드의 연속
+     * - 그 외: NDJSON, 한 줄에 {key: testcase} 하나
+     */
+    private static class TestcaseReader implements Iterator<Map.Entry<String, JsonNode>> {
+        private final ObjectMapper mapper;
+        private final BufferedReader reader;
+        private final DataInputStream input;
+        private Iterator<Map.Entry<String, JsonNode>> current = Collections.emptyIterator();
+        private boolean done = false;
+
+        TestcaseReader(ObjectMapper mapper, String path) throws IOException {
+            this.mapper = mapper;
+            if (path.endsWith(".msgpack")) {
+                this.input = new DataInputStream(new BufferedInputStream(new FileInputStream(path)));
+                this.reader = null;
+            } else {
+                this.input = null;
+                this.reader = Files.newBufferedReader(Paths.get(path), StandardCharsets.UTF_8);
+            }
+        }
+
+        /** 다음 레코드, 파일 끝이면 null */
+        private JsonNode readRecord() throws IOException {
+            if (input != null) {
+                byte[] header = new byte[4];
+                try {
+                    input.readFully(header);
+                } catch (EOFException e) {
+                    return null;
+                }
+                byte[] record = new byte[ByteBuffer.wrap(header).order(ByteOrder.LITTLE_ENDIAN).getInt()];
+                input.readFully(record);
+                return new MsgpackDecoder(record).decode();
+            }
+            String line;
+            while ((line = reader.readLine()) != null) {
+                if (!line.trim().isEmpty()) {
+                    return mapper.readTree(line);
+                }
+            }
+            return null;
+        }
+
+        @Override
+        public boolean hasNext() {
+            try {
+                while (!done && !current.hasNext()) {
+                    JsonNode record = readRecord();
+                    if (record == null) {
+                        done = true;
+                        if (input != null) {
+                            input.close();
+                        } else {
+                            reader.close();
+                        }
+                    } else {
+                        current = record.fields();
+                    }
+                }
+                return current.hasNext();
+            } catch (IOException e) {
+                throw new UncheckedIOException(e);
+            }
+        }
+
+        @Override
+        public Map.Entry<String, JsonNode> next() {
+            if (!hasNext()) {
+                throw new NoSuchElementException();
+            }
+            return current.next();
         }
     }
 
     public static void main(String[] args) throws Exception {
         if (args.length < 2) {
-            System.out.println("Usage: java Main <solution_path> <testcase_path>");
+            System.out.println("Usage: java Main <solution_path> <testcase_path> [options_path]");
             return;
         }
         
         String solutionPath = args[0];    // for debugging/logging
         String testcasePath = args[1];    // testcase JSON path
         
-        // JSON 파일 로드
         ObjectMapper mapper = new ObjectMapper();
-        JsonNode root = mapper.readTree(new File(testcasePath));
+
+        // 선택: harness 옵션 JSON 파일
+        JsonNode options = (args.length > 2 && !args[2].isEmpty())
+            ? mapper.readTree(new File(args[2]))
+            : mapper.createObjectNode();
+        boolean checkOutput = options.path("check_output").asBoolean(false);
+        boolean stopOnFailure = options.path("stop_on_failure").asBoolean(false);
+        double floatTolerance = options.path("float_tolerance").asDouble(0.0);
+        boolean unorderedOutput = options.path("unordered_output").asBoolean(false);
+        int warmup = options.path("warmup").asInt(0);
+        JsonNode benchmark = options.path("benchmark");
+        Profiler profiler = options.has("profile")
+            ? new Profiler(options.path("profile").path("interval").asLong(1000))
+            : null;
         
         // 실제 솔루션 클래스 & 인스턴스
         // (예: public class Solution { public Object solution(...) {...}} )
@@ -116,68 +807,71 @@ public class Main {
             throw new NoSuchMethodException("No solution method found in " + solutionPath);
         }
         
-        int expectedParamCount = solutionMethod.getParameterCount();
         Class<?>[] parameterTypes = solutionMethod.getParameterTypes();
+        // 매개변수마다 Jackson reader를 한 번만 만든다 (List<Integer> 같은 제네릭 타입도 그대로)
+        ObjectReader[] readers = new ObjectReader[parameterTypes.length];
+        for (int i = 0; i < parameterTypes.length; i++) {
+            readers[i] = mapper.readerFor(mapper.getTypeFactory().constructType(solutionMethod.getGenericParameterTypes()[i]));
+        }
+        // 메서드는 한 번만 찾아서 MethodHandle로 묶는다: (Object[]) -> Object, 호출마다 리플렉션 검사가 없다
+        MethodHandle solutionHandle = bindSolution(solutionMethod, solutionInstance);
+        StdoutCapture capture = new StdoutCapture(options.path("capture_limit").asInt(DEFAULT_CAPTURE_LIMIT));
 
-        // 최종 JSON 출력을 위해, 전체 결과를 누적할 맵
-        Map<String, Map<String, Object>> allResults = new LinkedHashMap<>();
+        boolean failed = false;
+        boolean warmedUp = false;
         
-        // JSON 루트에서 각 테스트케이스를 순회
-        Iterator<Map.Entry<String, JsonNode>> testCases = root.fields();
+        // testcase 파일을 한 줄씩 읽으면서 각 테스트케이스를 순회
+        Iterator<Map.Entry<String, JsonNode>> testCases = new TestcaseReader(mapper, testcasePath);
         while (testCases.hasNext()) {
             Map.Entry<String, JsonNode> entry = testCases.next();
             String testCaseKey = entry.getKey();
             JsonNode testCase = entry.getValue();
+            if (failed) {
+                emitResult(mapper, testCaseKey, skippedResult());
+                continue;
+            }
             JsonNode inputNode = testCase.get("input");
-            
-            // solutionMethod 파라미터에 맞춰 인자 배열 준비
-            Object[] arguments = new Object[expectedParamCount];
-            if (inputNode != null && inputNode.isArray()) {
-                // input이 JSON 배열인 경우
-                for (int i = 0; i < expectedParamCount && i < inputNode.size(); i++) {
-                    JsonNode valueNode = inputNode.get(i);
-                    arguments[i] = mapper.convertValue(valueNode, parameterTypes[i]);
-                }
-            } else {
-                // input이 JSON 객체인 경우 -> values() 순회 등
-                int i = 0;
-                Iterator<JsonNode> elements = inputNode.elements();
-                while (elements.hasNext() && i < expectedParamCount) {
-                    JsonNode valueNode = elements.next();
-                    arguments[i] = mapper.convertValue(valueNode, parameterTypes[i]);
-                    i++;
+
+            // warm-up: 첫 테스트케이스로 solution을 미리 실행해서 JIT 컴파일 시간이 측정에 들어가지 않게 한다
+            // (결과와 출력은 버리고, 매번 새 인자를 만든다)
+            if (!warmedUp) {
+                warmedUp = true;
+                for (int w = 0; w < warmup; w++) {
+                    Object[] warmupArguments = buildArguments(mapper, inputNode, parameterTypes, readers);
+                    capture.start();
+                    try {
+                        Object ignored = (Object) solutionHandle.invokeExact(warmupArguments);
+                    } catch (Throwable t) {
+                        // warm-up의 예외는 무시한다 (측정 실행에서 다시 보고된다)
+                    }
+                    capture.stopAndGetOutput();
                 }
             }
             
+            // solutionMethod 파라미터에 맞춰 인자 배열 준비
+            Object[] arguments = buildArguments(mapper, inputNode, parameterTypes, readers);
+            
+            if (profiler != null) {
+                profiler.start();
+            }
+
             // 실행 전 자원 측정
+            resetPeakMemory();
             long[] cpuBefore = getCpuTimes();
-            long vmHWMBefore = getVmHWM();
             long startTime = System.nanoTime();
 
             // 표준 출력 캡처
-            StdoutCapture capture = new StdoutCapture();
             capture.start();
 
             Object result = null;
             String errorStackTrace = null;
+            String errorType = null; // 결과의 "error_type": 예외 클래스 이름
             try {
-                // 리플렉션으로 메서드 호출
-                result = solutionMethod.invoke(solutionInstance, arguments);
-            } catch (InvocationTargetException ite) {
-                // solution 내부의 예외
-                Throwable cause = ite.getCause();
-                if (cause != null) {
-                    StringWriter sw = new StringWriter();
-                    cause.printStackTrace(new PrintWriter(sw));
-                    errorStackTrace = sw.toString();
-                } else {
-                    errorStackTrace = ite.toString();
-                }
-            } catch (Exception e) {
-                // 리플렉션 관련 예외
-                StringWriter sw = new StringWriter();
-                e.printStackTrace(new PrintWriter(sw));
-                errorStackTrace = sw.toString();
+                result = (Object) solutionHandle.invokeExact(arguments);
+            } catch (Throwable t) {
+                // solution 내부의 예외 (StackOverflowError 등 포함)
+                errorStackTrace = stackTrace(t);
+                errorType = t.getClass().getName();
             }
 
             // stdout 캡처 중지
@@ -188,26 +882,44 @@ public class Main {
             double elapsedSec = (endTime - startTime) / 1e9;
             long[] cpuAfter = getCpuTimes();
             long vmHWMAfter = getVmHWM();
+            String collapsedProfile = (profiler != null) ? profiler.stop() : null; // 측정이 끝난 뒤에 멈춘다
 
-            long usedUtime = cpuAfter[0] - cpuBefore[0];
+            long usedUtime = cpuAfter[0] - cpuBefore[0]; // µs
             long usedStime = cpuAfter[1] - cpuBefore[1];
-            long usedVmHWM = vmHWMAfter; // HWM은 누적 최대치이므로 단순 after만 표시
+            long usedVmHWM = vmHWMAfter; // 실행 전에 리셋했으므로 이 테스트케이스의 최대 RSS (kB)
 
             // 결과 출력
             Map<String, Object> testCaseResult = new LinkedHashMap<>();
             testCaseResult.put("result", result); // 솔루션 결과(성공 시), 에러면 null
             testCaseResult.put("utime", usedUtime);
             testCaseResult.put("stime", usedStime);
-            testCaseResult.put("realtime", Double.parseDouble(String.format("%.6f", elapsedSec)));
+            testCaseResult.put("realtime", Math.round(elapsedSec * 1e6) / 1e6); // 소수점 6자리
             testCaseResult.put("max_memory", usedVmHWM);
             testCaseResult.put("stdout", (capturedOutput != null) ? capturedOutput.trim() : "");
             testCaseResult.put("stderr", (errorStackTrace != null) ? errorStackTrace.trim() : null);
+            if (errorType != null) {
+                testCaseResult.put("error_type", errorType);
+            }
+            if (profiler != null) {
+                testCaseResult.put("profile", collapsedProfile);
+            }
 
-            allResults.put(testCaseKey, testCaseResult);
-        }
+            // submit 모드: 기대 출력과 비교하고, 첫 실패(오답/런타임 에러)에서 멈춘다
+            if (checkOutput && testCase.has("output")) {
+                JsonNode actualNode = (result != null) ? mapper.valueToTree(result) : mapper.getNodeFactory().nullNode();
+                boolean passed = errorStackTrace == null
+                    && outputsEqual(actualNode, testCase.get("output"), floatTolerance, unorderedOutput);
+                testCaseResult.put("passed", passed);
+            }
+            if (benchmark.isObject() && errorStackTrace == null) {
+                testCaseResult.put("benchmark", benchmarkCase(benchmark, solutionMethod, solutionHandle,
+                    mapper, inputNode, parameterTypes, readers, capture));
+            }
+            if (stopOnFailure && (errorStackTrace != null || Boolean.FALSE.equals(testCaseResult.get("passed")))) {
+                failed = true;
+            }
 
-        ObjectWriter writer = mapper.writer().withDefaultPrettyPrinter();
-        String outputJson = writer.writeValueAsString(allResults);
-        System.out.println(outputJson);
+            emitResult(mapper, testCaseKey, testCaseResult);
+        }
     }
 }
\ No newline at end of file
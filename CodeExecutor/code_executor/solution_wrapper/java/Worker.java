@@ -0,0 +1,93 @@
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
+
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Paths;
+import java.util.LinkedHashMap;
+import java.util.Map;
+
+/**
+ * 미리 띄워둔 JVM. job마다 execute_dir의 Main/Solution을 새 URLClassLoader로 로드해서 Main.main을 실행한다.
+ * Jackson 클래스는 부모 class loader에 한 번만 로드된다.
+ * 요청/응답은 한 줄짜리 JSON (code_executor/worker_pool.py 참고).
+ */
+public class Worker {
+    public static void main(String[] args) throws Exception {
+        ObjectMapper mapper = new ObjectMapper();
+        PrintStream protocolOut = System.out;
+        PrintStream originalErr = System.err;
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+
+        // Jackson 클래스 미리 로드 (첫 job에 class loading 비용이 잡히지 않도록)
+        mapper.writeValueAsString(mapper.readTree("{\"warmup\": [1, 2.5, \"a\", null, true, {\"k\": [1]}]}"));
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            JsonNode job = mapper.readTree(line);
+            String executeDir = job.get("execute_dir").asText();
+            String[] jobArgs = mapper.convertValue(job.get("args"), String[].class);
+            long timeoutMillis = (long) (job.get("timeout").asDouble() * 1000);
+
+            ByteArrayOutputStream stdoutBuffer = new ByteArrayOutputStream();
+            ByteArrayOutputStream stderrBuffer = new ByteArrayOutputStream();
+            PrintStream jobOut = new PrintStream(stdoutBuffer, true, "UTF-8");
+            PrintStream jobErr = new PrintStream(stderrBuffer, true, "UTF-8");
+            int[] returncode = {0};
+
+            URLClassLoader loader = new URLClassLoader(
+                new URL[]{Paths.get(executeDir).toUri().toURL()}, Worker.class.getClassLoader());
+            Thread jobThread = new Thread(() -> {
+                try {
+                    Method harnessMain = loader.loadClass("Main").getMethod("main", String[].class);
+                    harnessMain.invoke(null, (Object) jobArgs);
+                } catch (InvocationTargetException e) {
+                    Throwable cause = (e.getCause() != null) ? e.getCause() : e;
+                    cause.printStackTrace(jobErr);
+                    returncode[0] = 1;
+                } catch (Throwable e) {
+                    e.printStackTrace(jobErr);
+                    returncode[0] = 1;
+                }
+            });
+
+            System.setOut(jobOut);
+            System.setErr(jobErr);
+            jobThread.start();
+            jobThread.join(timeoutMillis);
+            boolean timedOut = jobThread.isAlive();
+            System.setOut(protocolOut);
+            System.setErr(originalErr);
+
+            Map<String, Object> response = new LinkedHashMap<>();
+            if (timedOut) {
+                // 끝난 테스트케이스의 결과 줄(마지막 줄바꿈까지)은 남긴다
+                String partial = stdoutBuffer.toString("UTF-8");
+                response.put("returncode", -9);
+                response.put("stdout", partial.substring(0, partial.lastIndexOf('\n') + 1));
+                response.put("stderr", "timeout");
+                // 실행 중인 스레드는 안전하게 멈출 수 없으므로 이 JVM은 종료한다. (pool이 새 worker를 띄운다)
+                response.put("worker_exit", true);
+            } else {
+                jobOut.flush();
+                jobErr.flush();
+                response.put("returncode", returncode[0]);
+                response.put("stdout", stdoutBuffer.toString("UTF-8"));
+                response.put("stderr", stderrBuffer.toString("UTF-8"));
+                loader.close();
+            }
+            protocolOut.println(mapper.writeValueAsString(response));
+            protocolOut.flush();
+            if (timedOut) {
+                System.exit(0);
+            }
+        }
+    }
+}
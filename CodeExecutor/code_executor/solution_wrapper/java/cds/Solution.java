@@ -0,0 +1,24 @@
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * AppCDS 학습 실행용 solution (execute_config.py의 java "cds_archive" 참고).
+ * 자주 쓰이는 인자/결과 타입의 변환 코드를 한 번씩 거쳐서, 그 Jackson/JDK 클래스들이 archive에 들어가게 합니다.
+ */
+public class Solution {
+    public List<Long> solution(int[] values, List<String> words, long[][] grid, Map<String, Integer> counts,
+                               String name, double scale) {
+        long total = name.length();
+        for (int value : values) total += value;
+        for (String word : words) total += word.length();
+        for (long[] row : grid) for (long cell : row) total += cell;
+        for (int count : counts.values()) total += count;
+        System.out.println(total);
+
+        List<Long> result = new ArrayList<>();
+        result.add(total);
+        result.add(Math.round(total * scale));
+        return result;
+    }
+}
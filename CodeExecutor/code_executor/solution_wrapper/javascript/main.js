@@ -1,25 +1,28 @@
 // index.js
 const fs = require('fs');
 const path = require('path');
+const vm = require('vm');
+const Module = require('module');
+const { threadId, parentPort } = require('worker_threads');
 
 function getCpuTimes() {
   /**
-   * /proc/self/stat에서 14번째(utime), 15번째(stime) 필드 추출
-   * (참고: man proc -> /proc/[pid]/stat)
+   * [utime, stime]을 µs 단위로 반환.
+   * process.threadCpuUsage(Node 23+)가 있으면 현재 스레드 기준, 없으면 process.cpuUsage (프로세스 전체).
+   */
+  const usage = process.threadCpuUsage ? process.threadCpuUsage() : process.cpuUsage();
+  return [usage.user, usage.system];
+}
+
+function resetPeakMemory() {
+  /**
+   * /proc/self/clear_refs에 5를 써서 VmHWM(peak RSS)을 현재 RSS로 되돌린다. (Linux 4.0+)
+   * 테스트케이스마다 리셋해야 max_memory가 그 테스트케이스의 최대치가 된다.
    */
   try {
-    const statContent = fs.readFileSync("/proc/self/stat", "utf8").trim();
-    const tokens = statContent.split(' ');
-    if (tokens.length < 15) {
-      return [0, 0];
-    }
-    // 0-based 인덱스이므로 [13] -> utime, [14] -> stime
-    const utime = parseInt(tokens[13], 10);
-    const stime = parseInt(tokens[14], 10);
-    return [utime, stime];
+    fs.writeFileSync("/proc/self/clear_refs", "5");
   } catch (err) {
-    // /proc/self/stat 파일을 읽을 수 없는 환경(Windows 등)에서는 0 리턴
-    return [0, 0];
+    // clear_refs를 쓸 수 없는 환경에서는 누적 최대치가 그대로 남는다
   }
 }
 
@@ -56,71 +59,566 @@ function getVmHWM() {
 function runWithCapturedStdout(fn, ...args) {
   const originalLog = console.log;
 
-  let stdoutCapture = "";
+  const stdoutCapture = new BoundedCapture(captureLimit);
   console.log = (...logArgs) => {
     // logArgs를 문자열로 합쳐서 저장
-    stdoutCapture += logArgs.join(' ') + '\n';
+    stdoutCapture.write(logArgs.join(' ') + '\n');
   };
 
   let result = null;
   let error = null;
+  let errorType = null;
   try {
     result = fn(...args);
   } catch (err) {
     error = err.stack || err.message || String(err);
+    errorType = exceptionType(err);
   } finally {
     console.log = originalLog;
   }
 
-  return { result, stdout: stdoutCapture, error };
+  return { result, stdout: stdoutCapture.value(), error, errorType };
+}
+
+// 결과의 "error_type": 에러 이름. 시스템 에러는 "Error:EFBIG"처럼 code를 붙인다.
+function exceptionType(err) {
+  const name = (err && err.name) || typeof err;
+  return err && typeof err.code === 'string' ? `${name}:${err.code}` : name;
+}
+
+// 테스트케이스마다 남기는 stdout의 크기 (UTF-16 문자 수, 옵션 capture_limit)
+const DEFAULT_CAPTURE_LIMIT = 64 * 1024;
+
+// solution의 console.log 캡처. 앞 limit/2자와 뒤 limit/2자만 남기고, 그 사이는 버린 글자 수만 센다.
+// 출력을 아무리 많이 해도 메모리는 limit 정도로 일정하다.
+class BoundedCapture {
+  constructor(limit) {
+    this.headLimit = Math.floor(limit / 2);
+    this.tailLimit = limit - this.headLimit;
+    this.head = '';
+    this.tail = []; // tail[tailStart..]이 뒤쪽 조각들 (앞에서 빼는 shift는 느리므로 인덱스만 옮긴다)
+    this.tailStart = 0;
+    this.tailSize = 0;
+    this.dropped = 0;
+  }
+
+  write(text) {
+    if (this.head.length < this.headLimit) {
+      const taken = text.slice(0, this.headLimit - this.head.length);
+      this.head += taken;
+      text = text.slice(taken.length);
+    }
+    if (text.length >= this.tailLimit) { // 뒤쪽을 통째로 바꾼다
+      this.dropped += this.tailSize + text.length - this.tailLimit;
+      this.tail = [];
+      this.tailStart = 0;
+      this.tailSize = 0;
+      text = text.slice(text.length - this.tailLimit);
+    }
+    if (text.length === 0) {
+      return;
+    }
+    this.tail.push(text);
+    this.tailSize += text.length;
+    while (this.tailSize > this.tailLimit) {
+      const excess = this.tailSize - this.tailLimit;
+      const first = this.tail[this.tailStart];
+      if (first.length <= excess) {
+        this.tailStart++;
+        this.tailSize -= first.length;
+        this.dropped += first.length;
+      } else {
+        this.tail[this.tailStart] = first.slice(excess);
+        this.tailSize -= excess;
+        this.dropped += excess;
+      }
+    }
+    if (this.tailStart > 1024 && this.tailStart * 2 > this.tail.length) {
+      this.tail = this.tail.slice(this.tailStart);
+      this.tailStart = 0;
+    }
+  }
+
+  value() {
+    const tail = this.tail.slice(this.tailStart).join('');
+    if (this.dropped > 0) {
+      return `${this.head}\n... (${this.dropped} characters truncated) ...\n${tail}`;
+    }
+    return this.head + tail;
+  }
+}
+
+function compareValues(a, b) {
+  if (typeof a === 'number' && typeof b === 'number') {
+    return a - b;
+  }
+  const sa = JSON.stringify(a);
+  const sb = JSON.stringify(b);
+  return sa < sb ? -1 : (sa > sb ? 1 : 0);
+}
+
+/**
+ * solution 결과와 testcase의 "output"을 비교한다.
+ * - floatTolerance > 0: 숫자는 |a - e| <= tol * max(1, |e|) 이면 같다고 본다.
+ * - unordered: 최상위 배열은 순서를 무시하고 비교한다.
+ */
+function outputsEqual(actual, expected, floatTolerance, unordered) {
+  if (actual === undefined) {
+    actual = null;
+  }
+  if (typeof actual === 'number' && typeof expected === 'number') {
+    if (floatTolerance) {
+      return Math.abs(actual - expected) <= floatTolerance * Math.max(1, Math.abs(expected));
+    }
+    return actual === expected;
+  }
+  if (Array.isArray(actual) && Array.isArray(expected)) {
+    if (actual.length !== expected.length) {
+      return false;
+    }
+    if (unordered) {
+      actual = [...actual].sort(compareValues);
+      expected = [...expected].sort(compareValues);
+    }
+    return actual.every((value, i) => outputsEqual(value, expected[i], floatTolerance, false));
+  }
+  if (actual !== null && expected !== null && typeof actual === 'object' && typeof expected === 'object'
+      && !Array.isArray(actual) && !Array.isArray(expected)) {
+    const keys = Object.keys(expected);
+    if (Object.keys(actual).length !== keys.length) {
+      return false;
+    }
+    return keys.every((key) => key in actual && outputsEqual(actual[key], expected[key], floatTolerance, false));
+  }
+  return actual === expected;
+}
+
+// 테스트케이스 하나의 결과를 한 줄짜리 JSON(NDJSON)으로 바로 출력 (프로세스가 죽어도 이미 출력된 결과는 남는다)
+function emitResult(testCaseKey, caseResult) {
+  const line = JSON.stringify({ [testCaseKey]: caseResult }) + '\n';
+  // worker pool에서는 parentPort로 보낸다 (worker thread의 stdout은 비동기로 전달돼 해답이 멈추면 유실된다)
+  if (parentPort) {
+    parentPort.postMessage(line);
+  } else {
+    process.stdout.write(line);
+  }
+}
+
+// stop_on_failure로 실행하지 않은 테스트케이스
+function skippedResult() {
+  return {
+    "result": null,
+    "utime": -1,
+    "stime": -1,
+    "realtime": -1.0,
+    "max_memory": -1,
+    "stdout": "",
+    "stderr": "(skipped)",
+    "passed": null
+  };
 }
 
 // ----------------------------------------------------------------------------
 // CLI 인자 체크
 if (process.argv.length < 4) {
-  console.error("Usage: node index.js <solution_path> <testcase_path>");
+  console.error("Usage: node index.js <solution_path> <testcase_path> [options_path]");
   process.exit(1);
 }
 
 const solutionPath = process.argv[2];
 const testcasePath = process.argv[3];
+// 선택: harness 옵션 JSON 파일 경로
+const options = process.argv[4] ? JSON.parse(fs.readFileSync(process.argv[4], 'utf8')) : {};
+const checkOutput = options.check_output || false;
+const stopOnFailure = options.stop_on_failure || false;
+const floatTolerance = options.float_tolerance || 0;
+const unorderedOutput = options.unordered_output || false;
+const benchmark = options.benchmark || null;
+const profile = options.profile || null;
+const captureLimit = options.capture_limit !== undefined ? options.capture_limit : DEFAULT_CAPTURE_LIMIT;
+
 
+// 솔루션 컴파일: node --check 프로세스를 따로 띄우지 않고 harness가 vm.compileFunction으로 직접 컴파일한다.
+// require와 같이 (exports, require, module, __filename, __dirname)을 받는 함수가 된다.
+// 문법 에러면 node --check처럼 에러를 출력하고 COMPILE_ERROR_EXIT_CODE로 끝난다 (toolchain이 compile 단계 실패로 본다).
+// code_cache 옵션 ({dir, key: solution 해시}): V8 code cache(cachedData)를 읽어서 컴파일을 건너뛴다.
+// 캐시가 없거나 V8이 거부하면(node 버전, 플래그가 다를 때) 새로 만들어 쓴다. solution 코드가 실행되기 전에 쓴다.
+// 캐시에는 스크립트 이름도 들어가므로, 에러 위치는 실행 디렉터리 경로가 아닌 고정된 이름(solution.js)으로 표시한다.
+const COMPILE_ERROR_EXIT_CODE = 65;
+const SOLUTION_PARAMS = ['exports', 'require', 'module', '__filename', '__dirname'];
+const solutionFilename = path.resolve(solutionPath);
+const solutionScriptName = path.basename(solutionFilename);
 
-// 솔루션 모듈 로드
-const solutionModule = require(path.resolve(solutionPath));
-// solution이 함수 자체로 export 되었는지, 혹은 { solution: function } 형태인지 확인
-const solution = (typeof solutionModule === 'function')
-  ? solutionModule
-  : solutionModule.solution;
+function writeCodeCache(cachePath, data) {
+  const tmpPath = `${cachePath}.${process.pid}-${threadId}.tmp`;
+  try {
+    fs.writeFileSync(tmpPath, data);
+    fs.renameSync(tmpPath, cachePath); // 다른 harness가 반쯤 쓴 파일을 읽지 않도록
+  } catch (err) {
+    // 캐시는 없어도 된다
+  }
+}
+
+function compileSolution() {
+  const source = fs.readFileSync(solutionFilename, 'utf8');
+  const codeCache = options.code_cache;
+  const cachePath = codeCache
+    ? path.join(codeCache.dir, `${codeCache.key}-${process.version}-${process.arch}.bin`)
+    : null;
+  let cachedData;
+  if (cachePath) {
+    try {
+      cachedData = fs.readFileSync(cachePath);
+    } catch (err) {
+      cachedData = undefined;
+    }
+  }
+  let compiled;
+  try {
+    compiled = vm.compileFunction(source, SOLUTION_PARAMS, {
+      filename: solutionScriptName,
+      cachedData,
+      produceCachedData: cachePath !== null && cachedData === undefined,
+    });
+  } catch (err) {
+    const stack = String((err && err.stack) || err);
+    const at = stack.indexOf('\n    at ');
+    console.error(at === -1 ? stack : stack.slice(0, at));
+    process.exit(COMPILE_ERROR_EXIT_CODE);
+  }
+  if (compiled.cachedDataRejected) { // 다른 node 빌드가 쓴 캐시: 다시 만든다
+    compiled = vm.compileFunction(source, SOLUTION_PARAMS, { filename: solutionScriptName, produceCachedData: true });
+  }
+  if (compiled.cachedDataProduced) {
+    writeCodeCache(cachePath, compiled.cachedData);
+  }
+  return compiled;
+}
+
+const compiledSolution = compileSolution();
+
+// 솔루션 모듈 로드: 컴파일된 함수를 새 모듈로 실행한다.
+// 부를 때마다 모듈 전역(메모이제이션 등)이 처음 상태인 새 solution이 된다.
+function loadSolution() {
+  const solutionModule = new Module(solutionFilename, module);
+  solutionModule.filename = solutionFilename;
+  compiledSolution.call(solutionModule.exports, solutionModule.exports, Module.createRequire(solutionFilename),
+    solutionModule, solutionFilename, path.dirname(solutionFilename));
+  solutionModule.loaded = true;
+  const exported = solutionModule.exports;
+  // solution이 함수 자체로 export 되었는지, 혹은 { solution: function } 형태인지 확인
+  return (typeof exported === 'function')
+    ? exported
+    : exported.solution;
+}
+
+const solution = loadSolution();
 
 if (typeof solution !== 'function') {
   console.error("No valid solution function found in", solutionPath);
   process.exit(1);
 }
 
-// 테스트케이스 로드
-let testData;
-try {
-  testData = JSON.parse(fs.readFileSync(testcasePath, 'utf8'));
-} catch (err) {
-  console.error("Failed to open or parse testcase file:", testcasePath, err);
-  process.exit(1);
+// 테스트케이스 파일(NDJSON, 한 줄에 {key: testcase} 하나)을 한 줄씩 읽는다.
+// 전체를 한 번에 읽지 않으므로 메모리는 가장 큰 테스트케이스 하나만큼만 쓴다.
+function* readLines(filePath) {
+  const fd = fs.openSync(filePath, 'r');
+  const chunk = Buffer.alloc(1 << 20);
+  let pending = []; // 아직 줄바꿈을 만나지 못한 조각들 (UTF-8 문자가 잘려도 Buffer로 모아서 디코딩)
+  try {
+    let bytesRead;
+    while ((bytesRead = fs.readSync(fd, chunk, 0, chunk.length, null)) > 0) {
+      const data = chunk.subarray(0, bytesRead);
+      let start = 0;
+      let newline;
+      while ((newline = data.indexOf(10, start)) !== -1) {
+        pending.push(data.subarray(start, newline));
+        yield Buffer.concat(pending).toString('utf8');
+        pending = [];
+        start = newline + 1;
+      }
+      if (start < bytesRead) {
+        pending.push(Buffer.from(data.subarray(start))); // chunk는 재사용되므로 복사
+      }
+    }
+    if (pending.length) {
+      yield Buffer.concat(pending).toString('utf8');
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+// MessagePack 디코더 (testcase_format=msgpack). decodeMsgpack(buf, pos) -> [value, 다음 위치]
+// packed array(ext 1: int32, 2: int64, 3: float64, little-endian)는 TypedArray로 한 번에 읽어 배열로 바꾼다.
+function decodeMsgpack(buf, pos) {
+  const code = buf[pos++];
+  if (code <= 0x7f) return [code, pos];
+  if (code >= 0xe0) return [code - 0x100, pos];
+  if (code <= 0x8f) return decodeMsgpackMap(buf, pos, code & 0x0f);
+  if (code <= 0x9f) return decodeMsgpackArray(buf, pos, code & 0x0f);
+  if (code <= 0xbf) return [buf.toString('utf8', pos, pos + (code & 0x1f)), pos + (code & 0x1f)];
+  switch (code) {
+    case 0xc0: return [null, pos];
+    case 0xc2: return [false, pos];
+    case 0xc3: return [true, pos];
+    case 0xcc: return [buf.readUInt8(pos), pos + 1];
+    case 0xcd: return [buf.readUInt16BE(pos), pos + 2];
+    case 0xce: return [buf.readUInt32BE(pos), pos + 4];
+    case 0xcf: return [Number(buf.readBigUInt64BE(pos)), pos + 8];
+    case 0xd0: return [buf.readInt8(pos), pos + 1];
+    case 0xd1: return [buf.readInt16BE(pos), pos + 2];
+    case 0xd2: return [buf.readInt32BE(pos), pos + 4];
+    case 0xd3: return [Number(buf.readBigInt64BE(pos)), pos + 8];
+    case 0xca: return [buf.readFloatBE(pos), pos + 4];
+    case 0xcb: return [buf.readDoubleBE(pos), pos + 8];
+    case 0xd9: return decodeMsgpackStr(buf, pos + 1, buf.readUInt8(pos));
+    case 0xda: return decodeMsgpackStr(buf, pos + 2, buf.readUInt16BE(pos));
+    case 0xdb: return decodeMsgpackStr(buf, pos + 4, buf.readUInt32BE(pos));
+    case 0xc4: return [buf.subarray(pos + 1, pos + 1 + buf.readUInt8(pos)), pos + 1 + buf.readUInt8(pos)];
+    case 0xc5: return [buf.subarray(pos + 2, pos + 2 + buf.readUInt16BE(pos)), pos + 2 + buf.readUInt16BE(pos)];
+    case 0xc6: return [buf.subarray(pos + 4, pos + 4 + buf.readUInt32BE(pos)), pos + 4 + buf.readUInt32BE(pos)];
+    case 0xc7: return decodePacked(buf, pos + 1, buf.readUInt8(pos));
+    case 0xc8: return decodePacked(buf, pos + 2, buf.readUInt16BE(pos));
+    case 0xc9: return decodePacked(buf, pos + 4, buf.readUInt32BE(pos));
+    case 0xdc: return decodeMsgpackArray(buf, pos + 2, buf.readUInt16BE(pos));
+    case 0xdd: return decodeMsgpackArray(buf, pos + 4, buf.readUInt32BE(pos));
+    case 0xde: return decodeMsgpackMap(buf, pos + 2, buf.readUInt16BE(pos));
+    case 0xdf: return decodeMsgpackMap(buf, pos + 4, buf.readUInt32BE(pos));
+  }
+  throw new Error("unsupported MessagePack type 0x" + code.toString(16));
+}
+
+function decodeMsgpackStr(buf, pos, length) {
+  return [buf.toString('utf8', pos, pos + length), pos + length];
+}
+
+function decodeMsgpackArray(buf, pos, size) {
+  const items = new Array(size);
+  for (let i = 0; i < size; i++) {
+    [items[i], pos] = decodeMsgpack(buf, pos);
+  }
+  return [items, pos];
+}
+
+function decodeMsgpackMap(buf, pos, size) {
+  const items = {};
+  for (let i = 0; i < size; i++) {
+    let key;
+    [key, pos] = decodeMsgpack(buf, pos);
+    [items[key], pos] = decodeMsgpack(buf, pos);
+  }
+  return [items, pos];
+}
+
+function decodePacked(buf, pos, length) {
+  const extType = buf[pos++];
+  // TypedArray는 정렬된 메모리가 필요하므로 블록을 새 ArrayBuffer로 복사한다
+  const block = buf.buffer.slice(buf.byteOffset + pos, buf.byteOffset + pos + length);
+  let values;
+  if (extType === 1) {
+    values = new Int32Array(block);
+  } else if (extType === 2) {
+    values = new BigInt64Array(block);
+  } else if (extType === 3) {
+    values = new Float64Array(block);
+  } else {
+    throw new Error("unsupported ext type " + extType);
+  }
+  // 일반 배열로 바꿔서 JSON 입력과 같은 타입(push, sort 등)을 유지한다 (Array.from보다 단순 루프가 빠르다)
+  const items = new Array(values.length);
+  if (extType === 2) {
+    for (let i = 0; i < values.length; i++) items[i] = Number(values[i]);
+  } else {
+    for (let i = 0; i < values.length; i++) items[i] = values[i];
+  }
+  return [items, pos + length];
+}
+
+// .msgpack: [4바이트 little-endian 길이][MessagePack {key: testcase}] 레코드를 하나씩 읽는다
+function* readMsgpackRecords(filePath) {
+  const fd = fs.openSync(filePath, 'r');
+  const header = Buffer.alloc(4);
+  try {
+    while (fs.readSync(fd, header, 0, 4, null) === 4) {
+      const record = Buffer.alloc(header.readUInt32LE(0));
+      let bytesRead = 0;
+      while (bytesRead < record.length) {
+        const n = fs.readSync(fd, record, bytesRead, record.length - bytesRead, null);
+        if (n === 0) throw new Error("truncated testcase record: " + filePath);
+        bytesRead += n;
+      }
+      yield decodeMsgpack(record, 0)[0];
+    }
+  } finally {
+    fs.closeSync(fd);
+  }
+}
+
+function* readTestcases(filePath) {
+  if (filePath.endsWith('.msgpack')) {
+    for (const record of readMsgpackRecords(filePath)) {
+      yield* Object.entries(record);
+    }
+    return;
+  }
+  for (const line of readLines(filePath)) {
+    if (line.trim()) {
+      yield* Object.entries(JSON.parse(line));
+    }
+  }
+}
+
+// profile 모드: V8 CPU 프로파일러(--cpu-prof와 같은 것)를 inspector 세션으로 테스트케이스마다 켜고 끈다.
+// 같은 스레드의 세션은 post의 callback을 바로(동기적으로) 부른다.
+let profilerSession = null;
+if (profile) {
+  const inspector = require('inspector');
+  profilerSession = new inspector.Session();
+  profilerSession.connect();
+  profilerSession.post('Profiler.enable');
+  profilerSession.post('Profiler.setSamplingInterval', { interval: profile.interval || 1000 });
+}
+
+function profileFrameName(callFrame) {
+  const name = callFrame.functionName || '(anonymous)';
+  if (!callFrame.url) {
+    return name; // (garbage collector) 등
+  }
+  return `${name} (${path.basename(callFrame.url)}:${callFrame.lineNumber + 1})`.replace(/;/g, ':');
+}
+
+// .cpuprofile(노드 트리 + 샘플마다 노드 id) -> collapsed stack 형식("바깥;...;안쪽 샘플수" 한 줄씩)
+// runWithCapturedStdout과 그 바깥 프레임은 잘라내고, 그 아래가 아닌 샘플(harness, (program) 등)은 버린다.
+function collapseProfile(cpuProfile) {
+  const nodes = new Map();
+  const parents = new Map();
+  for (const node of cpuProfile.nodes) {
+    nodes.set(node.id, node);
+    for (const child of node.children || []) {
+      parents.set(child, node.id);
+    }
+  }
+  const counts = new Map();
+  for (const id of cpuProfile.samples) {
+    counts.set(id, (counts.get(id) || 0) + 1);
+  }
+  const stacks = new Map();
+  for (const [id, count] of counts) {
+    const names = [];
+    let current = id;
+    while (current !== undefined && nodes.get(current).callFrame.functionName !== 'runWithCapturedStdout') {
+      names.push(profileFrameName(nodes.get(current).callFrame));
+      current = parents.get(current);
+    }
+    if (current === undefined || names.length === 0) {
+      continue;
+    }
+    const stack = names.reverse().join(';');
+    stacks.set(stack, (stacks.get(stack) || 0) + count);
+  }
+  return [...stacks.keys()].sort().map((stack) => `${stack} ${stacks.get(stack)}\n`).join('');
+}
+
+function startProfile() {
+  profilerSession.post('Profiler.start');
+}
+
+function stopProfile() {
+  let collapsed = "";
+  profilerSession.post('Profiler.stop', (err, result) => {
+    if (!err) {
+      collapsed = collapseProfile(result.profile);
+    }
+  });
+  return collapsed;
+}
+
+function cloneInput(value) {
+  return (typeof structuredClone === 'function') ? structuredClone(value) : JSON.parse(JSON.stringify(value));
+}
+
+// 반복 실행 시간(초) 목록의 통계. p95는 nearest-rank, stddev는 표본 표준편차.
+function summarizeTimings(timings) {
+  const ordered = [...timings].sort((a, b) => a - b);
+  const count = ordered.length;
+  const stats = { "runs": count };
+  if (count === 0) {
+    return stats;
+  }
+  const mean = ordered.reduce((sum, t) => sum + t, 0) / count;
+  const variance = count > 1 ? ordered.reduce((sum, t) => sum + (t - mean) ** 2, 0) / (count - 1) : 0;
+  const middle = Math.floor(count / 2);
+  stats["min"] = parseFloat(ordered[0].toFixed(9));
+  stats["median"] = parseFloat((count % 2 ? ordered[middle] : (ordered[middle - 1] + ordered[middle]) / 2).toFixed(9));
+  stats["p95"] = parseFloat(ordered[Math.ceil(0.95 * count) - 1].toFixed(9));
+  stats["stddev"] = parseFloat(Math.sqrt(variance).toFixed(9));
+  return stats;
+}
+
+/**
+ * benchmark 모드: warmup번 실행한 뒤 repeat번 실행해서 시간 통계를 낸다. (결과와 출력은 버린다)
+ * - inputValues는 첫 실행 전에 복사해 둔 입력. 매번 다시 복사해서 solution이 인자를 바꿔도 같은 입력으로 실행한다.
+ * - fresh_instance: 매번 solution 스크립트를 새 모듈로 다시 실행한다.
+ * - allocated_bytes: 한 번 더 실행했을 때 heapUsed(process.memoryUsage)가 늘어난 양.
+ *   실행 중 GC가 돌면 줄어들므로 하한값이다.
+ * 복사와 재로드는 시간 측정 밖에서 한다. 반복 중 에러가 나면 거기서 멈춘다.
+ */
+function benchmarkCase(inputValues, options) {
+  const repeat = options.repeat || 0;
+  const warmup = options.warmup || 0;
+  const freshInstance = options.fresh_instance || false;
+  const timings = [];
+  const originalLog = console.log;
+  console.log = () => {};
+  try {
+    for (let run = 0; run < warmup + repeat; run++) {
+      const fn = freshInstance ? loadSolution() : solution;
+      const args = cloneInput(inputValues);
+      const startTime = process.hrtime.bigint();
+      fn(...args);
+      const elapsedSec = Number(process.hrtime.bigint() - startTime) / 1e9;
+      if (run >= warmup) {
+        timings.push(elapsedSec);
+      }
+    }
+    const fn = freshInstance ? loadSolution() : solution;
+    const args = cloneInput(inputValues);
+    const heapBefore = process.memoryUsage().heapUsed;
+    fn(...args);
+    const stats = summarizeTimings(timings);
+    stats["allocated_bytes"] = Math.max(0, process.memoryUsage().heapUsed - heapBefore);
+    return stats;
+  } catch (err) {
+    return summarizeTimings(timings);
+  } finally {
+    console.log = originalLog;
+  }
 }
 
 // 각 테스트케이스 실행
-const all_results = {}
-for (const [testCaseKey, testCase] of Object.entries(testData)) {
+let failed = false;
+for (const [testCaseKey, testCase] of readTestcases(testcasePath)) {
+  if (failed) {
+    emitResult(testCaseKey, skippedResult());
+    continue;
+  }
   const input = testCase.input;
   // input이 객체 형태라고 가정 -> values를 array로 변환
   const inputValues = Object.values(input);
+  // benchmark 모드: solution이 인자를 바꿀 수 있으므로 첫 실행 전의 입력을 복사해 둔다
+  const benchmarkInput = benchmark ? cloneInput(inputValues) : null;
 
   // 실행 전
+  resetPeakMemory();
   const [utimeBefore, stimeBefore] = getCpuTimes();
-  const vmhwmBefore = getVmHWM();
   const startTime = process.hrtime.bigint(); // 나노초 단위
 
   // solution 실행, stdout/에러 캡쳐
-  const { result, stdout, error } = runWithCapturedStdout(solution, ...inputValues);
+  if (profile) {
+    startProfile();
+  }
+  const { result, stdout, error, errorType } = runWithCapturedStdout(solution, ...inputValues);
 
   // 실행 후
   const endTime = process.hrtime.bigint();
@@ -129,12 +627,13 @@ for (const [testCaseKey, testCase] of Object.entries(testData)) {
 
   const [utimeAfter, stimeAfter] = getCpuTimes();
   const vmhwmAfter = getVmHWM();
+  const collapsedProfile = profile ? stopProfile() : null; // 측정이 끝난 뒤에 멈추고 변환한다
 
-  const usedUtime = utimeAfter - utimeBefore;
+  const usedUtime = utimeAfter - utimeBefore; // µs
   const usedStime = stimeAfter - stimeBefore;
-  const usedVmHWM = vmhwmAfter; // HWM은 누적 최대치이므로 after 값만 표시
+  const usedVmHWM = vmhwmAfter; // 실행 전에 리셋했으므로 이 테스트케이스의 최대 RSS (kB)
 
-  all_results[testCaseKey] = {
+  const caseResult = {
     "result": result,
     "utime": usedUtime,
     "stime": usedStime,
@@ -143,5 +642,23 @@ for (const [testCaseKey, testCase] of Object.entries(testData)) {
     "stdout": stdout ? stdout.trim() : stdout,
     "stderr": error ? error.trim() : error
   }
-}
-console.log(JSON.stringify(all_results, null, 2));
\ No newline at end of file
+  if (errorType) {
+    caseResult["error_type"] = errorType;
+  }
+  if (profile) {
+    caseResult["profile"] = collapsedProfile;
+  }
+
+  // submit 모드: 기대 출력과 비교하고, 첫 실패(오답/런타임 에러)에서 멈춘다
+  if (checkOutput && 'output' in testCase) {
+    caseResult["passed"] = !error && outputsEqual(result, testCase.output, floatTolerance, unorderedOutput);
+  }
+  if (benchmark && !error) {
+    caseResult["benchmark"] = benchmarkCase(benchmarkInput, benchmark);
+  }
+  if (stopOnFailure && (error || caseResult["passed"] === false)) {
+    failed = true;
+  }
+
+  emitResult(testCaseKey, caseResult);
+}
\ No newline at end of file
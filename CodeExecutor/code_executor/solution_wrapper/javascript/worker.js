@@ -0,0 +1,91 @@
+// worker.js
+// 오래 살아있는 Node 프로세스. job마다 main.js를 새 worker thread(별도 V8 isolate, 별도 module cache)로 실행한다.
+const path = require('path');
+const readline = require('readline');
+const { Worker } = require('worker_threads');
+
+const harnessPath = path.join(__dirname, 'main.js');
+
+// accept(length)가 false를 반환하면 더 모으지 않는다
+function collect(stream, accept) {
+  const chunks = [];
+  stream.on('data', (chunk) => {
+    if (accept(chunk.length)) {
+      chunks.push(chunk);
+    }
+  });
+  return new Promise((resolve) => stream.on('end', () => resolve(Buffer.concat(chunks).toString('utf8'))));
+}
+
+function runJob(job) {
+  return new Promise((resolve) => {
+    const memoryLimit = job.limits && job.limits.memory_limit;
+    const worker = new Worker(harnessPath, {
+      argv: job.args,
+      stdout: true,
+      stderr: true,
+      // 메모리 제한: worker thread의 V8 heap 크기 (초과하면 ERR_WORKER_OUT_OF_MEMORY)
+      resourceLimits: memoryLimit ? { maxOldGenerationSizeMb: memoryLimit } : undefined,
+    });
+    // 출력 제한: job의 stdout + stderr가 pipe_limit 바이트를 넘으면 더 모으지 않고 worker thread를 끝낸다
+    const pipeLimit = job.pipe_limit || Infinity;
+    let outputBytes = 0;
+    let outputExceeded = false;
+    const accept = (length) => {
+      outputBytes += length;
+      if (outputBytes > pipeLimit && !outputExceeded) {
+        outputExceeded = true;
+        worker.terminate();
+      }
+      return !outputExceeded;
+    };
+    const stdoutDone = collect(worker.stdout, accept);
+    const stderrDone = collect(worker.stderr, accept);
+    // 결과 줄은 parentPort 메시지로 받는다 (worker thread의 stdout은 비동기로 전달돼 해답이 멈추면 유실된다)
+    const resultLines = [];
+    worker.on('message', (line) => {
+      if (accept(Buffer.byteLength(line))) {
+        resultLines.push(line);
+      }
+    });
+
+    let timedOut = false;
+    const timer = setTimeout(() => {
+      timedOut = true;
+      worker.terminate();
+    }, job.timeout * 1000);
+
+    let uncaught = '';
+    let memoryExceeded = false;
+    worker.on('error', (err) => {
+      memoryExceeded = err && err.code === 'ERR_WORKER_OUT_OF_MEMORY';
+      uncaught = err && err.stack ? err.stack : String(err);
+    });
+    worker.on('exit', async (code) => {
+      clearTimeout(timer);
+      const [streamed, stderr] = await Promise.all([stdoutDone, stderrDone]);
+      const stdout = resultLines.join('') + streamed;
+      if (timedOut) {
+        // 끝난 테스트케이스의 결과 줄(마지막 줄바꿈까지)은 남긴다
+        resolve({ returncode: -9, stdout: stdout.slice(0, stdout.lastIndexOf('\n') + 1), stderr: 'timeout' });
+      } else if (outputExceeded) {
+        resolve({ returncode: code, stdout: '', stderr: 'output limit exceeded' });
+      } else if (memoryExceeded) {
+        resolve({ returncode: 1, stdout, stderr: 'memory limit exceeded' });
+      } else {
+        resolve({ returncode: uncaught ? 1 : code, stdout, stderr: stderr + uncaught });
+      }
+    });
+  });
+}
+
+// job은 한 번에 하나씩 처리 (pool 크기 = 프로세스 수)
+const rl = readline.createInterface({ input: process.stdin });
+let queue = Promise.resolve();
+rl.on('line', (line) => {
+  const job = JSON.parse(line);
+  queue = queue.then(async () => {
+    const response = await runJob(job);
+    process.stdout.write(JSON.stringify(response) + '\n');
+  });
+});
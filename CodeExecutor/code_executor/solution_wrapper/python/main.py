@@ -1,23 +1,39 @@
+import os
 import sys
+import errno
 import json
+import signal
+import collections
 import importlib.util
 import io
 import contextlib
 import traceback
 import time
+import resource
+import struct
+import copy
+import math
+import statistics
+import tracemalloc
+from array import array
 
 def get_cpu_times():
     """
-    /proc/self/stat에서 utime(14번째 필드), stime(15번째 필드)를 읽어서 반환.
+    현재 스레드의 (utime, stime)을 µs 단위로 반환. (getrusage(RUSAGE_THREAD), clock tick보다 정밀하다)
     """
-    with open("/proc/self/stat", "r", encoding="utf-8") as f:
-        data = f.read().split()
-        # /proc/[pid]/stat 파일 형식 (참고: man proc)
-        # data[13] -> utime
-        # data[14] -> stime
-        utime = int(data[13])
-        stime = int(data[14])
-    return utime, stime
+    usage = resource.getrusage(resource.RUSAGE_THREAD)
+    return round(usage.ru_utime * 1e6), round(usage.ru_stime * 1e6)
+
+def reset_peak_memory():
+    """
+    /proc/self/clear_refs에 5를 써서 VmHWM(peak RSS)을 현재 RSS로 되돌린다. (Linux 4.0+)
+    테스트케이스마다 리셋해야 max_memory가 그 테스트케이스의 최대치가 된다.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
 
 def get_vmhwm():
     """
@@ -33,14 +49,213 @@ def get_vmhwm():
                 break
     return vmhwm
 
-def run_solution(solution_func, *args):
+def load_options(argv):
+    """
+    argv[3] (선택): harness 옵션 JSON 파일 경로. 없으면 빈 dict.
+    """
+    if len(argv) > 3 and argv[3]:
+        with open(argv[3], "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+# MessagePack 고정 길이 타입: type byte -> struct 형식
+MSGPACK_FIXED = {
+    0xcc: ">B", 0xcd: ">H", 0xce: ">I", 0xcf: ">Q",
+    0xd0: ">b", 0xd1: ">h", 0xd2: ">i", 0xd3: ">q",
+    0xca: ">f", 0xcb: ">d",
+}
+# 길이가 앞에 붙는 타입: type byte -> 길이의 struct 형식
+MSGPACK_LENGTHS = {
+    0xc4: ">B", 0xc5: ">H", 0xc6: ">I", 0xd9: ">B", 0xda: ">H", 0xdb: ">I",
+    0xc7: ">B", 0xc8: ">H", 0xc9: ">I", 0xdc: ">H", 0xdd: ">I", 0xde: ">H", 0xdf: ">I",
+}
+# packed array ext type -> array typecode (little-endian int32 / int64 / float64)
+PACKED_TYPECODES = {1: "i", 2: "q", 3: "d"}
+
+def unpack_msgpack(data, pos):
+    """
+    data[pos]부터 MessagePack 값 하나를 디코딩해 (value, 다음 위치)를 반환한다.
+    packed array(ext 1~3)는 숫자 하나씩 파싱하지 않고 array로 한 번에 복사한 뒤 list로 바꾼다.
+    """
+    code = data[pos]
+    pos += 1
+    if code <= 0x7f:
+        return code, pos
+    if code >= 0xe0:
+        return code - 0x100, pos
+    if code <= 0x8f:
+        return unpack_msgpack_map(data, pos, code & 0x0f)
+    if code <= 0x9f:
+        return unpack_msgpack_array(data, pos, code & 0x0f)
+    if code <= 0xbf:
+        end = pos + (code & 0x1f)
+        return data[pos:end].decode("utf-8"), end
+    if code == 0xc0:
+        return None, pos
+    if code in (0xc2, 0xc3):
+        return code == 0xc3, pos
+    if code in MSGPACK_FIXED:
+        fmt = MSGPACK_FIXED[code]
+        return struct.unpack_from(fmt, data, pos)[0], pos + struct.calcsize(fmt)
+    fmt = MSGPACK_LENGTHS[code]
+    length = struct.unpack_from(fmt, data, pos)[0]
+    pos += struct.calcsize(fmt)
+    if code in (0xdc, 0xdd):
+        return unpack_msgpack_array(data, pos, length)
+    if code in (0xde, 0xdf):
+        return unpack_msgpack_map(data, pos, length)
+    if code in (0xc7, 0xc8, 0xc9):
+        block = array(PACKED_TYPECODES[data[pos]])
+        block.frombytes(data[pos + 1:pos + 1 + length])
+        if sys.byteorder != "little":
+            block.byteswap()
+        return block.tolist(), pos + 1 + length
+    end = pos + length
+    if code in (0xd9, 0xda, 0xdb):
+        return data[pos:end].decode("utf-8"), end
+    return bytes(data[pos:end]), end
+
+def unpack_msgpack_array(data, pos, size):
+    items = []
+    for _ in range(size):
+        item, pos = unpack_msgpack(data, pos)
+        items.append(item)
+    return items, pos
+
+def unpack_msgpack_map(data, pos, size):
+    items = {}
+    for _ in range(size):
+        key, pos = unpack_msgpack(data, pos)
+        items[key], pos = unpack_msgpack(data, pos)
+    return items, pos
+
+def iter_testcases(testcase_path):
+    """
+    testcase 파일을 테스트케이스 하나씩 읽어 (key, testcase)를 yield한다.
+    전체를 한 번에 읽지 않으므로 메모리는 가장 큰 테스트케이스 하나만큼만 쓴다.
+    - .msgpack: [4바이트 little-endian 길이][MessagePack {key: testcase}] 레코드의 연속
+    - 그 외: NDJSON, 한 줄에 {key: testcase} 하나 (한 줄짜리 JSON 객체 파일도 그대로 읽힌다)
+    """
+    if testcase_path.endswith(".msgpack"):
+        with open(testcase_path, "rb") as f:
+            while True:
+                header = f.read(4)
+                if not header:
+                    return
+                length = struct.unpack("<I", header)[0]
+                yield from unpack_msgpack(f.read(length), 0)[0].items()
+    with open(testcase_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield from json.loads(line).items()
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def sort_key(value):
+    return (0, value, "") if is_number(value) else (1, 0, json.dumps(value, sort_keys=True))
+
+def outputs_equal(actual, expected, float_tolerance=0.0, unordered=False):
+    """
+    solution 결과와 testcase의 "output"을 비교한다.
+    - float_tolerance > 0: 숫자는 |a - e| <= tol * max(1, |e|) 이면 같다고 본다.
+    - unordered: 최상위 리스트는 순서를 무시하고 비교한다.
+    """
+    if isinstance(actual, tuple):
+        actual = list(actual)
+    if is_number(actual) and is_number(expected):
+        if float_tolerance:
+            return abs(actual - expected) <= float_tolerance * max(1.0, abs(expected))
+        return actual == expected
+    if isinstance(actual, list) and isinstance(expected, list):
+        if len(actual) != len(expected):
+            return False
+        if unordered:
+            actual = sorted(actual, key=sort_key)
+            expected = sorted(expected, key=sort_key)
+        return all(outputs_equal(a, e, float_tolerance) for a, e in zip(actual, expected))
+    if isinstance(actual, dict) and isinstance(expected, dict):
+        actual = {str(k): v for k, v in actual.items()}
+        return (actual.keys() == expected.keys()
+                and all(outputs_equal(actual[k], expected[k], float_tolerance) for k in expected))
+    if isinstance(actual, bool) or isinstance(expected, bool):
+        return actual is expected
+    return actual == expected
+
+def skipped_result():
+    # stop_on_failure로 실행하지 않은 테스트케이스
+    return {
+        "result": None,
+        "utime": -1,
+        "stime": -1,
+        "realtime": -1.0,
+        "max_memory": -1,
+        "stdout": "",
+        "stderr": "(skipped)",
+        "passed": None
+    }
+
+# 테스트케이스마다 남기는 stdout의 크기 (문자 수, 옵션 capture_limit)
+DEFAULT_CAPTURE_LIMIT = 64 * 1024
+
+class BoundedCapture(io.TextIOBase):
+    """
+    solution의 stdout 캡쳐. 앞 limit/2자와 뒤 limit/2자만 남기고, 그 사이는 버린 글자 수만 센다.
+    뒤쪽 조각은 list에 쌓다가 tail_limit의 2배를 넘을 때만 뒤 tail_limit자로 접는다 (write는 평균 O(1)).
+    print를 아무리 많이 해도 메모리는 limit의 1.5배 정도로 일정하다.
+    """
+    __slots__ = ("head_limit", "tail_limit", "head", "head_size", "tail", "tail_size", "dropped")
+
+    def __init__(self, limit):
+        self.head_limit = limit // 2
+        self.tail_limit = limit - self.head_limit
+        self.head = []
+        self.head_size = 0
+        self.tail = []
+        self.tail_size = 0
+        self.dropped = 0
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        written = len(text)
+        if self.head_size < self.head_limit:
+            taken = text[:self.head_limit - self.head_size]
+            self.head.append(taken)
+            self.head_size += len(taken)
+            text = text[len(taken):]
+        if text:
+            self.tail.append(text)
+            self.tail_size += len(text)
+            if self.tail_size > 2 * self.tail_limit:
+                self._fold()
+        return written
+
+    def _fold(self):
+        tail = "".join(self.tail)
+        excess = max(len(tail) - self.tail_limit, 0)
+        self.dropped += excess
+        self.tail = [tail[excess:]] if tail else []
+        self.tail_size = len(tail) - excess
+
+    def getvalue(self):
+        self._fold()
+        head = "".join(self.head)
+        tail = "".join(self.tail)
+        if self.dropped:
+            return f"{head}\n... ({self.dropped} characters truncated) ...\n{tail}"
+        return head + tail
+
+def run_solution(solution_func, *args, capture_limit=DEFAULT_CAPTURE_LIMIT):
     """
     solution 함수를 실행하면서 stdout을 캡쳐하고,
-    에러가 발생하면 에러 메시지도 캡쳐한다.
-    (result, stdout_output, error_msg)를 튜플로 반환한다.
+    에러가 발생하면 에러 메시지와 종류도 캡쳐한다.
+    (result, stdout_output, error_msg, error_type)를 튜플로 반환한다.
     """
-    captured_output = io.StringIO()
+    captured_output = BoundedCapture(capture_limit)
     error_msg = None
+    error_type = None
     result = None
     
     try:
@@ -49,45 +264,174 @@ def run_solution(solution_func, *args):
     except Exception as e:
         # 에러 발생 시 traceback 캡쳐
         error_msg = traceback.format_exc()
+        error_type = exception_type(e)
     
     output_str = captured_output.getvalue()
-    return result, output_str, error_msg
+    return result, output_str, error_msg, error_type
+
+def exception_type(e):
+    """
+    결과의 "error_type": 예외 클래스 이름. errno가 있는 OSError는 "OSError:EFBIG"처럼 errno 이름을 붙인다.
+    """
+    name = type(e).__name__
+    if isinstance(e, OSError) and e.errno in errno.errorcode:
+        name += ":" + errno.errorcode[e.errno]
+    return name
+
+def load_solution(solution_path):
+    """
+    solution.py를 새 모듈로 로드해서 solution 함수를 반환한다.
+    다시 호출하면 모듈 전역(lru_cache, 전역 dict 등)이 처음 상태인 새 solution이 된다.
+    """
+    spec = importlib.util.spec_from_file_location("Solution", solution_path)
+    solution_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(solution_module)
+    return solution_module.solution
+
+def summarize_timings(timings):
+    """
+    반복 실행 시간(초) 목록의 통계. p95는 nearest-rank, stddev는 표본 표준편차.
+    """
+    ordered = sorted(timings)
+    count = len(ordered)
+    stats = {"runs": count}
+    if count == 0:
+        return stats
+    stats["min"] = round(ordered[0], 9)
+    stats["median"] = round(statistics.median(ordered), 9)
+    stats["p95"] = round(ordered[math.ceil(0.95 * count) - 1], 9)
+    stats["stddev"] = round(statistics.stdev(ordered), 9) if count > 1 else 0.0
+    return stats
+
+def benchmark_case(solution, solution_path, input_values, benchmark):
+    """
+    benchmark 모드: warmup번 실행한 뒤 repeat번 실행해서 시간 통계를 낸다. (결과와 출력은 버린다)
+    - input_values는 첫 실행 전에 복사해 둔 입력. 매번 다시 깊은 복사해서 solution이 인자를 바꿔도 같은 입력으로 실행한다.
+    - fresh_instance: 매번 solution.py를 다시 로드해서 반복 사이의 메모이제이션을 막는다.
+    - allocated_bytes: 시간 측정이 끝난 뒤 tracemalloc을 켜고 한 번 더 실행했을 때의 peak (tracemalloc은 느리다)
+    복사와 재로드는 시간 측정 밖에서 한다. 반복 중 에러가 나면 거기서 멈춘다.
+    """
+    repeat = benchmark.get("repeat", 0)
+    warmup = benchmark.get("warmup", 0)
+    fresh_instance = benchmark.get("fresh_instance", False)
+
+    def prepare():
+        return (load_solution(solution_path) if fresh_instance else solution), copy.deepcopy(input_values)
+
+    timings = []
+    sink = BoundedCapture(0) # 출력은 버린다
+    try:
+        with contextlib.redirect_stdout(sink):
+            for run in range(warmup + repeat):
+                func, args = prepare()
+                start_time = time.perf_counter()
+                func(*args)
+                elapsed_time = time.perf_counter() - start_time
+                if run >= warmup:
+                    timings.append(elapsed_time)
+            func, args = prepare()
+            tracemalloc.start()
+            try:
+                func(*args)
+                allocated_bytes = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except Exception:
+        return summarize_timings(timings)
+    stats = summarize_timings(timings)
+    stats["allocated_bytes"] = allocated_bytes
+    return stats
+
+class Sampler:
+    """
+    profile 모드: CPU 시간 interval µs마다 SIGPROF(setitimer ITIMER_PROF)를 받아 solution의 호출 스택을 센다.
+    핸들러는 바이트코드 사이에서 실행되므로, 오래 걸리는 C 함수(sorted 등) 안의 시간은 그 호출이 끝난 뒤에 잡히고
+    그 사이의 시그널은 하나로 합쳐진다. 그래서 샘플마다 직전 샘플 이후의 CPU 시간(interval 단위)을 더한다.
+    stop()은 collapsed stack 형식("바깥;...;안쪽 가중치 합" 한 줄씩)을 반환한다. run_solution과 그 바깥 프레임은 잘라낸다.
+    """
+    def __init__(self, interval_us, solution_path):
+        self.interval = interval_us / 1e6
+        self.solution_file = os.path.abspath(solution_path)
+        self.stacks = collections.Counter()
+        self.last_sample = 0.0
+        signal.signal(signal.SIGPROF, self._sample)
+
+    def _sample(self, signum, frame):
+        now = time.thread_time()
+        weight = max(1, round((now - self.last_sample) / self.interval))
+        self.last_sample = now
+        names = []
+        outermost = None
+        while frame is not None and frame.f_code is not run_solution.__code__:
+            outermost = frame.f_code
+            names.append(f"{getattr(outermost, 'co_qualname', outermost.co_name)} "
+                         f"({os.path.basename(outermost.co_filename)}:{outermost.co_firstlineno})")
+            frame = frame.f_back
+        # solution 호출 안의 샘플만 (redirect_stdout 등 harness 코드는 뺀다)
+        if frame is not None and outermost is not None and os.path.abspath(outermost.co_filename) == self.solution_file:
+            self.stacks[";".join(reversed(names))] += weight
+
+    def start(self):
+        self.stacks.clear()
+        self.last_sample = time.thread_time()
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+def emit_result(test_case_key, case_result):
+    """
+    테스트케이스 하나의 결과를 한 줄짜리 JSON(NDJSON)으로 바로 출력한다.
+    프로세스가 도중에 죽어도 이미 출력된 결과는 남는다.
+    """
+    print(json.dumps({test_case_key: case_result}, ensure_ascii=False), flush=True)
 
 def main():
     if len(sys.argv) < 3:
-        print("Usage: python <script> <solution_path> <testcase_path>")
+        print("Usage: python <script> <solution_path> <testcase_path> [options_path]")
         sys.exit(1)
     
     solution_path = sys.argv[1]
     testcase_path = sys.argv[2]
+    options = load_options(sys.argv)
+    check_output = options.get("check_output", False)
+    stop_on_failure = options.get("stop_on_failure", False)
+    float_tolerance = options.get("float_tolerance", 0.0)
+    unordered = options.get("unordered_output", False)
+    benchmark = options.get("benchmark")
+    profile = options.get("profile")
+    capture_limit = options.get("capture_limit", DEFAULT_CAPTURE_LIMIT)
     
     # solution.py 모듈 동적 로드
-    spec = importlib.util.spec_from_file_location("Solution", solution_path)
-    solution_module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(solution_module)
-    solution = solution_module.solution
-    
-    # 테스트케이스 로드
-    with open(testcase_path, "r", encoding="utf-8") as f:
-        root = json.load(f)
+    solution = load_solution(solution_path)
+    sampler = Sampler(profile.get("interval", 1000), solution_path) if profile else None
     
-    # 결과가 담길 배열 생성
-    all_results = {}
+    failed = False
+
+    # 각 테스트케이스에 대해 실행 (한 줄씩 읽어서 디코딩)
+    for test_case_key, test_case in iter_testcases(testcase_path):
+        if failed:
+            emit_result(test_case_key, skipped_result())
+            continue
 
-    # 각 테스트케이스에 대해 실행
-    for test_case_key, test_case in root.items():
         input_data = test_case["input"]
         input_values = list(input_data.values())
+        # benchmark 모드: solution이 인자를 바꿀 수 있으므로 첫 실행 전의 입력을 복사해 둔다
+        benchmark_input = copy.deepcopy(input_values) if benchmark else None
         
         # 실행 전 자원 측정
+        reset_peak_memory()
         utime_before, stime_before = get_cpu_times()
-        vmhwm_before = get_vmhwm()
         
         # 실제 시간 측정(시작)
         start_time = time.perf_counter()
         
         # solution 실행(출력/에러 캡쳐)
-        result, captured_stdout, error_msg = run_solution(solution, *input_values)
+        if sampler:
+            sampler.start()
+        result, captured_stdout, error_msg, error_type = run_solution(solution, *input_values,
+                                                                      capture_limit=capture_limit)
         
         # 실제 시간 측정(종료)
         end_time = time.perf_counter()
@@ -96,16 +440,17 @@ def main():
         # 실행 후 자원 측정
         utime_after, stime_after = get_cpu_times()
         vmhwm_after = get_vmhwm()
+        if sampler:
+            collapsed_profile = sampler.stop() # 측정이 끝난 뒤에 멈춘다
         
-        # CPU 시간 사용량 계산 (tick 단위)
+        # CPU 시간 사용량 계산 (µs 단위)
         used_utime = utime_after - utime_before
         used_stime = stime_after - stime_before
         
-        # VmHWM은 프로세스 전체 생애에서 "최대 사용량"의 누적 기록
-        # 테스트케이스 단위로는 단순 참고로 after 값만 출력(혹은 diff 확인)
+        # 실행 전에 VmHWM을 리셋했으므로 after 값이 이 테스트케이스의 최대 RSS (kB)
         used_vmhwm = vmhwm_after
 
-        all_results[test_case_key] = {
+        case_result = {
             "result": result,
             "utime": used_utime,
             "stime": used_stime,
@@ -114,8 +459,22 @@ def main():
             "stdout": captured_stdout.strip() if captured_stdout else captured_stdout,
             "stderr": error_msg.strip() if error_msg else error_msg
         }
-    # 모든 테스트케이스 한번에 출력    
-    print(json.dumps(all_results, indent=2, ensure_ascii=False))
+        if error_type:
+            case_result["error_type"] = error_type
+        if sampler:
+            case_result["profile"] = collapsed_profile
+
+        # submit 모드: 기대 출력과 비교하고, 첫 실패(오답/런타임 에러)에서 멈춘다
+        if check_output and "output" in test_case:
+            case_result["passed"] = (
+                error_msg is None and outputs_equal(result, test_case["output"], float_tolerance, unordered)
+            )
+        if benchmark and error_msg is None:
+            case_result["benchmark"] = benchmark_case(solution, solution_path, benchmark_input, benchmark)
+        if stop_on_failure and (error_msg is not None or case_result.get("passed") is False):
+            failed = True
+
+        emit_result(test_case_key, case_result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import os
+import sys
+import json
+import resource
+import select
+import signal
+import time
+import traceback
+
+# main.py(harness)와 그 import(json, importlib 등)를 미리 로드해 두고, job마다 fork 한다.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import main as harness
+
+# pipe_limit이 있는 job은 이 간격으로 출력 파일 크기를 확인한다.
+OUTPUT_POLL_SECONDS = 0.01
+
+
+def run_child(job, stdout_path, stderr_path):
+    """
+    fork된 자식 프로세스에서 harness를 실행한다. 반환하지 않는다.
+    """
+    try:
+        devnull = os.open(os.devnull, os.O_RDONLY)
+        os.dup2(devnull, 0)
+        for fd, path in ((1, stdout_path), (2, stderr_path)):
+            out = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            os.dup2(out, fd)
+            os.close(out)
+        os.chdir(job["execute_dir"])
+        # 자원 제한은 fork된 job에만 적용 (CPU 시간은 fork 시점에 0부터 다시 센다)
+        for name, value in job.get("limits", {}).get("rlimits", {}).items():
+            hard = value + 1 if name == "RLIMIT_CPU" else value
+            resource.setrlimit(getattr(resource, name), (value, hard))
+        if "pipe_limit" in job:
+            # 출력 파일 하나가 pipe_limit을 넘으면 write가 EFBIG로 실패한다 (부모의 poll 사이에 디스크를 채우지 않도록)
+            cap = job["pipe_limit"] + 1
+            soft, hard = resource.getrlimit(resource.RLIMIT_FSIZE)
+            resource.setrlimit(resource.RLIMIT_FSIZE, (lower_limit(soft, cap), lower_limit(hard, cap)))
+        sys.argv = [harness.__file__] + job["args"]
+        harness.main()
+        exit_code = 0
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exit_code)
+
+
+def lower_limit(limit, cap):
+    return cap if limit == resource.RLIM_INFINITY else min(limit, cap)
+
+
+def wait_child(pid, timeout, output_paths=(), pipe_limit=None):
+    """
+    자식 프로세스를 timeout까지 기다린다. (status, error) 반환. error: None, "timeout" 또는 "output limit exceeded".
+    pipe_limit이 있으면 OUTPUT_POLL_SECONDS마다 output_paths의 크기를 확인하고, 넘으면 바로 죽인다.
+    """
+    deadline = time.monotonic() + timeout
+    pidfd = os.pidfd_open(pid) if hasattr(os, "pidfd_open") else None
+    try:
+        while True:
+            wpid, status = os.waitpid(pid, os.WNOHANG)
+            if wpid:
+                return status, None
+            if pipe_limit is not None and output_size(*output_paths) > pipe_limit:
+                return kill_child(pid), "output limit exceeded"
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return kill_child(pid), "timeout"
+            if pipe_limit is not None:
+                remaining = min(remaining, OUTPUT_POLL_SECONDS)
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(remaining, 0.001))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def kill_child(pid):
+    os.kill(pid, signal.SIGKILL)
+    _, status = os.waitpid(pid, 0)
+    return status
+
+
+def output_size(*paths):
+    size = 0
+    for path in paths:
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass
+    return size
+
+
+def read_file(path):
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read()
+    except OSError:
+        return ""
+
+
+def main():
+    for line in sys.stdin:
+        job = json.loads(line)
+        stdout_path = os.path.join(job["execute_dir"], "worker_stdout.txt")
+        stderr_path = os.path.join(job["execute_dir"], "worker_stderr.txt")
+
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            run_child(job, stdout_path, stderr_path)
+
+        status, error = wait_child(pid, job["timeout"], (stdout_path, stderr_path), job.get("pipe_limit"))
+        response = {"returncode": os.waitstatus_to_exitcode(status), "stdout": ""}
+        if error == "timeout":
+            # 끝난 테스트케이스의 결과 줄(마지막 줄바꿈까지)은 남긴다
+            stdout = read_file(stdout_path)
+            response["stdout"], response["stderr"] = stdout[:stdout.rfind("\n") + 1], error
+        elif error:
+            response["stderr"] = error
+        elif output_size(stdout_path, stderr_path) > job.get("pipe_limit", float("inf")):
+            # 출력이 너무 많으면 읽지 않는다 (worker의 메모리는 출력량과 상관없이 일정하다)
+            response["stderr"] = "output limit exceeded"
+        else:
+            response["stdout"], response["stderr"] = read_file(stdout_path), read_file(stderr_path)
+        sys.stdout.write(json.dumps(response, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
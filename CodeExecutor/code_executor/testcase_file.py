@@ -0,0 +1,164 @@
+import os, json, struct
+from code_executor.directory_manager import stage_asset
+from code_executor.msgpack_codec import pack_testcase, unpackb
+from code_executor.configs.compile_config import TESTCASE_INDEX_SUFFIX, DEFAULT_TESTCASE_NAME, BINARY_TESTCASE_NAME
+
+# Testcase containers, one {test_case_key: {"input": ..., "output": ...}} record per case.
+# The format is chosen by the file extension, in the parent and in the harnesses alike:
+# - .ndjson: one JSON object per line.
+# - .msgpack: records of a 4-byte little-endian length and a MessagePack map (msgpack_codec.py).
+#   Arrays of numbers under "input" are packed, so the harnesses copy them instead of parsing every number.
+# The harnesses read one record at a time, so their peak memory is the largest case, not the whole suite.
+# A sidecar index ({path}.idx, NDJSON) holds one [test_case_key, offset, length] per record,
+# so the parent can list keys and cut shards without decoding any case.
+_LENGTH = struct.Struct('<I')
+
+
+class TestcaseFormat:
+    JSON = "json" # .ndjson
+    MSGPACK = "msgpack" # .msgpack
+
+    @staticmethod
+    def of(path):
+        """Format of a testcase file: MSGPACK for .msgpack, JSON otherwise."""
+        return TestcaseFormat.MSGPACK if path is not None and is_binary(path) else TestcaseFormat.JSON
+
+    @staticmethod
+    def fname(testcase_format):
+        return BINARY_TESTCASE_NAME if testcase_format == TestcaseFormat.MSGPACK else DEFAULT_TESTCASE_NAME
+
+
+def index_path(path):
+    return path + TESTCASE_INDEX_SUFFIX
+
+
+def is_binary(path):
+    return path.endswith(".msgpack")
+
+
+def container_suffix(path):
+    return ".msgpack" if is_binary(path) else ".ndjson"
+
+
+def encode_record(path, test_case_key, test_case):
+    """Bytes of one record in the format of the container at path."""
+    if is_binary(path):
+        record = pack_testcase(test_case_key, test_case)
+        return _LENGTH.pack(len(record)) + record
+    return (json.dumps({test_case_key: test_case}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def write_testcase_file(testcase, path):
+    """
+    Writes a testcase as a container at path, with its index.
+    testcase: dict, JSON string or iterable of (test_case_key, test_case).
+    """
+    if isinstance(testcase, str):
+        testcase = json.loads(testcase)
+    if isinstance(testcase, dict):
+        testcase = testcase.items()
+    offset = 0
+    with open(path, "wb") as f, open(index_path(path), "w") as index:
+        for test_case_key, test_case in testcase:
+            record = encode_record(path, test_case_key, test_case)
+            f.write(record)
+            index.write(json.dumps([test_case_key, offset, len(record)], ensure_ascii=False) + "\n")
+            offset += len(record)
+
+
+def stage_testcase_file(src, path, link=False):
+    """
+    Puts the testcase file src at path and indexes it.
+    A container in the format of path is copied (or linked) as it is; another container is converted
+    one record at a time. Any other file is read as one JSON object, which needs the whole suite in memory once.
+    """
+    if src.endswith((".ndjson", ".msgpack")):
+        if container_suffix(src) != container_suffix(path):
+            write_testcase_file(iter_testcase_file(src), path)
+            return
+    else:
+        with open(src, "r", encoding="utf-8") as f:
+            write_testcase_file(json.load(f), path)
+        return
+    stage_asset(os.path.abspath(src), path, link=link)
+    with open(index_path(path), "w") as index:
+        for test_case_key, offset, length in _scan_records(path):
+            index.write(json.dumps([test_case_key, offset, length], ensure_ascii=False) + "\n")
+
+
+def _scan_records(path):
+    """Yields (test_case_key, offset, length) of every record, decoding one record at a time."""
+    offset = 0
+    with open(path, "rb") as f:
+        if is_binary(path):
+            while True:
+                header = f.read(_LENGTH.size)
+                if not header:
+                    return
+                length, = _LENGTH.unpack(header)
+                test_case_key, = unpackb(f.read(length))
+                yield test_case_key, offset, _LENGTH.size + length
+                offset += _LENGTH.size + length
+        decoder = json.JSONDecoder()
+        for line in f:
+            text = line.decode("utf-8").lstrip()
+            if text.startswith("{"): # only the key is decoded, the case is skipped
+                test_case_key, _ = decoder.raw_decode(text, len(text) - len(text[1:].lstrip()))
+                yield test_case_key, offset, len(line)
+            offset += len(line)
+
+
+def read_index(path):
+    """[(test_case_key, offset, length)] of the container at path, in file order."""
+    with open(index_path(path), "r", encoding="utf-8") as f:
+        return [tuple(json.loads(line)) for line in f]
+
+
+def testcase_keys(path):
+    return [test_case_key for test_case_key, _, _ in read_index(path)]
+
+
+def iter_testcase_file(path):
+    """Yields (test_case_key, test_case), decoding one record at a time."""
+    with open(path, "rb") as f:
+        if is_binary(path):
+            while True:
+                header = f.read(_LENGTH.size)
+                if not header:
+                    return
+                length, = _LENGTH.unpack(header)
+                yield from unpackb(f.read(length)).items()
+        for line in f:
+            if line.strip():
+                yield from json.loads(line).items()
+
+
+def iter_testcases(testcase=None, path=None):
+    """Yields (test_case_key, test_case) of a testcase (dict or JSON string), or of the testcase file at path."""
+    if path is None:
+        yield from (json.loads(testcase) if isinstance(testcase, str) else testcase).items()
+    elif path.endswith((".ndjson", ".msgpack")):
+        yield from iter_testcase_file(path)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from json.load(f).items()
+
+
+def first_testcase(path):
+    return next(iter_testcase_file(path))[1]
+
+
+def write_shards(path, shard_path_template):
+    """
+    Copies every record into its own container (shard_path_template formatted with index).
+    Returns [(test_case_key, shard_path)]. Records are copied as bytes, never decoded.
+    """
+    shards = []
+    with open(path, "rb") as f:
+        for index, (test_case_key, offset, length) in enumerate(read_index(path)):
+            f.seek(offset)
+            shard_path = shard_path_template.format(index=index) + container_suffix(path)
+            with open(shard_path, "wb") as shard:
+                shard.write(f.read(length))
+            shards.append((test_case_key, shard_path))
+    return shards
@@ -1,19 +1,21 @@
-import os, sys, shutil, uuid, json, resource
-import subprocess
-import resource
+import os, sys, shutil, uuid, json, fcntl, time, signal, threading, hashlib
+import subprocess, selectors
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from abc import ABC, abstractmethod
-from code_executor.configs.compile_config import BASE_DIR, EXECUTE_DIR
-from code_executor.configs.execute_config import EXECUTION_START_MESSAGE
-
-
-def set_limits():
-    # 최대 메모리 사용량 제한 (bytes 단위)
-    memory_limit = 500 * 1024 * 1024  # 100MB
-    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
-
-    # 최대 CPU 시간 제한 (초 단위)
-    cpu_time_limit = 30  
-    resource.setrlimit(resource.RLIMIT_CPU, (cpu_time_limit, cpu_time_limit))
+from code_executor.configs.compile_config import BASE_DIR, EXECUTE_DIR, PREBUILT_DIR, WRAPPER_CACHE_PATH, JS_CODE_CACHE_DIR
+from code_executor.configs.compile_config import DEFAULT_TESTCASE_NAME, BINARY_TESTCASE_NAME
+from code_executor.compile_cache import CompileCache
+from code_executor.directory_manager import stage_asset
+from code_executor.limits import HeadTailBuffer, rusage_usage, merge_usage, limit_message, judge
+from code_executor.metrics import written_bytes
+from code_executor.bytecode_cache import get_bytecode_cache, write_pyc
+from code_executor.result_cache import wrapper_version
+from code_executor.testcase_file import (
+    TestcaseFormat, write_testcase_file, stage_testcase_file, testcase_keys, first_testcase, write_shards, iter_testcases,
+    iter_testcase_file
+)
+from code_executor.configs.execute_config import EXECUTION_START_MESSAGE, PIPE_LIMIT_MB, STDERR_KEEP_BYTES
 
 from code_executor.configs.compile_config import (
     #c_compile_config,
@@ -34,31 +36,149 @@ from code_executor.configs.execute_config import (
 
 class BaseToolChain(ABC):
     _registry = {}
+    _compiler_versions = {} # tuple(compiler_version_command) -> output, looked up once per process
 
-    def __init__(self, language, base_dir=None, timeout=10):
+    def __init__(self, language, base_dir=None, timeout=10, execute_root=None):
         self.timeout = timeout
+        self.compile_timeout = 8000
         self.language = language.lower()
         self.compile_config, self.execute_config = self._get_configs()
+        self.compile_profile = self.compile_config.get("default_profile", "") # see set_compile_profile
         
-        self.execute_dir, self.solution_wrapper_dir = self._generate_dirs(base_dir)
+        self.base_dir, self.execute_dir, self.solution_wrapper_dir = self._generate_dirs(base_dir, execute_root)
         
         
         self.solution_wrapper_path = os.path.join(self.solution_wrapper_dir, self.compile_config['solution_wrapper_fname'])
         self.tmp_solution_wrapper_path = os.path.join(self.execute_dir, self.compile_config['solution_wrapper_fname'])
         self.tmp_exe_path = os.path.join(self.execute_dir, self.compile_config['exe_fname'])
         self.tmp_solution_path = os.path.join(self.execute_dir, self.compile_config['solution_fname'])
-        self.tmp_testcase_path = os.path.join(self.execute_dir, 'testcase.json')
+        self.tmp_testcase_path = os.path.join(self.execute_dir, TestcaseFormat.fname(TestcaseFormat.JSON))
+        self.tmp_options_path = os.path.join(self.execute_dir, 'options.json')
 
         self.solution_code = None
-        self.testcase = None
+        self.testcase = None # dict or JSON string
+        self.testcase_source = None # path of a testcase file, used instead of testcase (see testcase_file.py)
+        self.compile_cache = None # CompileCache; skips the compiler when the same source was built before.
+        self.worker_pool = None # WorkerPool; runs the harness in a pre-started process instead of a cold start.
+        self.result_cache = None # ResultCache; reuses per-testcase results of earlier runs (see result_cache.py).
+        self._case_keys = None # test_case_key -> result cache key, in testcase order (with a result cache)
+        self._cached_results = {} # test_case_key -> result found in the result cache
+        self._uncached_keys = None # testcases the harness has to run, when some were found in the cache
+        self.parallel_testcases = 0 # > 0: one harness process per testcase, up to this many at once.
+        self.harness_options = {} # written to options.json and passed as the harness' optional 3rd argument.
+        self.link_assets = False # hardlink/symlink wrapper assets into execute_dir instead of copying them.
+        self.limits = None # ResourceLimits of the harness process.
+        self.pipe_limit = PIPE_LIMIT_MB * 1024 * 1024 # bytes read from one harness before it is killed (OLE)
+        self.usage = {} # cgroup accounting of the last execution (ResourceLimits with cgroup only).
+        self.verdict = None # Verdict of the last run.
+        self.stages = {} # seconds per stage of the last run (see metrics.py).
+        self.counters = {} # compile cache hits/misses and bytes written of the last run (see metrics.py).
+        self._usage_lock = threading.Lock()
+        self._stages_lock = threading.Lock()
+        # environment of the harness: this process' environment plus the "env" list of the execute config.
+        self.execute_env = dict(os.environ)
+        self.execute_env.update(item.split("=", 1) for item in self.execute_config.get("env", []))
 
     @abstractmethod
-    def compile(self):
+    def prepare_compile(self):
+        """Stages the sources in execute_dir. Returns (compile_commands, cache_key_parts)."""
         pass
     
     @abstractmethod
-    def execute(self):
+    def prepare_execute(self, testcase_path=None):
+        """Returns the execute command. testcase_path defaults to tmp_testcase_path."""
         pass
+
+    def compile(self):
+        with self.stage("prepare"):
+            compile_commands, cache_key_parts = self.prepare_compile()
+        with self.stage("compile"):
+            return self.run_compile_command(compile_commands, *cache_key_parts)
+
+    def execute(self):
+        self.write_harness_options()
+        if not self.parallel_testcases:
+            return self.run_execute_command(self.prepare_execute(), *self.harness_args())
+
+        shards = self.prepare_shards()
+        with ThreadPoolExecutor(max_workers=self.parallel_testcases) as pool:
+            outputs = list(pool.map(
+                lambda shard: self.run_execute_command(self.prepare_execute(shard[1]), *self.harness_args(shard[1])),
+                shards
+            ))
+        return self.merge_shard_outputs(shards, outputs)
+
+    def write_harness_options(self):
+        if self.harness_options:
+            with open(self.tmp_options_path, "w") as f:
+                json.dump(self.harness_options, f)
+
+    def options_path(self):
+        return self.tmp_options_path if self.harness_options else ''
+
+    def harness_args(self, testcase_path=None):
+        # Arguments of the harness after the program itself: solution, testcase[, options].
+        args = [self.tmp_solution_path, testcase_path or self.tmp_testcase_path]
+        if self.harness_options:
+            args.append(self.tmp_options_path)
+        return args
+
+    def set_compile_profile(self, profile):
+        """
+        Applies a named compile profile (the compile config's "profiles") over the language's compile config.
+        Languages without profiles ignore it; an unknown profile of a language that has them is a ValueError.
+        """
+        profiles = self.compile_config.get("profiles")
+        if not profiles:
+            return
+        if profile not in profiles:
+            raise ValueError(f"Unknown compile profile for {self.language}: {profile} (one of {', '.join(profiles)})")
+        self.compile_config = {**self.compile_config, **profiles[profile]}
+        self.compile_profile = profile
+
+    def set_testcase_format(self, testcase_format):
+        """TestcaseFormat of the container the harness reads (the file extension tells the harness)."""
+        self.tmp_testcase_path = os.path.join(self.execute_dir, TestcaseFormat.fname(testcase_format))
+
+    def stage_testcase(self):
+        """Writes (or links) the testcase container and its index at tmp_testcase_path."""
+        if self._uncached_keys is not None: # only the testcases missing from the result cache
+            write_testcase_file(
+                ((test_case_key, test_case) for test_case_key, test_case in iter_testcases(self.testcase, self.testcase_source)
+                 if test_case_key in self._uncached_keys),
+                self.tmp_testcase_path
+            )
+        elif self.testcase_source is not None:
+            stage_testcase_file(self.testcase_source, self.tmp_testcase_path, link=self.link_assets)
+        else:
+            write_testcase_file(self.testcase, self.tmp_testcase_path)
+
+    def prepare_shards(self):
+        """Writes one testcase file per case. Returns [(test_case_key, shard_path)]."""
+        return write_shards(self.tmp_testcase_path, os.path.join(self.execute_dir, 'testcase_{index}'))
+
+    def merge_shard_outputs(self, shards, outputs):
+        """
+        Merges per-shard (returncode, stdout, stderr) into one harness output.
+        A shard that timed out or crashed only loses its own case.
+        """
+        lines = []
+        merged_returncode = 0
+        merged_stderr = []
+        for (test_case_key, _), (returncode, stdout, stderr) in zip(shards, outputs):
+            results = dict(iter_result_lines(stdout.splitlines()))
+            if self.is_harness_compile_error(returncode, results): # every shard compiles the same solution
+                return returncode, '', stderr
+            if test_case_key not in results:
+                results[test_case_key] = self._default_result(
+                    limit_message(returncode) or stderr or "(error occured)"
+                )
+            lines.extend(json.dumps({key: result}, ensure_ascii=False) for key, result in results.items())
+            if returncode and not merged_returncode:
+                merged_returncode = returncode
+            if stderr:
+                merged_stderr.append(f"[{test_case_key}] {stderr}")
+        return merged_returncode, "\n".join(lines), "\n".join(merged_stderr)
     
 
     def _get_configs(self):
@@ -74,7 +194,7 @@ class BaseToolChain(ABC):
         except KeyError:
             raise ValueError("Unsupported Language.")
 
-    def _generate_dirs(self, base_dir=None):
+    def _generate_dirs(self, base_dir=None, execute_root=None):
         current_dir = os.path.dirname(os.path.abspath(__file__))
         solution_wrapper_dir = os.path.join(current_dir, 'solution_wrapper', self.language)
 
@@ -83,8 +203,9 @@ class BaseToolChain(ABC):
         elif not os.path.isabs(base_dir):
             base_dir = os.path.abspath(base_dir)
         hash_id = uuid.uuid4().hex
-        execute_dir = EXECUTE_DIR.format(base_dir=base_dir, hash_id=hash_id)
-        return execute_dir, solution_wrapper_dir
+        # execute_root (e.g. a tmpfs) only moves the execute dirs; caches stay under base_dir.
+        execute_dir = EXECUTE_DIR.format(base_dir=execute_root or base_dir, hash_id=hash_id)
+        return base_dir, execute_dir, solution_wrapper_dir
     
     @classmethod
     def register_toolchain(cls, language):
@@ -95,148 +216,673 @@ class BaseToolChain(ABC):
     
     
     @classmethod
-    def create(cls, language, base_dir=None, timeout=10): #Factory method to create the appropriate toolchain instance.
+    def create(cls, language, base_dir=None, timeout=10, execute_root=None): #Factory method to create the appropriate toolchain instance.
         language = language.lower()
         if language not in cls._registry:
             raise ValueError("Unsupported Language.")
-        return cls._registry[language](language, base_dir, timeout)
+        return cls._registry[language](language, base_dir, timeout, execute_root)
 
 
-    def run_shell_command(self, command, iscompile=False):
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            #preexec_fn=set_limits
-        )
+    @contextmanager
+    def limit_execution(self):
+        """
+        Yields (limit_command, usage) for one harness process.
+        limit_command(command) returns the argv that runs command under self.limits. The caller fills usage
+        with the process' wait4 rusage; the cgroup accounting replaces it when there is one. usage is added
+        to self.usage when the block ends.
+        """
+        usage = {}
+        if self.limits is None:
+            try:
+                yield (lambda command: command), usage
+            finally:
+                self._add_usage(usage)
+            return
+        rlimit_as = not self.execute_config.get("memory_limit_check_only")
+        with self.limits.cgroup() as cgroup:
+            try:
+                yield (lambda command: self.limits.wrap_command(command, rlimit_as, cgroup)), usage
+            finally:
+                if cgroup is not None:
+                    usage.update(cgroup.usage())
+                self._add_usage(usage)
+
+    def _add_usage(self, usage):
+        with self._usage_lock: # shards finish on several threads
+            merge_usage(self.usage, usage)
+
+    def reset_stages(self):
+        self.stages = {}
+        self.counters = {}
+
+    @contextmanager
+    def stage(self, name):
+        """Adds the time spent in the block to self.stages[name]."""
+        start = time.perf_counter()
         try:
-            if iscompile:
-                stdout, stderr = process.communicate(timeout=8000)
-            else:
-                stdout, stderr = process.communicate(timeout=self.timeout)
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def add_stage(self, name, seconds):
+        with self._stages_lock: # shards spawn on several threads
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def count_written_bytes(self):
+        # after compile: sources, testcase container and build outputs written into execute_dir
+        self.counters["bytes_written"] = written_bytes(self.execute_dir)
+
+    def run_command(self, command, iscompile=False):
+        """
+        Runs an argv list (no shell) and returns (returncode, stdout, stderr).
+        The process gets its own session; on timeout the whole process group is killed.
+        """
+        if iscompile:
+            return self._run_command(command, self.compile_timeout)
+        status = {}
+        with self.limit_execution() as (limit_command, usage):
+            lines = list(self._stream_command(limit_command(command), status, usage))
+        return status["returncode"], "\n".join(lines), status["stderr"]
+
+    def _run_command(self, command, timeout):
+        try:
+            process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                start_new_session=True
+            )
+        except OSError as e: # e.g. the compiler is not installed
+            return 127, '', str(e)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
         except subprocess.TimeoutExpired:
+            _killpg(process.pid)
+            process.communicate()
             stdout, stderr = '', "timeout"
         return process.returncode, stdout, stderr
+
+    def stream_command(self, command):
+        """
+        Runs command and yields its stdout line by line as soon as each line arrives.
+        When the generator is exhausted, self.stream_status holds (returncode, stderr).
+        On timeout the lines read so far have already been yielded and stderr is "timeout".
+        """
+        status = {}
+        with self.limit_execution() as (limit_command, usage):
+            yield from self._stream_command(limit_command(command), status, usage)
+        self.stream_status = (status["returncode"], status["stderr"])
+
+    def _stream_command(self, command, status, usage):
+        try:
+            with self.stage("spawn"):
+                process = subprocess.Popen(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    env=self.execute_env,
+                    cwd=self.execute_dir, # files the solution writes stay in execute_dir (output_limit)
+                    start_new_session=True # a process group to kill, with every descendant of the harness
+                )
+        except OSError as e:
+            status["returncode"], status["stderr"] = 127, str(e)
+            return
+        deadline = time.monotonic() + self.timeout
+        buffer = b''
+        stderr_buffer = HeadTailBuffer(STDERR_KEEP_BYTES)
+        read_bytes = 0
+        timed_out = output_exceeded = finished = False
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(process.stdout, selectors.EVENT_READ)
+                selector.register(process.stderr, selectors.EVENT_READ)
+                while selector.get_map() and not output_exceeded:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        timed_out = True
+                        break
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, 65536)
+                        read_bytes += len(chunk)
+                        if read_bytes > self.pipe_limit:
+                            output_exceeded = True
+                            break
+                        if not chunk:
+                            selector.unregister(key.fileobj)
+                        elif key.fileobj is process.stdout:
+                            *lines, buffer = (buffer + chunk).split(b'\n')
+                            for line in lines:
+                                yield line.decode('utf-8', errors='replace')
+                        else:
+                            stderr_buffer.write(chunk)
+            finished = not (timed_out or output_exceeded)
+            if buffer and finished:
+                yield buffer.decode('utf-8', errors='replace')
+        finally: # also reached when the consumer stops early
+            if not finished:
+                # os.killpg, not process.kill: Popen would reap the process and lose its rusage
+                _killpg(process.pid)
+            process.stdout.close()
+            process.stderr.close()
+            _, wait_status, rusage = os.wait4(process.pid, 0)
+            _killpg(process.pid) # descendants the harness left behind
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            usage.update(rusage_usage(rusage))
+            status["returncode"] = process.returncode
+            if timed_out:
+                status["stderr"] = "timeout"
+            elif output_exceeded:
+                status["stderr"] = "output limit exceeded"
+            else:
+                status["stderr"] = stderr_buffer.getvalue().decode('utf-8', errors='replace')
+
+    def run_execute_command(self, execute_command, *harness_args):
+        # harness_args are the arguments of execute_command after the harness itself (solution, testcase paths).
+        if self.worker_pool is not None:
+            limits = None
+            if self.limits is not None:
+                limits = {
+                    "rlimits": self.limits.rlimits(not self.execute_config.get("memory_limit_check_only")),
+                    "memory_limit": self.limits.memory_limit,
+                }
+            return self.worker_pool.run(self.execute_dir, list(harness_args), self.timeout, limits, self.pipe_limit)
+        return self.run_command(execute_command)
+
+    def worker_command(self):
+        if "worker_command" not in self.execute_config:
+            raise ValueError(f"Worker pool is not supported for {self.language}.")
+        return format_command(self.execute_config["worker_command"],
+            worker_path=os.path.join(self.solution_wrapper_dir, self.execute_config["worker_fname"])
+        )
+
+    def run_compile_command(self, compile_commands, *cache_key_parts):
+        """
+        compile_commands: an argv list or a list of argv lists run in order (stops at the first failure).
+        cache_key_parts must identify the build (command templates, sources); the formatted
+        commands hold the uuid execute dir and cannot be used as the key.
+        """
+        steps = self.compile_steps(compile_commands, cache_key_parts)
+        try:
+            compile_command = next(steps)
+            while True:
+                compile_command = steps.send(self.run_command(compile_command, iscompile=True))
+        except StopIteration as stop:
+            return stop.value
+
+    def compile_steps(self, compile_commands, cache_key_parts):
+        """
+        The compile flow of run_compile_command, shared with AsyncCodeExecutor: a generator that yields each
+        compile command to run and is sent its (returncode, stdout, stderr). It returns the compile result.
+        """
+        compiled = self.compile_in_process()
+        if compiled is not None:
+            return compiled
+        if isinstance(compile_commands[0], str):
+            compile_commands = [compile_commands]
+
+        key = self.compile_cache_key(cache_key_parts)
+        if key is not None and self.compile_cache.restore(key, self.execute_dir):
+            self.counters["compile_cache_hits"] = 1
+            return 0, '', ''
+        if key is not None:
+            self.counters["compile_cache_misses"] = 1
+
+        for compile_command in compile_commands:
+            returncode, stdout, stderr = yield compile_command
+            if returncode != 0 or stderr:
+                return returncode, stdout, stderr
+
+        if key is not None:
+            self.compile_cache.store(key, self.execute_dir, self.compile_config['cache_artifacts'])
+        return returncode, stdout, stderr
+
+    def compile_in_process(self):
+        """Compiles without a subprocess where the language allows it: (returncode, stdout, stderr), or None."""
+        return None
+
+    def compile_cache_key(self, cache_key_parts):
+        if self.compile_cache is None or 'cache_artifacts' not in self.compile_config:
+            return None
+        return CompileCache.make_key(self.language, self.compile_profile, self._compiler_version(), *cache_key_parts)
+
+    def _compiler_version(self):
+        # compiler_version_command's output ('' without one), looked up once per process
+        command = tuple(self.compile_config.get("compiler_version_command", ()))
+        if not command:
+            return ''
+        if command not in self._compiler_versions:
+            _, stdout, stderr = self.run_command(list(command), iscompile=True)
+            self._compiler_versions[command] = (stdout + stderr).strip() # javac 8 prints its version to stderr
+        return self._compiler_versions[command]
     
     def run(self):
+        for _ in self.run_iter():
+            pass
+        return self.last_run
+
+    def cached_run(self):
+        """
+        Looks up every testcase in the result cache. Returns the finished run when all of them are cached,
+        otherwise None: the harness has to run, and stage_testcase will only stage the missing testcases.
+        """
+        self._case_keys, self._cached_results, self._uncached_keys = None, {}, None
+        if self.result_cache is None or self.harness_options.get("stop_on_failure"):
+            return None
+        with self.stage("prepare"):
+            base_key = CompileCache.make_key(
+                self.language, self.solution_code, wrapper_version(self.solution_wrapper_dir),
+                json.dumps([self.compile_config, self.execute_config, self.harness_options], sort_keys=True, default=str),
+                json.dumps([vars(self.limits) if self.limits else None, self.timeout, self.pipe_limit], sort_keys=True)
+            )
+            self._case_keys = {
+                test_case_key: CompileCache.make_key(
+                    base_key, json.dumps(test_case, sort_keys=True, ensure_ascii=False, default=list)
+                )
+                for test_case_key, test_case in iter_testcases(self.testcase, self.testcase_source)
+            }
+            found = self.result_cache.get_many(set(self._case_keys.values()))
+        self._cached_results = {
+            test_case_key: dict(found[key], cached=True)
+            for test_case_key, key in self._case_keys.items() if key in found
+        }
+        self.counters["result_cache_hits"] = len(self._cached_results)
+        self.counters["result_cache_misses"] = len(self._case_keys) - len(self._cached_results)
+        if not self._cached_results:
+            return None
+        self._uncached_keys = {key for key in self._case_keys if key not in self._cached_results}
+        if self._uncached_keys:
+            return None
+        self.usage = {}
+        return self.finish_run(("execute", 0, {}, ''))
+
+    def _merge_cached_results(self, results):
+        # Stores the results the harness reported, then puts the cached ones back in testcase order.
+        fresh = {
+            self._case_keys[test_case_key]: result for test_case_key, result in results.items()
+            if test_case_key in self._case_keys and result.get("realtime", -1) >= 0 and result.get("stderr") != "(skipped)"
+        }
+        if fresh:
+            self.result_cache.put_many(fresh)
+        if not self._cached_results:
+            return results
+        return {
+            test_case_key: self._cached_results.get(test_case_key) or results.get(test_case_key) or self._default_result()
+            for test_case_key in self._case_keys
+        }
+
+    def finish_run(self, run):
+        """Sets self.verdict for a (stage, returncode, results, stderr) tuple and returns the tuple."""
+        stage, _, results, _ = run
+        if stage == "execute":
+            self.add_stage("solution", sum(max(result.get("realtime", 0), 0) for result in results.values()))
+            # The harness resets its peak RSS before every testcase, so the process' ru_maxrss
+            # only covers the last one; the run's peak is the largest of all of them.
+            case_peaks = [result.get("max_memory", -1) for result in results.values()]
+            if case_peaks and max(case_peaks) > self.usage.get("max_memory", 0):
+                self.usage["max_memory"] = max(case_peaks)
+            if self._case_keys is not None:
+                run = (stage, run[1], self._merge_cached_results(results), run[3])
+        self.verdict = judge(run, self.limits, self.usage)
+        return run
+
+    def run_iter(self):
+        """
+        Yields (test_case_key, result) as soon as the harness finishes each testcase.
+        When the generator is exhausted, self.last_run holds the (stage, returncode, results, stderr) tuple of run().
+        A compile error yields nothing.
+        """
+        self.reset_stages()
+        cached_run = self.cached_run()
+        if cached_run is not None:
+            yield from cached_run[2].items()
+            self.last_run = cached_run
+            return
         if self.compile_config['compilable']:
             returncode, stdout, stderr = self.compile()
             if stderr:
-                return ("compile", returncode, stdout, stderr)
+                self.last_run = self.finish_run(("compile", returncode, stdout, stderr))
+                return
+        self.count_written_bytes()
+        yield from self._cached_results.items()
 
-        returncode, stdout, stderr = self.execute()
-        if not stdout:
-            stdout = self._generate_default_stdout()
-         
-        return ("execute", returncode, json.loads(stdout), stderr)
-    
-    def _generate_default_stdout(self):
-        test_data = json.loads(self.testcase)
-        all_results = {}
+        execute_start = time.perf_counter()
+        self.usage = {}
+        self.write_harness_options()
+        if self.parallel_testcases or self.worker_pool is not None:
+            returncode, stdout, stderr = self.execute()
+            lines = stdout.splitlines()
+        else:
+            lines = self.stream_command(self.prepare_execute())
+
+        results = {}
+        for test_case_key, result in self._timed_result_lines(lines):
+            results[test_case_key] = result
+            yield test_case_key, result
+        if not (self.parallel_testcases or self.worker_pool is not None):
+            returncode, stderr = self.stream_status
+        self.add_stage("execute", time.perf_counter() - execute_start - self.stages.get("parse", 0.0))
+        if self.is_harness_compile_error(returncode, results):
+            self.last_run = self.finish_run(("compile", returncode, '', stderr))
+            return
+
+        with self.stage("parse"):
+            stderr = limit_message(returncode, self.usage) or stderr
+            missing = self._missing_results(results, returncode)
+        for test_case_key, result in missing:
+            results[test_case_key] = result
+            yield test_case_key, result
+        with self.stage("parse"):
+            self.last_run = self.finish_run(("execute", returncode, results, stderr))
+
+    def _timed_result_lines(self, lines):
+        # iter_result_lines, with the decoding (not the wait for the harness) added to the parse stage
+        for line in lines:
+            with self.stage("parse"):
+                parsed = list(iter_result_lines((line,)))
+            yield from parsed
+
+    def parse_execute_output(self, returncode, stdout, stderr):
+        with self.stage("parse"):
+            results = dict(iter_result_lines(stdout.splitlines()))
+            if self.is_harness_compile_error(returncode, results):
+                return self.finish_run(("compile", returncode, '', stderr))
+            results.update(self._missing_results(results, returncode))
+            stderr = limit_message(returncode, self.usage) or stderr
+            return self.finish_run(("execute", returncode, results, stderr))
 
-        for test_case_key in test_data.keys():
-            all_results[test_case_key] = {
+    def is_harness_compile_error(self, returncode, results):
+        # Harnesses that compile the solution themselves (execute config "compile_error_exit_code")
+        # exit with that code before the first testcase when it does not compile.
+        compile_error_exit_code = self.execute_config.get("compile_error_exit_code")
+        return compile_error_exit_code is not None and returncode == compile_error_exit_code and not results
+
+    def _missing_results(self, results, returncode):
+        # The harness prints every testcase unless it crashed or was killed; only then look for the missing ones.
+        if returncode == 0 and results:
+            return []
+        return [
+            (test_case_key, self._default_result())
+            for test_case_key in testcase_keys(self.tmp_testcase_path)
+            if test_case_key not in results
+        ]
+
+    @staticmethod
+    def _default_result(stderr="(error occured)"):
+        return {
             "result": None,
             "utime": -1,
             "stime": -1,
             "realtime": -1.0,
             "max_memory": -1,
             "stdout": "",
-            "stderr": "(error occured)"
+            "stderr": stderr
         }
-
-        return json.dumps(all_results, indent=2, ensure_ascii=False)
         
 
 
+def format_command(template, **fields):
+    """
+    Formats an argv template (list of str) item by item.
+    Items that format to '' are dropped, e.g. {options_path} when there are no harness options.
+    """
+    command = []
+    for arg in template:
+        arg = arg.format(**fields)
+        if arg:
+            command.append(arg)
+    return command
+
+
+def testcase_arity(testcase_path):
+    """Number of inputs of the first testcase. Only the first line of the container is decoded."""
+    return len(first_testcase(testcase_path)["input"])
+
+
+def _killpg(pid):
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def iter_result_lines(lines):
+    """Parses the harness' NDJSON output: one {test_case_key: result} object per line."""
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('{'):
+            continue
+        try:
+            yield from json.loads(line).items()
+        except ValueError: # a line broken by the solution's own output or by the kill
+            continue
+
+
 @BaseToolChain.register_toolchain("cpp")
 class CppToolChain(BaseToolChain):
-    def __init__(self, language, base_dir=None, timeout=10):
-        super().__init__(language, base_dir, timeout)
+    _wrapper_sources = {} # (harness path, harness mtime, arity) -> main.cpp with solutionWrapper
+
+    def __init__(self, language, base_dir=None, timeout=10, execute_root=None):
+        super().__init__(language, base_dir, timeout, execute_root)
         self.nlohmann_dir = os.path.join(self.solution_wrapper_dir, 'nlohmann')
         self.nlohmann_path = os.path.join(self.nlohmann_dir, 'json.hpp')
         self.tmp_nlohmann_dir = os.path.join(self.execute_dir, 'nlohmann')
+        self.pch_src_path = os.path.join(self.solution_wrapper_dir, self.compile_config['pch_fname'])
+        self.packed_args_path = os.path.join(self.solution_wrapper_dir, self.compile_config['packed_args_fname'])
+        self.use_pch = False
         
 
-    def compile(self):
-        os.makedirs(self.tmp_nlohmann_dir, exist_ok=True)
-        shutil.copy(self.nlohmann_path, self.tmp_nlohmann_dir)
-        self.solution_wrapper = self._generate_solution_wrapper(self.testcase, self.solution_wrapper_path)
+    def prepare_compile(self):
+        self.stage_testcase()
 
-        with open(self.tmp_testcase_path, "w") as f:
-            f.write(self.testcase)
-        
-        with open(self.tmp_solution_wrapper_path, "w") as f:
-            f.writelines(self.solution_wrapper)
-        
         with open(self.tmp_solution_path, "w") as f:
             f.write(self.solution_code)
+
+        if self.use_pch:
+            return self._prepare_pch_compile()
+
+        if self.link_assets:
+            stage_asset(self.nlohmann_dir, self.tmp_nlohmann_dir, link=True)
+        else:
+            os.makedirs(self.tmp_nlohmann_dir, exist_ok=True)
+            shutil.copy(self.nlohmann_path, self.tmp_nlohmann_dir)
+        stage_asset(self.packed_args_path, self.execute_dir, link=self.link_assets)
+        wrapper_id = self._stage_solution_wrapper(testcase_arity(self.tmp_testcase_path))
+        with open(self.packed_args_path, "r") as f:
+            packed_args_source = f.read()
         
-        compile_command = self.compile_config["compile_command"].format(
+        compile_command = format_command(self.compile_config["compile_command"],
             solution_wrapper_path = self.tmp_solution_wrapper_path,
             exe_path = self.tmp_exe_path
+        ) + self._profile_link_flags()
+        return compile_command, (self.compile_config["compile_command"], self._profile_link_flags(), wrapper_id,
+                                 packed_args_source, self.solution_code)
+
+    def _prepare_pch_compile(self):
+        prebuilt_dir = self._prepare_prebuilt_dir()
+        solution_unit_path = os.path.join(self.execute_dir, self.compile_config['solution_unit_fname'])
+        solution_obj_path = os.path.join(self.execute_dir, self.compile_config['solution_obj_fname'])
+        harness_obj_path = os.path.join(prebuilt_dir, self.compile_config['harness_obj_fname'])
+
+        solution_unit = (
+            f'#include "{self.compile_config["pch_fname"]}"\n'
+            f'#include "{self.compile_config["solution_fname"]}"\n'
+            f"\n"
+            f"using json = nlohmann::ordered_json;\n"
+            f"using namespace std;\n"
+            f"\n"
+            + self._generate_solution_wrapper_function(testcase_arity(self.tmp_testcase_path), return_type="json")
         )
-        returncode, stdout, stderr = self.run_shell_command(compile_command, iscompile=True)
-        return returncode, stdout, stderr
+        with open(solution_unit_path, "w") as f:
+            f.write(solution_unit)
 
-    def execute(self):
-        execute_command = self.execute_config["execute_command"].format(
+        compile_commands = [
+            format_command(self.compile_config["solution_compile_command"],
+                prebuilt_dir=prebuilt_dir,
+                solution_unit_path=solution_unit_path,
+                solution_obj_path=solution_obj_path
+            ),
+            format_command(self.compile_config["link_command"],
+                harness_obj_path=harness_obj_path,
+                solution_obj_path=solution_obj_path,
+                exe_path=self.tmp_exe_path
+            ) + self._profile_link_flags(),
+        ]
+        cache_key_parts = (
+            self.compile_config["solution_compile_command"], self.compile_config["link_command"],
+            self._profile_link_flags(), prebuilt_dir, solution_unit, self.solution_code
+        )
+        return compile_commands, cache_key_parts
+
+    def _profile_link_flags(self):
+        # the harness' sampler names frames through dladdr, which needs the executable's symbols exported
+        return self.compile_config["profile_link_flags"] if "profile" in self.harness_options else []
+
+    def _prepare_prebuilt_dir(self):
+        """
+        Builds pch.hpp.gch and main.o once per (compiler, commands, harness source) and returns their directory.
+        The directory is published by rename, so its existence means the build is complete.
+        """
+        with open(self.solution_wrapper_path, "r") as f:
+            harness_source = f.read()
+        with open(self.pch_src_path, "r") as f:
+            pch_source = f.read()
+        with open(self.packed_args_path, "r") as f:
+            packed_args_source = f.read()
+        build_id = CompileCache.make_key(
+            self._compiler_version(),
+            self.compile_config["pch_command"], self.compile_config["harness_command"],
+            harness_source, pch_source, packed_args_source
+        )[:16]
+        prebuilt_dir = PREBUILT_DIR.format(base_dir=self.base_dir, language=self.language, build_id=build_id)
+        if os.path.isdir(prebuilt_dir):
+            return prebuilt_dir
+
+        os.makedirs(os.path.dirname(prebuilt_dir), exist_ok=True)
+        with open(prebuilt_dir + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX) # only one worker builds, the others wait and reuse it.
+            if os.path.isdir(prebuilt_dir):
+                return prebuilt_dir
+
+            tmp_dir = prebuilt_dir + '.tmp'
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(os.path.join(tmp_dir, 'nlohmann'))
+            shutil.copy(self.nlohmann_path, os.path.join(tmp_dir, 'nlohmann'))
+            shutil.copy(self.pch_src_path, tmp_dir)
+            shutil.copy(self.packed_args_path, tmp_dir)
+            tmp_pch_src_path = os.path.join(tmp_dir, self.compile_config['pch_fname'])
+
+            for command in (
+                format_command(self.compile_config["pch_command"],
+                    pch_src_path=tmp_pch_src_path,
+                    pch_path=tmp_pch_src_path + '.gch'
+                ),
+                format_command(self.compile_config["harness_command"],
+                    solution_wrapper_path=self.solution_wrapper_path,
+                    harness_obj_path=os.path.join(tmp_dir, self.compile_config['harness_obj_fname'])
+                ),
+            ):
+                returncode, _, stderr = self.run_command(command, iscompile=True)
+                if returncode != 0:
+                    raise RuntimeError(f"Failed to build the precompiled C++ harness: {stderr}")
+            os.rename(tmp_dir, prebuilt_dir)
+        return prebuilt_dir
+
+    def prepare_execute(self, testcase_path=None):
+        execute_command = format_command(self.execute_config["execute_command"],
             exe_path = self.tmp_exe_path,
             solution_path=self.tmp_solution_path,
-            testcase_path=self.tmp_testcase_path
+            testcase_path=testcase_path or self.tmp_testcase_path,
+            options_path=self.options_path()
         )
-        returncode, stdout, stderr = self.run_shell_command(execute_command)
-        return returncode, stdout, stderr
+        return execute_command
 
-    def _generate_solution_wrapper(self, testcase, solution_wrapper_path):
-        test_data = json.loads(testcase)
-        first_case_key = next(iter(test_data))
-        param_count = len(test_data[first_case_key]["input"])
-        args_list = [f"args[{i}]" for i in range(param_count)]
+    def _generate_solution_wrapper_function(self, arity, return_type="auto"):
+        args_list = [f"code_executor::PackedArg(args[{i}])" for i in range(arity)]
         args_str = ", ".join(args_list)
         
-        solution_wrapper_function = (
-            f"auto solutionWrapper(json args){{\n"
+        return (
+            f"{return_type} solutionWrapper(json args){{\n"
             f"    return solution({args_str});\n"
             f"}}\n"
         )
-        
-        with open(solution_wrapper_path, "r") as f:
-            solution_wrapper = f.readlines()
-        
-        solution_wrapper.insert(22, solution_wrapper_function)
-        
-        return solution_wrapper
+
+    def _solution_wrapper_source(self, arity):
+        """main.cpp with solutionWrapper for arity parameters, generated once per process."""
+        harness_mtime = os.stat(self.solution_wrapper_path).st_mtime_ns
+        key = (self.solution_wrapper_path, harness_mtime, arity)
+        if key not in self._wrapper_sources:
+            with open(self.solution_wrapper_path, "r") as f:
+                harness = f.read()
+            marker = "using namespace std;\n"
+            index = harness.index(marker) + len(marker)
+            self._wrapper_sources[key] = (
+                harness[:index] + self._generate_solution_wrapper_function(arity) + harness[index:]
+            )
+        return self._wrapper_sources[key]
+
+    def _stage_solution_wrapper(self, arity):
+        """
+        Puts the main.cpp for arity into execute_dir and returns its id (a hash of the source).
+        With link_assets the source is written once under WRAPPER_CACHE_PATH and linked.
+        """
+        source = self._solution_wrapper_source(arity)
+        wrapper_id = CompileCache.make_key(source)[:16]
+        if not self.link_assets:
+            with open(self.tmp_solution_wrapper_path, "w") as f:
+                f.write(source)
+            return wrapper_id
+
+        wrapper_path = WRAPPER_CACHE_PATH.format(
+            base_dir=self.base_dir, language=self.language, wrapper_id=wrapper_id,
+            fname=self.compile_config['solution_wrapper_fname']
+        )
+        if not os.path.exists(wrapper_path):
+            os.makedirs(os.path.dirname(wrapper_path), exist_ok=True)
+            tmp_path = f"{wrapper_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(source)
+            os.replace(tmp_path, wrapper_path) # atomic: other workers see the whole file or none
+        stage_asset(wrapper_path, self.tmp_solution_wrapper_path, link=True)
+        return wrapper_id
 
 @BaseToolChain.register_toolchain("java")
 class JavaToolChain(BaseToolChain):
-    def __init__(self, language, base_dir=None, timeout=10):
-        super().__init__(language, base_dir, timeout)
+    _jvm_versions = {} # tuple(jvm_version_command) -> output, looked up once per process
+    _cds_archives = {} # _cds_inputs() -> path of the AppCDS archive, None while it is built or when there is none
+    _cds_lock = threading.Lock()
+
+    def __init__(self, language, base_dir=None, timeout=10, execute_root=None):
+        super().__init__(language, base_dir, timeout, execute_root)
         self.lib_dir = os.path.join(self.solution_wrapper_dir, self.compile_config['lib_dir_name'])
+        self.worker_path = os.path.join(self.solution_wrapper_dir, self.execute_config["worker_fname"])
+        self.cds_training_dir = os.path.join(self.solution_wrapper_dir, self.execute_config['cds_training_dir_name'])
     
-    def compile(self):
-        shutil.copy(self.solution_wrapper_path, self.execute_dir)
+    def prepare_compile(self):
+        self._cds_archive_path() # starts the archive build while this submission compiles
+        stage_asset(self.solution_wrapper_path, self.execute_dir, link=self.link_assets)
         with open(self.tmp_solution_path, "w") as f:
             f.write(self.solution_code)
-        with open(self.tmp_testcase_path, "w") as f:
-            f.write(self.testcase)
+        self.stage_testcase()
+
+        compile_command = self._compile_command(self.tmp_solution_wrapper_path, self.tmp_solution_path)
+
+        with open(self.solution_wrapper_path, "r") as f:
+            solution_wrapper = f.read()
+        return compile_command, (self.compile_config["compile_command"], solution_wrapper, self.solution_code)
 
-        compile_command = self.compile_config["compile_command"].format(
+    def _compile_command(self, solution_wrapper_path, solution_path):
+        return format_command(self.compile_config["compile_command"],
             lib_dir=self.lib_dir,
             jackson_databind="jackson-databind-2.18.2.jar", # Jackson version is configurable.
             jackson_core="jackson-core-2.18.2.jar",
             jackson_annotations="jackson-annotations-2.18.2.jar",
-            solution_wrapper_path=self.tmp_solution_wrapper_path,
-            solution_path=self.tmp_solution_path
+            solution_wrapper_path=solution_wrapper_path,
+            solution_path=solution_path
         )
 
-        returncode, stdout, stderr = self.run_shell_command(compile_command, iscompile=True)
-        return returncode, stdout, stderr
-
-    def execute(self):
-        execute_command = self.execute_config["execute_command"].format(
+    def prepare_execute(self, testcase_path=None):
+        execute_command = format_command(self.execute_config["execute_command"],
             lib_dir=self.lib_dir,
             execute_dir=self.execute_dir, # The directory path where Main.class is located. (not the file path)
             jackson_databind="jackson-databind-2.18.2.jar",
@@ -244,71 +890,217 @@ class JavaToolChain(BaseToolChain):
             jackson_annotations="jackson-annotations-2.18.2.jar",
             exe_name=self.compile_config['exe_fname'],
             solution_path=self.tmp_solution_path,
-            testcase_path=self.tmp_testcase_path
+            testcase_path=testcase_path or self.tmp_testcase_path,
+            options_path=self.options_path()
         )
-        returncode, stdout, stderr = self.run_shell_command(execute_command)
-        return returncode, stdout, stderr
+        return execute_command[:1] + self._jvm_flags() + execute_command[1:]
+
+    def worker_command(self):
+        worker_command = self._worker_command()
+        return worker_command[:1] + self._jvm_flags() + worker_command[1:]
+
+    def _worker_command(self):
+        return format_command(self.execute_config["worker_command"],
+            lib_dir=self.lib_dir,
+            jackson_databind="jackson-databind-2.18.2.jar",
+            jackson_core="jackson-core-2.18.2.jar",
+            jackson_annotations="jackson-annotations-2.18.2.jar",
+            worker_path=self.worker_path
+        )
+
+    def _jvm_flags(self):
+        """The execute config's jvm_flags, plus the flags that map the AppCDS archive when there is one."""
+        flags = list(self.execute_config["jvm_flags"])
+        archive_path = self._cds_archive_path()
+        if archive_path is not None:
+            flags += format_command(self.execute_config["cds_use_flags"], archive_path=archive_path)
+        return flags
+
+    def _cds_inputs(self):
+        return (self.base_dir, self.lib_dir, self.solution_wrapper_path, self.worker_path, self.cds_training_dir,
+                tuple(self.execute_config["jvm_flags"]), tuple(self.execute_config["cds_dump_flags"]))
+
+    def _cds_archive_path(self):
+        """
+        Returns the path of the AppCDS archive, or None when cds_archive is off, or the archive is not built yet
+        or could not be. The first call in a process starts _prepare_cds_archive in a background thread,
+        so no harness waits for the training run.
+        """
+        if not self.execute_config.get("cds_archive"):
+            return None
+        inputs = self._cds_inputs()
+        with self._cds_lock:
+            if inputs not in self._cds_archives:
+                self._cds_archives[inputs] = None
+                threading.Thread(target=self._prepare_cds_archive, args=(inputs,), daemon=True).start()
+            return self._cds_archives[inputs]
+
+    def _prepare_cds_archive(self, inputs):
+        """
+        Finds or builds the archive of one (JDK, jars, harness, worker, flags) and records its path under inputs.
+        A new JDK or new jars give a new build id, so the archive is rebuilt; the old prebuilt dir is left
+        for the operator to remove.
+        """
+        try:
+            jars = sorted(os.path.join(self.lib_dir, name) for name in os.listdir(self.lib_dir) if name.endswith(".jar"))
+            jar_stats = [f"{jar}:{os.stat(jar).st_size}:{os.stat(jar).st_mtime_ns}" for jar in jars]
+            sources = []
+            for path in [self.solution_wrapper_path, self.worker_path] + sorted(
+                    os.path.join(self.cds_training_dir, name) for name in os.listdir(self.cds_training_dir)):
+                with open(path, "r") as f:
+                    sources.append(f.read())
+            build_id = CompileCache.make_key(
+                self._jvm_version(), jar_stats, self.execute_config["jvm_flags"], self.execute_config["cds_dump_flags"],
+                *sources
+            )[:16]
+            prebuilt_dir = PREBUILT_DIR.format(base_dir=self.base_dir, language=self.language, build_id=build_id)
+            if not os.path.isdir(prebuilt_dir):
+                self._build_cds_archive(prebuilt_dir)
+        except OSError: # the archive is only an optimization: this process runs without it
+            return
+        archive_path = os.path.join(prebuilt_dir, self.execute_config["cds_archive_fname"])
+        if os.path.exists(archive_path):
+            with self._cds_lock:
+                self._cds_archives[inputs] = archive_path
+
+    def _build_cds_archive(self, prebuilt_dir):
+        """
+        Training run: Main and the training Solution are compiled into a scratch dir, then the worker runs them
+        on the JSON and MessagePack training testcases with -XX:ArchiveClassesAtExit and exits.
+        Main and Solution come from the worker's URLClassLoader, so only JDK and Jackson classes are archived,
+        against a classpath of the jars alone. The dir is published by rename, with or without the archive
+        (a JDK that cannot dump one is not asked again until the build id changes).
+        """
+        os.makedirs(os.path.dirname(prebuilt_dir), exist_ok=True)
+        with open(prebuilt_dir + '.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX) # only one worker builds, the others wait and reuse it.
+            if os.path.isdir(prebuilt_dir):
+                return
+
+            tmp_dir = prebuilt_dir + '.tmp'
+            training_dir = os.path.join(tmp_dir, self.execute_config['cds_training_dir_name'])
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            shutil.copytree(self.cds_training_dir, training_dir)
+            shutil.copy(self.solution_wrapper_path, training_dir)
+            solution_path = os.path.join(training_dir, self.compile_config['solution_fname'])
+            returncode, _, _ = self.run_command(self._compile_command(
+                os.path.join(training_dir, self.compile_config['solution_wrapper_fname']), solution_path
+            ), iscompile=True)
+            if returncode != 0: # the archive is only an optimization: run without it, try again next time
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                return
+
+            testcase_path = os.path.join(training_dir, DEFAULT_TESTCASE_NAME)
+            binary_testcase_path = os.path.join(training_dir, BINARY_TESTCASE_NAME)
+            write_testcase_file(iter_testcase_file(testcase_path), binary_testcase_path)
+            jobs = "".join(json.dumps({
+                "execute_dir": training_dir,
+                "args": [solution_path, path, os.path.join(training_dir, "options.json")],
+                "timeout": self.execute_config["cds_training_timeout"],
+            }) + "\n" for path in (testcase_path, binary_testcase_path))
+
+            archive_path = os.path.join(tmp_dir, self.execute_config["cds_archive_fname"])
+            worker_command = self._worker_command()
+            dump_command = (worker_command[:1] + self.execute_config["jvm_flags"]
+                            + format_command(self.execute_config["cds_dump_flags"], archive_path=archive_path)
+                            + worker_command[1:])
+            try:
+                subprocess.run(dump_command, input=jobs, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               text=True, env=self.execute_env, timeout=self.execute_config["cds_training_timeout"])
+            except (OSError, subprocess.TimeoutExpired): # no archive is written, the JVMs run without one
+                pass
+            shutil.rmtree(training_dir, ignore_errors=True)
+            os.rename(tmp_dir, prebuilt_dir)
+
+    def _jvm_version(self):
+        command = tuple(self.execute_config["jvm_version_command"])
+        if command not in self._jvm_versions:
+            _, stdout, stderr = self.run_command(list(command), iscompile=True)
+            self._jvm_versions[command] = (stdout + stderr).strip() # java -version prints to stderr
+        return self._jvm_versions[command]
 
 
 @BaseToolChain.register_toolchain("javascript")
 class JavaScriptChain(BaseToolChain):
-    def __init__(self, language, base_dir=None, timeout=10):
-        super().__init__(language, base_dir, timeout)
+    def __init__(self, language, base_dir=None, timeout=10, execute_root=None):
+        super().__init__(language, base_dir, timeout, execute_root)
 
-    def compile(self):
-        shutil.copy(self.solution_wrapper_path, self.execute_dir)
+    def prepare_compile(self):
+        stage_asset(self.solution_wrapper_path, self.execute_dir, link=self.link_assets)
         solution_wrapper_adder = self.solution_wrapper_dir+"/solution_adder.js"
         with open(solution_wrapper_adder, "r") as f:
             solution_wrapper_adder = f.read()
         
-        self.solution_code += solution_wrapper_adder
+        solution_code = self.solution_code + solution_wrapper_adder
         with open(self.tmp_solution_path, "w") as f:
-            f.write(self.solution_code)
-        with open(self.tmp_testcase_path, "w") as f:
-            f.write(self.testcase)
+            f.write(solution_code)
+        self.stage_testcase()
+        if self.compile_config.get("code_cache"):
+            code_cache_dir = JS_CODE_CACHE_DIR.format(base_dir=self.base_dir)
+            os.makedirs(code_cache_dir, exist_ok=True)
+            self.harness_options["code_cache"] = {
+                "dir": code_cache_dir,
+                "key": hashlib.sha256(solution_code.encode("utf-8")).hexdigest(),
+            }
+            # node >= 22.1 caches the harness (main.js) itself there; older versions ignore it
+            self.execute_env.setdefault("NODE_COMPILE_CACHE", os.path.join(code_cache_dir, "node"))
 
-        compile_command = self.compile_config["compile_command"].format(
+        compile_command = format_command(self.compile_config["compile_command"],
             solution_path=self.tmp_solution_path
         )
-        returncode, stdout, stderr = self.run_shell_command(compile_command, iscompile=True)
-        return returncode, stdout, stderr
+        return compile_command, (self.compile_config["compile_command"], solution_code)
 
-    def execute(self):
-        execute_command = self.execute_config["execute_command"].format(
+    def compile_in_process(self):
+        if not self.compile_config.get("check_in_harness"):
+            return None
+        return 0, '', '' # main.js compiles the solution in the node launch that runs it
+
+    def prepare_execute(self, testcase_path=None):
+        execute_command = format_command(self.execute_config["execute_command"],
             exe_path=self.tmp_solution_wrapper_path,
             solution_path=self.tmp_solution_path,
-            testcase_path=self.tmp_testcase_path
+            testcase_path=testcase_path or self.tmp_testcase_path,
+            options_path=self.options_path()
         )
-        returncode, stdout, stderr = self.run_shell_command(execute_command)
-        return returncode, stdout, stderr
+        return execute_command
 
 
 
 @BaseToolChain.register_toolchain("python")
 class PythonToolchain(BaseToolChain):
-    def __init__(self, language, base_dir=None, timeout=10):
-        super().__init__(language, base_dir, timeout)
+    def __init__(self, language, base_dir=None, timeout=10, execute_root=None):
+        super().__init__(language, base_dir, timeout, execute_root)
 
-    def compile(self):
-        shutil.copy(self.solution_wrapper_path, self.execute_dir)
+    def prepare_compile(self):
+        stage_asset(self.solution_wrapper_path, self.execute_dir, link=self.link_assets)
         with open(self.tmp_solution_path, "w") as f:
             f.write(self.solution_code)
-        with open(self.tmp_testcase_path, "w") as f:
-            f.write(self.testcase)
+        self.stage_testcase()
 
-        compile_command = python_compile_config["compile_command"].format(
+        compile_command = format_command(python_compile_config["compile_command"],
             solution_wrapper_path=self.tmp_solution_wrapper_path,
             solution_path = self.tmp_solution_path
         )
-        returncode, stdout, stderr = self.run_shell_command(compile_command, iscompile=True)
-        return returncode, stdout, stderr
+        return compile_command, (self.compile_config["compile_command"], self.solution_code)
 
-    def execute(self):
-        execute_command = self.execute_config["execute_command"].format(
+    def compile_in_process(self):
+        if not self.compile_config.get("compile_in_process"):
+            return None
+        cache = get_bytecode_cache()
+        _, error = write_pyc(self.tmp_solution_wrapper_path, cache)
+        if error is None:
+            hit, error = write_pyc(self.tmp_solution_path, cache)
+            self.counters["compile_cache_hits" if hit else "compile_cache_misses"] = 1
+        if error is not None:
+            return 1, '', error
+        return 0, '', ''
+
+    def prepare_execute(self, testcase_path=None):
+        execute_command = format_command(self.execute_config["execute_command"],
             exe_path=self.tmp_exe_path,
             solution_path=self.tmp_solution_path,
-            testcase_path=self.tmp_testcase_path
+            testcase_path=testcase_path or self.tmp_testcase_path,
+            options_path=self.options_path()
         )
-        returncode, stdout, stderr = self.run_shell_command(execute_command)
-        return returncode, stdout, stderr
+        return execute_command
 
@@ -0,0 +1,165 @@
+import os, json, queue, select, threading, atexit, subprocess
+from code_executor.configs.execute_config import WORKER_GRACE_SECONDS, WORKER_RESPONSE_SLACK
+
+
+class ResponseTooLong(Exception):
+    pass
+
+
+class Worker:
+    """
+    A pre-started harness process (python/worker.py, javascript/worker.js, java/Worker.java).
+    Protocol: one JSON request line on stdin, one JSON response line on stdout.
+    The worker isolates every job (fork, worker thread or class loader) and enforces the job timeout itself.
+    """
+    def __init__(self, command, env=None):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        self._buffer = b''
+
+    def request(self, job, timeout, max_bytes=None):
+        self.process.stdin.write(json.dumps(job).encode('utf-8') + b'\n')
+        self.process.stdin.flush()
+        return json.loads(self._read_line(timeout, max_bytes))
+
+    def _read_line(self, timeout, max_bytes=None):
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            if max_bytes is not None and len(self._buffer) > max_bytes:
+                raise ResponseTooLong()
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                raise TimeoutError("worker did not respond")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise EOFError(f"worker exited with {self.process.poll()}")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return line
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+class WorkerPool:
+    def __init__(self, command, size=None, env=None):
+        self.command = command
+        self.size = size or os.cpu_count() or 1
+        self.env = env
+        self._idle = queue.LifoQueue() # most recently used worker first: its caches are warm.
+        self._lock = threading.Lock()
+        self._workers = []
+        self._closed = False
+
+    def run(self, execute_dir, args, timeout, limits=None, pipe_limit=None):
+        """
+        Runs the harness with args inside a worker. Returns (returncode, stdout, stderr) like run_command.
+        limits: {"rlimits": {RLIMIT name: value}, "memory_limit": MB}. The python worker applies the rlimits
+        to the forked job, the javascript worker limits the job thread's heap; the java worker ignores them.
+        pipe_limit: bytes of job output (stdout + stderr) the python and javascript workers keep before they
+        report "output limit exceeded". Longer output from the java worker is cut here; a response line too long
+        to hold that much output is not read to its end (the worker is killed).
+        """
+        worker = self._acquire()
+        job = {"execute_dir": execute_dir, "args": args, "timeout": timeout}
+        if limits:
+            job["limits"] = limits
+        if pipe_limit:
+            job["pipe_limit"] = pipe_limit
+        max_bytes = 6 * pipe_limit + WORKER_RESPONSE_SLACK if pipe_limit else None
+        try:
+            response = worker.request(job, timeout + WORKER_GRACE_SECONDS, max_bytes)
+        except TimeoutError:
+            self._discard(worker)
+            return None, '', "timeout"
+        except ResponseTooLong:
+            self._discard(worker)
+            return None, '', "output limit exceeded"
+        except (OSError, EOFError, ValueError) as e: # the worker itself died (e.g. System.exit in a solution)
+            self._discard(worker)
+            return None, '', str(e)
+
+        with self._lock:
+            reuse = worker.alive() and not response.get("worker_exit") and not self._closed
+            if reuse:
+                self._idle.put(worker)
+        if not reuse:
+            self._discard(worker)
+        if pipe_limit and len(response["stdout"]) + len(response["stderr"]) > pipe_limit:
+            return response["returncode"], '', "output limit exceeded"
+        return response["returncode"], response["stdout"], response["stderr"]
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if len(self._workers) < self.size:
+                    worker = Worker(self.command, self.env)
+                    self._workers.append(worker)
+                    return worker
+            try: # poll, so that a slot freed by _discard is noticed as well
+                return self._idle.get(timeout=0.05)
+            except queue.Empty:
+                pass
+
+    def _discard(self, worker):
+        worker.kill()
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def close(self):
+        """Stops the idle workers now and the busy ones when their job returns."""
+        with self._lock:
+            self._closed = True
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+        for worker in idle:
+            self._discard(worker)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.kill()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_worker_pool(language, command, size=None, env=None):
+    """
+    Process-wide pool per (language, env), started lazily and stopped at exit.
+    When the worker command changes (e.g. once the Java AppCDS archive exists), a new pool replaces
+    the old one, whose workers are stopped.
+    """
+    key = (language, tuple(sorted(env.items())) if env is not None else None)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None and pool.command == list(command):
+            return pool
+        _pools[key] = new_pool = WorkerPool(list(command), size, env)
+    if pool is not None:
+        pool.close()
+    return new_pool
+
+
+@atexit.register
+def _shutdown_pools():
+    for pool in _pools.values():
+        pool.shutdown()
@@ -0,0 +1,9 @@
+import os, sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+@pytest.fixture
+def base_dir(tmp_path):
+    return str(tmp_path)
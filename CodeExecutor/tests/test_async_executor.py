@@ -0,0 +1,16 @@
+import asyncio
+from code_executor import CodeExecutor
+from code_executor.async_executor import AsyncCodeExecutor
+
+CODE = "import time\ndef solution(a):\n    if a == 3: time.sleep(30)\n    return a\n"
+TESTCASE = {str(a): {"input": {"a": a}} for a in range(1, 4)}
+
+
+def test_timeout_keeps_finished_results(base_dir):
+    executor = CodeExecutor("python", CODE, TESTCASE, base_dir=base_dir, timeout=2)
+    expected = executor.run()
+    executor = AsyncCodeExecutor("python", CODE, TESTCASE, base_dir=base_dir, timeout=2)
+    _, _, results, _ = asyncio.run(executor.run())
+    assert executor.toolchain.verdict == "TLE"
+    assert [results[key]["result"] for key in ("1", "2")] == [1, 2]
+    assert [results[key]["result"] for key in ("1", "2")] == [expected[2][key]["result"] for key in ("1", "2")]
@@ -0,0 +1,22 @@
+import time
+from code_executor.batch_executor import BatchExecutor
+
+TESTCASE = {"1": {"input": {"a": 1, "b": 2}, "output": 3}}
+
+
+def test_failing_job_does_not_abort_the_batch(base_dir):
+    jobs = [("cobol", "", TESTCASE), ("python", "def solution(a, b):\n    return a + b\n", TESTCASE)]
+    runs = dict(BatchExecutor(base_dir=base_dir).run(jobs))
+    assert runs[0][0] == "error" and "Unsupported Language" in runs[0][3]
+    assert runs[1][0] == "execute" and runs[1][2]["1"]["result"] == 3
+
+
+def test_stopping_early_cancels_the_remaining_jobs(base_dir):
+    slow = "import time\ndef solution(a, b):\n    time.sleep(a)\n    return a + b\n"
+    testcases = [{"1": {"input": {"a": a, "b": 0}}} for a in (0, 5, 5, 5)]
+    runs = BatchExecutor(base_dir=base_dir, run_concurrency=4).run(("python", slow, t) for t in testcases)
+    start = time.perf_counter()
+    job_id, run = next(runs)
+    runs.close()
+    assert job_id == 0 and run[2]["1"]["result"] == 0
+    assert time.perf_counter() - start < 5
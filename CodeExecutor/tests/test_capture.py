@@ -0,0 +1,14 @@
+from code_executor import CodeExecutor
+
+
+def test_capture_keeps_head_and_tail(base_dir):
+    code = "def solution(n):\n    for i in range(n): print('line', i)\n    return n\n"
+    executor = CodeExecutor("python", code, {"1": {"input": {"n": 20000}}}, base_dir=base_dir, capture_limit=1)
+    _, _, results, _ = executor.run()
+    stdout = results["1"]["stdout"]
+    head, rest = stdout.split("\n... (", 1)
+    dropped, tail = rest.split(" characters truncated) ...\n", 1)
+    full = "".join(f"line {i}\n" for i in range(20000))
+    assert len(head) == 512 and full.startswith(head)
+    assert full.rstrip("\n").endswith(tail) # the harness strips the trailing newline
+    assert int(dropped) == len(full) - 1024
@@ -0,0 +1,15 @@
+from code_executor import CodeExecutor
+
+TESTCASE = {
+    "1": {"input": {"a": 1}, "output": 1},
+    "2": {"input": {"a": 2}, "output": 3},
+    "3": {"input": {"a": 3}, "output": 3},
+}
+
+
+def test_stop_on_failure_stops_at_wrong_answer(base_dir):
+    executor = CodeExecutor("python", "def solution(a):\n    return a\n", TESTCASE, base_dir=base_dir,
+                            stop_on_failure=True)
+    _, _, results, _ = executor.run()
+    assert results["1"]["passed"] and not results["2"]["passed"]
+    assert results["3"]["stderr"] == "(skipped)"
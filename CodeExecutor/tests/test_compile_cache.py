@@ -0,0 +1,18 @@
+import os
+from code_executor.compile_cache import CompileCache
+
+
+def test_restored_artifacts_do_not_share_the_entry(tmp_path):
+    cache = CompileCache(str(tmp_path / "cache"))
+    build_dir, first, second = (tmp_path / name for name in ("build", "first", "second"))
+    for directory in (build_dir, first, second):
+        directory.mkdir()
+    (build_dir / "main").write_bytes(b"binary")
+    key = CompileCache.make_key("cpp", "source")
+    cache.store(key, str(build_dir), ["main"])
+
+    assert cache.restore(key, str(first))
+    (first / "main").write_bytes(b"overwritten by a solution")
+    assert cache.restore(key, str(second))
+    assert (second / "main").read_bytes() == b"binary"
+    assert os.stat(second / "main").st_nlink == 1
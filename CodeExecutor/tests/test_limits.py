@@ -0,0 +1,35 @@
+from code_executor import CodeExecutor
+
+CODE = "def solution(n):\n    return len(bytearray(n * 1024 * 1024))\n"
+TESTCASE = {"1": {"input": {"n": 1}}, "2": {"input": {"n": 200}}}
+
+
+def test_memory_limit_in_parallel_shards(base_dir):
+    executor = CodeExecutor("python", CODE, TESTCASE, base_dir=base_dir, memory_limit=128, parallel_testcases=2)
+    _, _, results, _ = executor.run()
+    assert results["1"]["result"] == 1024 * 1024
+    assert "MemoryError" in results["2"]["stderr"]
+    assert executor.toolchain.verdict == "MLE"
+
+
+def test_solution_files_are_written_in_execute_dir(base_dir):
+    code = "import os\ndef solution(n):\n    open('out.txt', 'w').write('x')\n    return os.getcwd()\n"
+    executor = CodeExecutor("python", code, {"1": {"input": {"n": 1}}}, base_dir=base_dir)
+    _, _, results, _ = executor.run()
+    assert results["1"]["result"] == executor.toolchain.execute_dir
+
+
+def test_verdict_does_not_depend_on_stderr_text(base_dir):
+    code = "def solution(n):\n    raise ValueError('MemoryError File too large')\n"
+    executor = CodeExecutor("python", code, {"1": {"input": {"n": 1}}}, base_dir=base_dir, memory_limit=128)
+    _, _, results, _ = executor.run()
+    assert results["1"]["error_type"] == "ValueError"
+    assert executor.toolchain.verdict == "RE"
+
+
+def test_merged_shards_keep_every_stderr(base_dir):
+    executor = CodeExecutor("python", CODE, TESTCASE, base_dir=base_dir, parallel_testcases=2)
+    outputs = [(0, '{"1": {"result": 1}}', "dbg"), (0, '{"2": {"result": 2}}', "dbg")]
+    returncode, _, stderr = executor.toolchain.merge_shard_outputs([("1", None), ("2", None)], outputs)
+    assert returncode == 0
+    assert stderr == "[1] dbg\n[2] dbg"
@@ -0,0 +1,20 @@
+from code_executor import CodeExecutor
+from code_executor.result_cache import MemoryResultCache
+
+CODE = "def solution(n):\n    return len(bytearray(n * 1024 * 1024))\n"
+TESTCASE = {"1": {"input": {"n": 200}, "output": 200 * 1024 * 1024}}
+
+
+def run(base_dir, cache, **kwargs):
+    executor = CodeExecutor("python", CODE, TESTCASE, base_dir=base_dir, result_cache=cache, check_output=True, **kwargs)
+    _, _, results, _ = executor.run()
+    return results["1"]
+
+
+def test_results_are_cached_per_limits(base_dir):
+    cache = MemoryResultCache()
+    assert not run(base_dir, cache, memory_limit=128).get("passed")
+    assert run(base_dir, cache, memory_limit=128).get("cached")
+    result = run(base_dir, cache, memory_limit=1024)
+    assert result.get("passed") and not result.get("cached")
+    assert run(base_dir, cache, memory_limit=1024).get("cached")
@@ -0,0 +1,36 @@
+import pytest
+from code_executor import CodeExecutor
+from code_executor import testcase_file
+from code_executor.testcase_file import write_testcase_file, iter_testcase_file, stage_testcase_file, write_shards
+
+TESTCASE = {
+    "1": {"input": {"nums": [1, -2, 3000000000], "weights": [0.5, 1.25], "name": "가나다"}, "output": 3000000001},
+    "b": {"input": {"nums": [], "weights": [], "name": ""}, "output": None},
+    "3": {"input": {"nums": [[1, 2], [3]], "weights": [True, None], "name": "x" * 70000}, "output": [1, "2"]},
+}
+
+
+@pytest.mark.parametrize("suffix", [".ndjson", ".msgpack"])
+def test_container_round_trip(tmp_path, suffix):
+    path = str(tmp_path / f"testcase{suffix}")
+    write_testcase_file(TESTCASE, path)
+    assert testcase_file.testcase_keys(path) == list(TESTCASE)
+    assert {key: case for key, case in iter_testcase_file(path)} == TESTCASE
+
+    other = str(tmp_path / ("converted.msgpack" if suffix == ".ndjson" else "converted.ndjson"))
+    stage_testcase_file(path, other)
+    assert dict(iter_testcase_file(other)) == TESTCASE
+
+    shards = write_shards(path, str(tmp_path / "shard-{index}"))
+    assert [key for key, _ in shards] == list(TESTCASE)
+    for key, shard_path in shards:
+        assert dict(iter_testcase_file(shard_path)) == {key: TESTCASE[key]}
+
+
+@pytest.mark.parametrize("testcase_format", ["json", "msgpack"])
+def test_harness_reads_both_formats(base_dir, testcase_format):
+    code = ("def solution(nums, weights, name):\n"
+            "    return [sum(nums) if nums and isinstance(nums[0], int) else None, len(name)]\n")
+    executor = CodeExecutor("python", code, TESTCASE, base_dir=base_dir, testcase_format=testcase_format)
+    _, _, results, _ = executor.run()
+    assert [results[key]["result"] for key in TESTCASE] == [[2999999999, 3], [None, 0], [None, 70000]]
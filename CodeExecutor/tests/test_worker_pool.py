@@ -0,0 +1,47 @@
+import time
+import pytest
+from code_executor import CodeExecutor
+from code_executor.worker_pool import get_worker_pool
+
+TESTCASE = {"1": {"input": {"n": 10 ** 7}}}
+
+
+def test_pool_kills_flooding_job_at_pipe_limit(base_dir):
+    code = "import os\ndef solution(n):\n    for i in range(n): os.write(1, b'x' * 1000)\n    return n\n"
+    executor = CodeExecutor("python", code, TESTCASE, base_dir=base_dir, timeout=20, worker_pool=True, pipe_limit=1)
+    start = time.perf_counter()
+    executor.run()
+    assert executor.toolchain.verdict == "OLE"
+    assert time.perf_counter() - start < 10
+
+
+def test_pools_are_keyed_by_language_and_env():
+    pool = get_worker_pool("python", ["python3", "worker.py"], env={"A": "1"})
+    assert get_worker_pool("python", ["python3", "worker.py"], env={"A": "1"}) is pool
+    assert get_worker_pool("python", ["python3", "worker.py"], env={"A": "2"}) is not pool
+    assert get_worker_pool("python", ["python3", "-X", "dev", "worker.py"], env={"A": "1"}) is not pool
+    assert get_worker_pool("python", ["python3", "worker.py"], env={"A": "1"}) is not pool
+
+
+def test_replaced_pool_stops_its_idle_workers():
+    pool = get_worker_pool("sleep", ["sleep", "60"])
+    worker = pool._acquire()
+    pool._idle.put(worker)
+    assert get_worker_pool("sleep", ["sleep", "61"]) is not pool
+    assert not worker.alive()
+
+
+HANGING = {
+    "python": "import time\ndef solution(a):\n    if a == 3: time.sleep(30)\n    return a\n",
+    "javascript": "function solution(a) { if (a === 3) { while (true) {} } return a; }\n",
+}
+
+
+@pytest.mark.parametrize("language", list(HANGING))
+def test_pool_timeout_keeps_finished_results(base_dir, language):
+    testcase = {str(a): {"input": {"a": a}} for a in range(1, 5)}
+    executor = CodeExecutor(language, HANGING[language], testcase, base_dir=base_dir, timeout=2, worker_pool=True)
+    _, _, results, _ = executor.run()
+    assert executor.toolchain.verdict == "TLE"
+    assert [results[key]["result"] for key in ("1", "2")] == [1, 2]
+    assert [results[key]["stderr"] for key in ("3", "4")] == ["(error occured)"] * 2